@@ -1,19 +1,26 @@
-import os
 import json
-from groq import Groq
 from dotenv import load_dotenv
 from pathlib import Path
+from typing import Optional
 
 # Handle imports for both module and standalone execution
 try:
+    from ..config import settings
     from ..models import ComparisonContext
+    from ..llm import Route, agent_routes
+    from .output_schemas import generate
+    from .query_parser import HIGH, MEDIUM, parse_query
 except ImportError:
     # Fallback for standalone execution
     import sys
     backend_path = Path(__file__).resolve().parent.parent.parent
     if str(backend_path) not in sys.path:
         sys.path.insert(0, str(backend_path))
+    from app.config import settings
     from app.models import ComparisonContext
+    from app.llm import Route, agent_routes
+    from app.agents.output_schemas import generate
+    from app.agents.query_parser import HIGH, MEDIUM, parse_query
 
 # Load .env from project root
 project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -22,6 +29,12 @@ load_dotenv(project_root / ".env")
 load_dotenv(project_root / "backend" / ".env.local", override=True)
 load_dotenv(project_root / "backend" / ".env")
 
+# Provider preference list (override with CONTEXT_PROVIDERS="provider:model,...")
+ROUTES = [Route("groq", "llama-3.3-70b-versatile"), Route("deepseek", "deepseek-chat")]
+
+# How queries were parsed, for /api/ops/llm
+stats = {"local": 0, "llm": 0, "local_fallback": 0, "failed": 0}
+
 # Tech category detection
 TECH_CATEGORIES = {
     # Web Frameworks & Tools
@@ -75,23 +88,57 @@ def detect_tech_category(tech_name: str) -> str:
     
     return 'other'
 
-# Initialize Groq client lazily
-_client = None
-
-def get_client():
-    global _client
-    if _client is None:
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables. Please set it in .env or .env.local")
-        _client = Groq(api_key=api_key)
-    return _client
+def _apply_parsed(context: ComparisonContext, parsed: dict) -> None:
+    """Copy parsed query fields onto the context and detect the tech category."""
+    context.option_a = parsed["option_a"]
+    context.option_b = parsed["option_b"]
+    context.constraints = parsed.get("constraints", [])
+    context.use_case = parsed.get("use_case")
+    context.team_size = parsed.get("team_size")
+    context.timeline = parsed.get("timeline")
+    context.budget = parsed.get("budget")
+
+    # Detect tech category for both options
+    category_a = detect_tech_category(context.option_a)
+    category_b = detect_tech_category(context.option_b)
+
+    # Determine primary category (both should be same category)
+    if category_a == category_b:
+        context.tech_category = category_a
+    else:
+        # If different categories, use 'other' as fallback
+        context.tech_category = 'other'
+
+def speculate(query: str) -> Optional[ComparisonContext]:
+    """
+    Best local guess at the parsed context for a query that `run` will send
+    to the LLM (medium-confidence local parse), so downstream agents can start
+    early. None when the local parse is confident (no LLM call to overlap) or
+    has no answer.
+    """
+    if not (settings.local_query_parser and settings.speculative_specialists):
+        return None
+    local = parse_query(query)
+    if local is None or local.confidence != MEDIUM:
+        return None
+    guess = ComparisonContext(query=query)
+    _apply_parsed(guess, local.model_dump())
+    guess.parse_path = "local"
+    return guess
 
 async def run(context: ComparisonContext) -> ComparisonContext:
     """
     ContextAgent: Parses the user's raw query and extracts structured information.
-    Uses Groq + Llama 3.3 70B for speed and accuracy.
+    Tries the local rule-based parser first; only queries it can't resolve
+    confidently go to Groq + Llama 3.3 70B.
     """
+    local = parse_query(context.query) if settings.local_query_parser else None
+    if local is not None and local.confidence == HIGH:
+        _apply_parsed(context, local.model_dump())
+        context.parse_path = "local"
+        stats["local"] += 1
+        return context
+
     prompt = f"""
 You are an expert query parser for technology comparison decisions.
 Carefully analyze the following user query and extract the required information.
@@ -120,49 +167,33 @@ Respond with ONLY valid JSON in this exact format (no extra text):
 """
 
     try:
-        client = get_client()
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a precise JSON extractor. Never add explanations."},
-                {"role": "user", "content": prompt}
-            ],
+        parsed = await generate(
+            "context",
+            agent_routes("context", ROUTES),
+            prompt,
+            system="You are a precise JSON extractor. Never add explanations.",
             temperature=0.3,
             max_tokens=512
         )
-        response_text = completion.choices[0].message.content.strip()
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join([l for l in lines if not l.startswith("```")])
-        parsed = json.loads(response_text)
 
         # Update the context object
-        context.option_a = parsed["option_a"]
-        context.option_b = parsed["option_b"]
-        context.constraints = parsed.get("constraints", [])
-        context.use_case = parsed.get("use_case")
-        context.team_size = parsed.get("team_size")
-        context.timeline = parsed.get("timeline")
-        context.budget = parsed.get("budget")
-        
-        # Detect tech category for both options
-        category_a = detect_tech_category(context.option_a)
-        category_b = detect_tech_category(context.option_b)
-        
-        # Determine primary category (both should be same category)
-        if category_a == category_b:
-            context.tech_category = category_a
-        else:
-            # If different categories, use 'other' as fallback
-            context.tech_category = 'other'
+        _apply_parsed(context, parsed)
+        context.parse_path = "llm"
+        stats["llm"] += 1
 
     except Exception as e:
-        # Fallback values on error to prevent total failure
-        context.option_a = "Unknown A"
-        context.option_b = "Unknown B"
-        context.tech_category = "other"
         print(f"ContextAgent error: {e}")
+        if local is not None:
+            # A medium-confidence local parse beats giving up
+            _apply_parsed(context, local.model_dump())
+            context.parse_path = "local"
+            stats["local_fallback"] += 1
+        else:
+            # Fallback values on error to prevent total failure
+            context.option_a = "Unknown A"
+            context.option_b = "Unknown B"
+            context.tech_category = "other"
+            stats["failed"] += 1
 
     return context
 
@@ -1,12 +1,12 @@
-import os
 import json
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Handle imports for both module and standalone execution
 try:
     from ..models import ComparisonContext
+    from ..llm import Route, agent_routes
+    from .output_schemas import generate
 except ImportError:
     # Fallback for standalone execution
     import sys
@@ -14,6 +14,8 @@ except ImportError:
     if str(backend_path) not in sys.path:
         sys.path.insert(0, str(backend_path))
     from app.models import ComparisonContext
+    from app.llm import Route, agent_routes
+    from app.agents.output_schemas import generate
 
 # Load .env from project root
 project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -22,10 +24,8 @@ load_dotenv(project_root / ".env")
 load_dotenv(project_root / "backend" / ".env.local", override=True)
 load_dotenv(project_root / "backend" / ".env")
 
-client = AsyncOpenAI(
-    api_key=os.getenv("DEEPSEEK_API_KEY"),
-    base_url="https://api.deepseek.com"
-)
+# Provider preference list (override with COST_PROVIDERS="provider:model,...")
+ROUTES = [Route("deepseek", "deepseek-chat"), Route("groq", "llama-3.3-70b-versatile")]
 
 async def run(context: ComparisonContext) -> ComparisonContext:
     """
@@ -59,22 +59,17 @@ Respond with ONLY valid JSON in this format:
 """
 
     try:
-        response = await client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[{"role": "user", "content": prompt}],
+        # Validated against the cost schema; re-asked with the errors if it doesn't fit
+        context.cost_breakdown = await generate(
+            "cost",
+            agent_routes("cost", ROUTES),
+            prompt,
+            context,
             temperature=0.2,
             max_tokens=512
         )
-        response_text = response.choices[0].message.content.strip()
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join([l for l in lines if not l.startswith("```")])
-        parsed = json.loads(response_text)
-        context.cost_breakdown = parsed
     except Exception as e:
         print(f"CostAgent error: {e}")
-        context.cost_breakdown = {"error": str(e)}
 
     return context
 
@@ -0,0 +1,126 @@
+import json
+from dotenv import load_dotenv
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import ValidationError
+
+# Handle imports for both module and standalone execution
+try:
+    from ..models import ComparisonContext
+    from ..llm import Route, agent_routes, hedged_complete
+    from ..utils.json_extract import extract_object
+    from .output_schemas import validate_output
+except ImportError:
+    # Fallback for standalone execution
+    import sys
+    backend_path = Path(__file__).resolve().parent.parent.parent
+    if str(backend_path) not in sys.path:
+        sys.path.insert(0, str(backend_path))
+    from app.models import ComparisonContext
+    from app.llm import Route, agent_routes, hedged_complete
+    from app.utils.json_extract import extract_object
+    from app.agents.output_schemas import validate_output
+
+# Load .env from project root
+project_root = Path(__file__).resolve().parent.parent.parent.parent
+load_dotenv(project_root / ".env.local", override=True)
+load_dotenv(project_root / ".env")
+load_dotenv(project_root / "backend" / ".env.local", override=True)
+load_dotenv(project_root / "backend" / ".env")
+
+# Provider preference list (override with FUSED_PROVIDERS="provider:model,...")
+ROUTES = [Route("groq", "llama-3.3-70b-versatile"), Route("deepseek", "deepseek-chat")]
+
+
+# Pipeline stage -> response key / ComparisonContext field; each section is
+# checked against that stage's agent schema (output_schemas.py)
+SECTIONS: Dict[str, str] = {
+    "cost": "cost_breakdown",
+    "performance": "performance",
+    "risks": "risks",
+}
+
+# Counters for /api/ops/llm: how often fused sections had to be redone per agent
+stats = {"calls": 0, "failed_calls": 0, "sections_ok": 0, "sections_fallback": 0}
+
+
+async def run(context: ComparisonContext, stages: Optional[List[str]] = None) -> List[str]:
+    """
+    FusedAgent: One LLM call for the cost, performance and risk analyses.
+
+    Fills every requested section (all by default) that passes validation and
+    returns their stage names ("cost", "performance", "risks"); the caller
+    runs the per-agent fallback for the rest.
+    """
+    wanted = [stage for stage in SECTIONS if stages is None or stage in stages]
+    constraints = ", ".join(context.constraints) or "general MVP"
+    prompt = f"""
+You are a senior technical analyst producing a combined analysis in one pass.
+Compare {context.option_a} (A) vs {context.option_b} (B) using accurate 2025 pricing and benchmarks.
+
+Constraints: {constraints}
+Use case: {context.use_case or "standard startup app"}
+Team/Budget: {context.team_size or "small"}, {context.budget or "cost-sensitive"}
+
+Provide three sections:
+- cost_breakdown: Year 1 TCO at 5K-10K monthly active users, breakeven point, exact costs at 1K, 10K, 50K users, key cost traps
+- performance: key performance differences (latency, scalability, cold starts) and 1-2 short real-world war stories
+- risks: gotchas, vendor lock-in, migration effort both ways and developer experience notes
+
+Respond with ONLY valid JSON in this format:
+{{
+  "cost_breakdown": {{
+    "year1_tco": {{"a": 300, "b": 1140}},
+    "breakeven_users": 40000,
+    "slider_data": {{"users_levels": [1000, 10000, 50000], "costs_a": [25, 50, 100], "costs_b": [95, 200, 500]}},
+    "traps": ["A read overages on viral spikes"]
+  }},
+  "performance": {{
+    "benchmarks": {{"latency_ms": {{"a": 100, "b": 200}}, "scalability": {{"a": "excellent beyond 100K", "b": "strong to 50K"}}}},
+    "war_stories": ["One team saw 300ms faster loads after switching to A"]
+  }},
+  "risks": {{
+    "gotchas_a": ["Cryptic security rules"],
+    "gotchas_b": ["Younger ecosystem"],
+    "migration_effort": {{"a_to_b": "3-5 days", "b_to_a": "1-2 weeks"}},
+    "dx_notes": ["A has better mobile SDKs"]
+  }}
+}}
+"""
+
+    stats["calls"] += 1
+    try:
+        response = await hedged_complete(
+            agent_routes("fused", ROUTES),
+            prompt,
+            temperature=0.3,
+            max_tokens=1200
+        )
+        parsed = extract_object(response.text)
+    except Exception as e:
+        print(f"FusedAgent error: {e}")
+        stats["failed_calls"] += 1
+        stats["sections_fallback"] += len(wanted)
+        return []
+
+    filled = []
+    for stage in wanted:
+        field = SECTIONS[stage]
+        try:
+            setattr(context, field, validate_output(stage, parsed.get(field), context))
+        except ValidationError:
+            print(f"FusedAgent: invalid {field} section, falling back to {stage} agent")
+            stats["sections_fallback"] += 1
+            continue
+        filled.append(stage)
+        stats["sections_ok"] += 1
+    return filled
+
+if __name__ == "__main__":
+    import asyncio
+    async def test():
+        ctx = ComparisonContext(query="test", option_a="Firebase", option_b="Supabase")
+        filled = await run(ctx)
+        print("Fused sections:", filled)
+        print(json.dumps({"cost": ctx.cost_breakdown, "performance": ctx.performance, "risks": ctx.risks}, indent=2))
+    asyncio.run(test())
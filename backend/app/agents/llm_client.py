@@ -4,30 +4,19 @@ Gemini LLM client wrapper for PM Architect Lite Orchestrator.
 
 DEV MODE (default): Returns deterministic stub JSON for testing without API costs.
 PRODUCTION MODE: Set GEMINI_API_KEY in environment to enable real Gemini API calls.
+MOCK MODE: Set LLM_MOCK=true to answer from the offline mock provider (llm/mock.py).
 """
 
 import json
+import zlib
 from typing import Optional
 
-# Optional: import Gemini SDK if available
-try:
-    import google.generativeai as genai
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
-
 from ..config import settings
+from ..llm import LLMResponse, complete, get_provider
+from ..utils.metrics import llm_stub_responses
 
 
-class LLMResponse:
-    """Response wrapper that tracks whether data is from real API or stub."""
-    def __init__(self, text: str, is_stub: bool = False, error: str = None):
-        self.text = text
-        self.is_stub = is_stub
-        self.error = error
-
-
-def call_gemini(
+async def call_gemini(
     system_prompt: str,
     user_prompt: str,
     max_tokens: int = 400,
@@ -46,10 +35,10 @@ def call_gemini(
         LLMResponse with text and metadata about source (real API vs stub)
     """
     api_key = settings.gemini_api_key
-    model_name = model or settings.gemini_model
     
-    # If no API key or genai not available, use dev stub
-    if not api_key or not GENAI_AVAILABLE:
+    # If no API key or genai not available (and no mock installed), use dev stub
+    if not get_provider("gemini").is_configured():
+        llm_stub_responses.inc("not_configured")
         return LLMResponse(
             text=_dev_stub(user_prompt),
             is_stub=True,
@@ -57,29 +46,19 @@ def call_gemini(
         )
     
     try:
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        
-        # Create model instance
-        gemini_model = genai.GenerativeModel(
-            model_name=model_name,
-            generation_config={
-                "temperature": 0.3,
-                "max_output_tokens": max_tokens,
-            }
+        return await complete(
+            "gemini",
+            user_prompt,
+            model=model,
+            system=system_prompt,
+            temperature=0.3,
+            max_tokens=max_tokens,
         )
         
-        # Combine system and user prompts
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
-        
-        # Generate response
-        response = gemini_model.generate_content(full_prompt)
-        
-        return LLMResponse(text=response.text, is_stub=False)
-        
     except Exception as e:
         # Fallback to dev stub on error
         print(f"⚠️  Gemini API call failed: {e}. Using dev stub.")
+        llm_stub_responses.inc("provider_error")
         return LLMResponse(
             text=_dev_stub(user_prompt),
             is_stub=True,
@@ -92,12 +71,31 @@ def _dev_stub(user_prompt: str) -> str:
     Development stub that returns deterministic JSON for testing.
     Parses options from user_prompt if possible.
     """
+    import re
+    # Per-technology profile (N-way rankings)
+    profile_match = re.search(r'Technology to profile:\s*(.+)', user_prompt)
+    if profile_match:
+        name = profile_match.group(1).strip()
+        metrics_match = re.search(r'Metrics:\s*(.+)', user_prompt)
+        metrics = [m.strip() for m in metrics_match.group(1).split(",")] if metrics_match else ["Performance"]
+        return json.dumps({
+            "name": name,
+            "metrics": [
+                {
+                    "name": metric,
+                    "score": 60 + zlib.crc32(f"{name}:{metric}".lower().encode("utf-8")) % 36,
+                    "reason": f"{name} stub score for {metric.lower()}."
+                }
+                for metric in metrics
+            ],
+            "evidence": [f"{name} stub profile"]
+        })
+
     # Try to extract options from prompt
     left_option = "Option A"
     right_option = "Option B"
     
     # Look for "Options to compare: X vs Y" pattern
-    import re
     options_match = re.search(r'Options to compare:\s*([^\s]+)\s+vs\s+([^\s\n]+)', user_prompt, re.IGNORECASE)
     if options_match:
         left_option = options_match.group(1).strip()
@@ -1,7 +1,6 @@
 import os
 import json
-import google.generativeai as genai
-from groq import Groq
+from typing import AsyncIterator
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -19,6 +18,7 @@ except ImportError:
 # Handle imports for both module and standalone execution
 try:
     from ..models import ComparisonContext
+    from ..llm import Route, agent_routes, hedged_complete, hedged_stream
 except ImportError:
     # Fallback for standalone execution
     import sys
@@ -26,6 +26,7 @@ except ImportError:
     if str(backend_path) not in sys.path:
         sys.path.insert(0, str(backend_path))
     from app.models import ComparisonContext
+    from app.llm import Route, agent_routes, hedged_complete, hedged_stream
 
 # Load .env from project root
 project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -34,20 +35,12 @@ load_dotenv(project_root / ".env")
 load_dotenv(project_root / "backend" / ".env.local", override=True)
 load_dotenv(project_root / "backend" / ".env")
 
-# Gemini setup
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-# Groq fallback client
-groq_client = None
-
-def get_groq_client():
-    global groq_client
-    if groq_client is None:
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables")
-        groq_client = Groq(api_key=api_key)
-    return groq_client
+# Provider preference list (override with NARRATIVE_PROVIDERS="provider:model,...")
+# Primary: Gemini for conversational voice; backup: Groq Llama 3.3 70B
+ROUTES = [
+    Route("gemini", os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")),
+    Route("groq", "llama-3.3-70b-versatile", temperature=0.7, max_tokens=1024),
+]
 
 
 def generate_category_specific_steps(winner: str, category: str, context: ComparisonContext) -> str:
@@ -223,11 +216,11 @@ def determine_winner(context: ComparisonContext, cost_data: dict, perf_data: dic
         # Check performance data for winner
         benchmarks = perf_data.get("benchmarks", {})
         if benchmarks:
-            # If we have latency data, pick lower latency
+            # If we have latency data, pick lower latency (keyed "a"/"b", see output_schemas.py)
             latency = benchmarks.get("latency_ms", {})
             if latency:
-                lat_a = latency.get(context.option_a, float('inf'))
-                lat_b = latency.get(context.option_b, float('inf'))
+                lat_a = latency.get("a", float('inf'))
+                lat_b = latency.get("b", float('inf'))
                 if isinstance(lat_a, (int, float)) and isinstance(lat_b, (int, float)):
                     return context.option_b if lat_b < lat_a else context.option_a
     
@@ -250,11 +243,9 @@ def determine_winner(context: ComparisonContext, cost_data: dict, perf_data: dic
     return context.option_b
 
 
-async def run(context: ComparisonContext) -> ComparisonContext:
+def build_prompt(context: ComparisonContext) -> str:
     """
-    NarrativeAgent: Synthesizes everything into a conversational Decision Brief.
-    Primary: Gemini 1.5 Flash for conversational voice.
-    Fallback: Groq Llama 3.3 70B if Gemini rate-limited.
+    Builds the Decision Brief prompt from the specialist agents' output.
     """
     # Extract data
     cost_data = context.cost_breakdown
@@ -342,25 +333,14 @@ End your brief with this EXACT text (don't modify it):
 
 That's it. Now write the brief. Remember: conversational, opinionated, under 600 words. NO markdown headers."""
 
-    try:
-        # Use the model from config or default to gemini-1.5-flash-latest
-        model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt)
-        context.final_brief = response.text
-    except Exception as e:
-        print(f"Gemini failed ({e}), falling back to Groq...")
-        client = get_groq_client()
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=1024
-        )
-        context.final_brief = completion.choices[0].message.content.strip()
-    
-    # Calculate and append value delivered section
-    value_data = calculate_value_delivered(context, cost_data, perf_data, risk_data)
+    return prompt
+
+
+def build_value_section(context: ComparisonContext) -> str:
+    """
+    Builds the "value delivered" footer appended to every brief.
+    """
+    value_data = calculate_value_delivered(context, context.cost_breakdown, context.performance, context.risks)
     
     # Format money with comma separator
     money_str = f"${value_data['money_saved']:,}" if value_data['money_saved'] > 0 else "$0"
@@ -390,10 +370,42 @@ Based on:
 
 💬 **Want another comparison this clear?** Try comparing something else!"""
     
-    context.final_brief += value_section
+    return value_section
+
+
+async def run(context: ComparisonContext) -> ComparisonContext:
+    """
+    NarrativeAgent: Synthesizes everything into a conversational Decision Brief.
+    Primary: Gemini 1.5 Flash for conversational voice.
+    Backup: Groq Llama 3.3 70B, hedged if Gemini is slow and used at once if it fails.
+    """
+    prompt = build_prompt(context)
+
+    response = await hedged_complete(agent_routes("narrative", ROUTES), prompt)
+    context.final_brief = response.text
+    
+    context.final_brief += build_value_section(context)
 
     return context
 
+
+async def stream(context: ComparisonContext) -> AsyncIterator[str]:
+    """
+    Streaming NarrativeAgent: yields brief tokens as the LLM produces them,
+    then the value section. Sets context.final_brief once finished.
+    Providers race to the first token; see ROUTES.
+    """
+    prompt = build_prompt(context)
+    chunks = []
+
+    async for chunk in hedged_stream(agent_routes("narrative", ROUTES), prompt):
+        chunks.append(chunk)
+        yield chunk
+
+    value_section = build_value_section(context)
+    context.final_brief = "".join(chunks).strip() + value_section
+    yield value_section
+
 # Standalone test
 if __name__ == "__main__":
     import asyncio
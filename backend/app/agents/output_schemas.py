@@ -0,0 +1,228 @@
+"""
+Schemas for the JSON each agent returns, and the call that enforces them.
+
+Every model is built once at import. Validation normalizes what the
+downstream code relies on: costs become numbers ("$1,140" -> 1140) and
+a/b pairs keyed by the option names ({"Firebase": 100, "Supabase": 90}) are
+re-keyed to "a"/"b". An answer that doesn't fit is sent back to the same
+agent with the validation errors as a correction hint, a bounded number of
+times (AGENT_OUTPUT_RETRIES), so one malformed answer costs one more call
+for that agent instead of a gap in the brief. The rejected answer is also
+dropped from the response cache, so a repeat of the prompt asks again.
+"""
+
+from typing import Any, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, ValidationInfo, field_validator, model_validator
+
+try:
+    from ..config import settings
+    from ..llm import Route, hedged_complete, uncache
+    from ..models import ComparisonContext
+    from ..utils.json_extract import JSONExtractError, extract_object
+except ImportError:
+    from app.config import settings
+    from app.llm import Route, hedged_complete, uncache
+    from app.models import ComparisonContext
+    from app.utils.json_extract import JSONExtractError, extract_object
+
+Number = Union[int, float]
+
+
+def _number(value: Any) -> Any:
+    """'$1,140' / '1140/yr' -> 1140; anything else is left for pydantic to judge."""
+    if isinstance(value, str):
+        cleaned = value.replace("$", "").replace(",", "").split("/")[0].strip()
+        for parse in (int, float):
+            try:
+                return parse(cleaned)
+            except ValueError:
+                continue
+    return value
+
+
+def _by_side(value: Any, info: ValidationInfo) -> Any:
+    """Re-key {"<option_a>": x, "<option_b>": y} as {"a": x, "b": y}."""
+    options = (info.context or {}).get("options")
+    if not isinstance(value, dict) or not options or ("a" in value and "b" in value):
+        return value
+    sides = {name.lower(): side for name, side in zip(options, ("a", "b")) if name}
+    return {sides.get(str(key).lower(), key): item for key, item in value.items()}
+
+
+class _Output(BaseModel):
+    # Fields the prompt didn't ask for are kept, not rejected
+    model_config = ConfigDict(extra="allow")
+
+
+class Pair(_Output):
+    a: Number
+    b: Number
+
+    @model_validator(mode="before")
+    @classmethod
+    def _sides(cls, value: Any, info: ValidationInfo) -> Any:
+        return _by_side(value, info)
+
+    @field_validator("a", "b", mode="before")
+    @classmethod
+    def _numbers(cls, value: Any) -> Any:
+        return _number(value)
+
+
+class ContextOutput(_Output):
+    option_a: str = Field(min_length=1)
+    option_b: str = Field(min_length=1)
+    constraints: List[str] = []
+    use_case: Optional[str] = None
+    team_size: Optional[str] = None
+    timeline: Optional[str] = None
+    budget: Optional[str] = None
+
+    @field_validator("constraints", mode="before")
+    @classmethod
+    def _no_constraints(cls, value: Any) -> Any:
+        return [] if value is None else value
+
+
+class SliderData(_Output):
+    users_levels: List[Number] = []
+    costs_a: List[Number] = []
+    costs_b: List[Number] = []
+
+    @field_validator("users_levels", "costs_a", "costs_b", mode="before")
+    @classmethod
+    def _numbers(cls, value: Any) -> Any:
+        return [_number(v) for v in value] if isinstance(value, list) else value
+
+    @model_validator(mode="after")
+    def _aligned(self) -> "SliderData":
+        for name in ("costs_a", "costs_b"):
+            costs = getattr(self, name)
+            if self.users_levels and costs and len(costs) != len(self.users_levels):
+                raise ValueError(f"{name} must have one entry per users_levels entry")
+        return self
+
+
+class CostOutput(_Output):
+    year1_tco: Pair
+    breakeven_users: Optional[Union[Number, str]] = None
+    slider_data: SliderData = SliderData()
+    traps: List[str] = []
+
+
+class Benchmarks(_Output):
+    latency_ms: Optional[Pair] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _sides(cls, value: Any, info: ValidationInfo) -> Any:
+        if not isinstance(value, dict) or not value:
+            raise ValueError("benchmarks must be a non-empty object")
+        return {metric: _by_side(pair, info) for metric, pair in value.items()}
+
+
+class PerformanceOutput(_Output):
+    benchmarks: Benchmarks
+    war_stories: List[str] = []
+
+
+class RiskOutput(_Output):
+    gotchas_a: List[str]
+    gotchas_b: List[str]
+    migration_effort: Dict[str, Any] = {}
+    dx_notes: List[str] = []
+
+
+# Agent (pipeline stage) -> schema of its output
+SCHEMAS: Dict[str, Type[_Output]] = {
+    "context": ContextOutput,
+    "cost": CostOutput,
+    "performance": PerformanceOutput,
+    "risks": RiskOutput,
+}
+
+# Per agent: valid on the first answer, valid after a correction, still invalid; retries sent
+_COUNTERS = ("valid_first", "valid_retry", "invalid", "retries")
+stats: Dict[str, Dict[str, int]] = {agent: dict.fromkeys(_COUNTERS, 0) for agent in SCHEMAS}
+
+
+def validate_output(agent: str, data: Any, context: Optional[ComparisonContext] = None) -> Dict[str, Any]:
+    """
+    The agent's output checked against its schema and normalized.
+
+    Raises:
+        ValidationError: The output doesn't match the schema
+    """
+    options = (context.option_a, context.option_b) if context is not None else None
+    return SCHEMAS[agent].model_validate(data, context={"options": options}).model_dump(exclude_unset=True)
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        problems = [
+            f"{'.'.join(str(part) for part in e['loc']) or 'root'}: {e['msg']}"
+            for e in error.errors()[:5]
+        ]
+        return "; ".join(problems)
+    return str(error)
+
+
+def correction_hint(error: Exception) -> str:
+    return (
+        "\n\nYour previous answer could not be used: "
+        f"{_describe(error)}.\n"
+        "Answer again with ONLY the JSON object in the exact format above."
+    )
+
+
+async def generate(
+    agent: str,
+    routes: List[Route],
+    prompt: str,
+    context: Optional[ComparisonContext] = None,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Ask `routes` for the agent's JSON and validate it, re-asking with the
+    errors appended to the prompt while retries remain.
+
+    Raises:
+        ValidationError / JSONExtractError: Still invalid after the last retry
+    """
+    counters = stats[agent]
+    retries = max(0, settings.agent_output_retries)
+    attempt_prompt = prompt
+    for attempt in range(retries + 1):
+        response = await hedged_complete(
+            routes, attempt_prompt, system=system, temperature=temperature, max_tokens=max_tokens
+        )
+        try:
+            output = validate_output(agent, extract_object(response.text), context)
+        except (JSONExtractError, ValidationError) as e:
+            await uncache(response)
+            if attempt == retries:
+                counters["invalid"] += 1
+                raise
+            print(f"{agent} agent: invalid output ({_describe(e)}), retrying")
+            counters["retries"] += 1
+            attempt_prompt = prompt + correction_hint(e)
+            continue
+        counters["valid_retry" if attempt else "valid_first"] += 1
+        return output
+
+
+def validity_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters per agent plus the share of outputs that ended up valid."""
+    report = {}
+    for agent, counters in stats.items():
+        total = counters["valid_first"] + counters["valid_retry"] + counters["invalid"]
+        valid = counters["valid_first"] + counters["valid_retry"]
+        report[agent] = {
+            **counters,
+            "first_try_rate": round(counters["valid_first"] / total, 4) if total else None,
+            "validity_rate": round(valid / total, 4) if total else None,
+        }
+    return report
@@ -0,0 +1,143 @@
+"""
+Pair-level cache of specialist agent outputs.
+
+Cost, performance and risk analyses depend on which two techs are compared
+and under what constraints, not on how the query was worded. Entries are
+keyed on catalog tech ids (aliases resolved) in sorted order plus the
+normalized constraint set, so "Supabase vs Firebase for MVP" and "firebase
+or supabase for an mvp" share them and only the narrative is regenerated.
+A hit for the reverse order comes back with its a/b fields swapped. Only
+outputs that pass their agent's schema are stored, so a failed call is never
+served to later compares.
+"""
+
+import copy
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import ValidationError
+
+try:
+    from ..config import settings
+    from ..models import ComparisonContext
+    from ..utils.lru_cache import LRUCache
+    from .output_schemas import SCHEMAS, validate_output
+    from .query_parser import canonical_constraints, canonical_tech
+except ImportError:
+    from app.config import settings
+    from app.models import ComparisonContext
+    from app.utils.lru_cache import LRUCache
+    from app.agents.output_schemas import SCHEMAS, validate_output
+    from app.agents.query_parser import canonical_constraints, canonical_tech
+
+# Keys naming one side of the pair, and their counterpart
+_SWAP_KEYS = {
+    "a": "b",
+    "b": "a",
+    "costs_a": "costs_b",
+    "costs_b": "costs_a",
+    "gotchas_a": "gotchas_b",
+    "gotchas_b": "gotchas_a",
+    "a_to_b": "b_to_a",
+    "b_to_a": "a_to_b",
+}
+
+
+def swap_sides(value: Any) -> Any:
+    """Copy of an agent output with every A/B-keyed field exchanged."""
+    if isinstance(value, dict):
+        return {_SWAP_KEYS.get(k, k): swap_sides(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [swap_sides(v) for v in value]
+    return value
+
+
+def cacheable(stage: str, context: ComparisonContext, value: Dict[str, Any]) -> bool:
+    """False for a failed output: one carrying an "error" marker or not matching the stage's schema."""
+    if "error" in value:
+        return False
+    if stage in SCHEMAS:
+        try:
+            validate_output(stage, value, context)
+        except ValidationError:
+            return False
+    return True
+
+
+class PairCache:
+    """
+    LRU of agent outputs per (stage, tech pair, constraints).
+
+    Args:
+        max_entries: Maximum number of outputs kept
+        ttl_seconds: Entry lifetime (pricing and benchmarks drift)
+        enabled: Serve/store outputs at all
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: Optional[float] = None, enabled: bool = True):
+        self.enabled = enabled
+        self._lru = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.hits = 0
+        self.reverse_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _key(stage: str, context: ComparisonContext) -> Tuple[str, bool]:
+        """(cache key, whether the context's a/b order is the reverse of the stored one)."""
+        a, b = canonical_tech(context.option_a), canonical_tech(context.option_b)
+        reverse = b < a
+        pair = (b, a) if reverse else (a, b)
+        raw = json.dumps([stage, pair, canonical_constraints(context.constraints)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), reverse
+
+    def get(self, stage: str, context: ComparisonContext) -> Optional[Dict[str, Any]]:
+        """Cached output for `stage`, oriented to the context's option order."""
+        if not self.enabled or not (context.option_a and context.option_b):
+            return None
+        key, reverse = self._key(stage, context)
+        value = self._lru.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if reverse:
+            self.reverse_hits += 1
+            return swap_sides(value)
+        return copy.deepcopy(value)
+
+    def set(self, stage: str, context: ComparisonContext, value: Dict[str, Any]) -> None:
+        if not self.enabled or not value or not (context.option_a and context.option_b):
+            return
+        if not cacheable(stage, context, value):
+            self.rejected += 1
+            return
+        key, reverse = self._key(stage, context)
+        self._lru.set(key, swap_sides(value) if reverse else copy.deepcopy(value))
+        self.writes += 1
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "reverse_hits": self.reverse_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "rejected": self.rejected,
+            "evictions": self._lru.evictions,
+        }
+
+
+pair_cache = PairCache(
+    max_entries=settings.pair_cache_max_entries,
+    ttl_seconds=settings.pair_cache_ttl_seconds,
+    enabled=settings.pair_cache_enabled,
+)
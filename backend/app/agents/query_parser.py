@@ -0,0 +1,279 @@
+"""
+Local rule-based query parser: the fast path in front of the ContextAgent LLM call.
+
+Most queries look like "Firebase vs Supabase for a low-cost bootstrapped MVP".
+Splitting on "vs"/"versus"/"or", resolving each side against the tech catalog
+(`data/techs.json` names, slugs and aliases) and matching a small constraint
+lexicon answers those without a provider round trip. The result carries a
+confidence so the caller can escalate anything ambiguous to the LLM:
+
+- high: both sides resolved to catalog techs
+- medium: a clean "X vs Y" split with at least one name not in the catalog,
+  or no split but exactly two catalog techs mentioned
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+TECHS_FILE = Path(__file__).resolve().parent.parent / "data" / "techs.json"
+
+HIGH = "high"
+MEDIUM = "medium"
+
+# Longest separator first so "compared to" wins over "to"
+_SPLIT = re.compile(r"\s+(?:vs\.?|versus|v\.|compared\s+to|against)\s+", re.IGNORECASE)
+_SPLIT_OR = re.compile(r"\s+or\s+", re.IGNORECASE)
+_LEAD = re.compile(
+    r"^(?:(?:should\s+i|do\s+i|would\s+you|can\s+you)\s+)?"
+    r"(?:compare|use|pick|choose|go\s+with|recommend|which\s+is\s+better[,:]?|is|between)\s+",
+    re.IGNORECASE,
+)
+_TAIL = re.compile(r"\s+(?:for|in|with|when|on|to|as|at|if|because|given)\b|[?,;:.!]", re.IGNORECASE)
+
+# Maximum words in a name that isn't in the catalog before we call it ambiguous
+_MAX_UNKNOWN_WORDS = 3
+
+# Canonical constraint -> phrases that imply it
+CONSTRAINTS: Dict[str, List[str]] = {
+    "low cost": ["low cost", "low-cost", "cheap", "cheapest", "inexpensive", "cost-sensitive", "cost sensitive", "on a budget", "free tier"],
+    "bootstrapped": ["bootstrapped", "bootstrapping", "self-funded", "no funding"],
+    "MVP": ["mvp", "prototype", "proof of concept", "poc"],
+    "mobile-first": ["mobile-first", "mobile first", "mobile app", "ios", "android"],
+    "real-time": ["real-time", "realtime", "real time", "live updates", "websocket"],
+    "scalability": ["scale", "scalable", "scalability", "high traffic", "millions of users"],
+    "performance": ["performance", "low latency", "fast", "fastest", "speed"],
+    "serverless": ["serverless"],
+    "self-hosted": ["self-hosted", "self hosted", "on-prem", "on prem", "open source", "open-source"],
+    "compliance": ["compliance", "hipaa", "gdpr", "soc 2", "soc2"],
+    "enterprise": ["enterprise"],
+}
+
+USE_CASES: Dict[str, List[str]] = {
+    "SaaS app": ["saas", "b2b app", "web app"],
+    "mobile app": ["mobile app", "ios app", "android app"],
+    "real-time chat": ["chat", "messaging"],
+    "e-commerce": ["e-commerce", "ecommerce", "online store", "shop"],
+    "content site": ["blog", "landing page", "marketing site", "portfolio"],
+    "internal dashboard": ["dashboard", "admin panel", "internal tool"],
+    "API backend": ["api", "backend service", "microservice"],
+    "ML/AI app": ["machine learning", "ml model", "llm app", "ai app", "chatbot"],
+}
+
+TEAM_SIZES: Dict[str, List[str]] = {
+    "solo": ["solo", "just me", "one developer", "single developer", "indie hacker"],
+    "small team": ["small team", "startup team", "two developers", "2 developers", "3 developers"],
+    "enterprise": ["enterprise", "large team", "big team"],
+}
+
+
+class ParsedQuery(BaseModel):
+    """What the local parser could pull out of a query (ContextAgent's JSON shape)."""
+    option_a: str
+    option_b: str
+    tech_id_a: Optional[str] = None
+    tech_id_b: Optional[str] = None
+    constraints: List[str] = Field(default_factory=list)
+    use_case: Optional[str] = None
+    team_size: Optional[str] = None
+    timeline: Optional[str] = None
+    budget: Optional[str] = None
+    confidence: str = MEDIUM
+
+
+@lru_cache(maxsize=1)
+def _catalog() -> Tuple[Dict[str, Tuple[str, str]], Dict[str, Tuple[str, str]]]:
+    """
+    (lookup, mentions): lowercased key -> (tech id, display name). `lookup`
+    includes every alias for resolving one side of a split; `mentions` only
+    names/slugs/ids, since short aliases ("do", "next") are ordinary words.
+    """
+    try:
+        with open(TECHS_FILE, "r", encoding="utf-8") as f:
+            techs = json.load(f)
+    except (OSError, ValueError):
+        techs = []
+
+    lookup: Dict[str, Tuple[str, str]] = {}
+    mentions: Dict[str, Tuple[str, str]] = {}
+    for tech in techs:
+        entry = (tech["id"], tech["name"])
+        # "Gin (Go)" should also match plain "gin"
+        bare = re.sub(r"\s*\(.*?\)", "", tech["name"])
+        names = {tech["name"].lower(), bare.lower(), tech["slug"].lower(), tech["id"].lower()}
+        for key in names:
+            mentions.setdefault(key, entry)
+            lookup.setdefault(key, entry)
+        for alias in tech.get("aliases", []):
+            lookup.setdefault(alias.lower(), entry)
+    return lookup, mentions
+
+
+def canonical_tech(name: str) -> str:
+    """Catalog id for a tech name/alias ("Postgres" and "PostgreSQL" agree), else the normalized name."""
+    key = " ".join(name.lower().split())
+    lookup, _ = _catalog()
+    entry = lookup.get(key) or lookup.get(re.sub(r"\s*\(.*?\)", "", key))
+    return entry[0] if entry else key
+
+
+def canonical_constraints(constraints: List[str]) -> Tuple[str, ...]:
+    """Sorted, de-duplicated constraint labels ("low-cost", "cheap" -> "low cost")."""
+    labels = set()
+    for constraint in constraints:
+        text = " ".join(str(constraint).lower().split())
+        labels.update(_match_lexicon(text, CONSTRAINTS) or [text.replace("-", " ")])
+    return tuple(sorted(label for label in labels if label))
+
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] is a whole word/phrase (not part of "reactive")."""
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+def _resolve_suffix(text: str) -> Optional[Tuple[str, str]]:
+    """Catalog tech the left side of a split ends with (longest match)."""
+    lowered = text.lower().rstrip()
+    lookup, _ = _catalog()
+    for key in sorted(lookup, key=len, reverse=True):
+        start = len(lowered) - len(key)
+        if start >= 0 and lowered.endswith(key) and _bounded(lowered, start, len(lowered)):
+            return lookup[key]
+    return None
+
+
+def _resolve_prefix(text: str) -> Optional[Tuple[str, str]]:
+    """Catalog tech the right side of a split starts with (longest match)."""
+    lowered = text.lower().lstrip()
+    lookup, _ = _catalog()
+    for key in sorted(lookup, key=len, reverse=True):
+        if lowered.startswith(key) and _bounded(lowered, 0, len(key)):
+            return lookup[key]
+    return None
+
+
+def _clean_left(text: str) -> str:
+    text = text.strip()
+    while True:
+        stripped = _LEAD.sub("", text, count=1)
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def _clean_right(text: str) -> str:
+    return _TAIL.split(text.strip(), maxsplit=1)[0].strip()
+
+
+def _is_name(text: str) -> bool:
+    return bool(text) and len(text.split()) <= _MAX_UNKNOWN_WORDS
+
+
+def _find_mentions(query: str) -> List[Tuple[str, str]]:
+    """Catalog techs named anywhere in the query, in order, without overlaps."""
+    lowered = query.lower()
+    _, mentions = _catalog()
+    found: List[Tuple[int, int, Tuple[str, str]]] = []
+    for key in sorted(mentions, key=len, reverse=True):
+        for match in re.finditer(re.escape(key), lowered):
+            start, end = match.span()
+            if not _bounded(lowered, start, end):
+                continue
+            if any(s < end and start < e for s, e, _ in found):
+                continue
+            found.append((start, end, mentions[key]))
+    seen, ordered = set(), []
+    for _, _, entry in sorted(found):
+        if entry[0] not in seen:
+            seen.add(entry[0])
+            ordered.append(entry)
+    return ordered
+
+
+def _match_lexicon(text: str, lexicon: Dict[str, List[str]]) -> List[str]:
+    return [
+        label for label, phrases in lexicon.items()
+        if any(re.search(r"(?<![a-z0-9])" + re.escape(p) + r"(?![a-z0-9])", text) for p in phrases)
+    ]
+
+
+def _has_separator(text: str) -> bool:
+    return bool(_SPLIT.search(text) or _SPLIT_OR.search(text))
+
+
+def _split_options(query: str) -> Optional[Tuple[str, str, Optional[str], Optional[str], bool]]:
+    """(a, b, id_a, id_b, both_in_catalog) from an "X vs Y" / "X or Y" query."""
+    match = _SPLIT.search(query) or _SPLIT_OR.search(query)
+    if not match:
+        return None
+    left, right = query[:match.start()], query[match.end():]
+    if _has_separator(_clean_left(left)) or _has_separator(_clean_right(right)):
+        # "X vs Y vs Z": more than two options, not for this parser
+        return None
+
+    tech_a = _resolve_suffix(left)
+    tech_b = _resolve_prefix(right)
+    a = tech_a[1] if tech_a else _clean_left(left)
+    b = tech_b[1] if tech_b else _clean_right(right)
+    if not (_is_name(a) and _is_name(b)) or a.lower() == b.lower():
+        return None
+    return a, b, tech_a[0] if tech_a else None, tech_b[0] if tech_b else None, bool(tech_a and tech_b)
+
+
+def parse_query(query: str) -> Optional[ParsedQuery]:
+    """
+    Parse a comparison query without an LLM. Returns None when the two
+    options can't be identified at all.
+    """
+    query = " ".join(query.split())
+    if not query:
+        return None
+
+    split = _split_options(query)
+    if split is not None:
+        a, b, id_a, id_b, resolved = split
+        confidence = HIGH if resolved else MEDIUM
+    else:
+        mentioned = _find_mentions(query)
+        if len(mentioned) != 2:
+            return None
+        (id_a, a), (id_b, b) = mentioned
+        confidence = MEDIUM
+
+    lowered = query.lower()
+    constraints = _match_lexicon(lowered, CONSTRAINTS)
+    use_cases = _match_lexicon(lowered, USE_CASES)
+    team_sizes = _match_lexicon(lowered, TEAM_SIZES)
+
+    weeks = re.search(r"\b(\d+)\s*(day|week|month)s?\b", lowered)
+    if weeks:
+        timeline = f"{weeks.group(1)} {weeks.group(2)}s"
+    else:
+        timeline = "quick MVP" if "MVP" in constraints else None
+
+    amount = re.search(r"(?:under|below|less than|max|<)?\s*\$\s?\d[\d,]*(?:\s*/\s*(?:month|mo|year|yr)\b)?", lowered)
+    if amount:
+        budget = amount.group(0).strip()
+    elif "low cost" in constraints or "bootstrapped" in constraints:
+        budget = "cost-sensitive"
+    else:
+        budget = None
+
+    return ParsedQuery(
+        option_a=a,
+        option_b=b,
+        tech_id_a=id_a,
+        tech_id_b=id_b,
+        constraints=constraints,
+        use_case=use_cases[0] if use_cases else None,
+        team_size=team_sizes[0] if team_sizes else None,
+        timeline=timeline,
+        budget=budget,
+        confidence=confidence,
+    )
@@ -1,12 +1,12 @@
-import os
 import json
-from groq import Groq
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Handle imports for both module and standalone execution
 try:
     from ..models import ComparisonContext
+    from ..llm import Route, agent_routes
+    from .output_schemas import generate
 except ImportError:
     # Fallback for standalone execution
     import sys
@@ -14,6 +14,8 @@ except ImportError:
     if str(backend_path) not in sys.path:
         sys.path.insert(0, str(backend_path))
     from app.models import ComparisonContext
+    from app.llm import Route, agent_routes
+    from app.agents.output_schemas import generate
 
 # Load .env from project root
 project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -22,17 +24,8 @@ load_dotenv(project_root / ".env")
 load_dotenv(project_root / "backend" / ".env.local", override=True)
 load_dotenv(project_root / "backend" / ".env")
 
-# Initialize Groq client lazily
-_client = None
-
-def get_client():
-    global _client
-    if _client is None:
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables. Please set it in .env or .env.local")
-        _client = Groq(api_key=api_key)
-    return _client
+# Provider preference list (override with RISK_PROVIDERS="provider:model,...")
+ROUTES = [Route("groq", "llama-3.3-70b-versatile"), Route("deepseek", "deepseek-chat")]
 
 async def run(context: ComparisonContext) -> ComparisonContext:
     prompt = f"""
@@ -52,20 +45,15 @@ Output ONLY valid JSON:
 """
 
     try:
-        client = get_client()
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
+        # Validated against the risks schema; re-asked with the errors if it doesn't fit
+        context.risks = await generate(
+            "risks",
+            agent_routes("risk", ROUTES),
+            prompt,
+            context,
             temperature=0.4,
             max_tokens=512
         )
-        response_text = completion.choices[0].message.content.strip()
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join([l for l in lines if not l.startswith("```")])
-        parsed = json.loads(response_text)
-        context.risks = parsed
     except Exception as e:
         print(f"RiskAgent error: {e}")
 
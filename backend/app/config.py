@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import List
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -75,4 +76,245 @@ class Settings(BaseSettings):
     def app_env(self) -> str:
         return os.getenv("APP_ENV", "development")
 
+    # ✅ LLM connection pool limits (per provider, overridable as e.g. GROQ_MAX_CONNECTIONS)
+    def llm_max_connections(self, provider: str) -> int:
+        default = os.getenv("LLM_MAX_CONNECTIONS", "20")
+        return int(os.getenv(f"{provider.upper()}_MAX_CONNECTIONS", default))
+
+    def llm_max_keepalive(self, provider: str) -> int:
+        default = os.getenv("LLM_MAX_KEEPALIVE", "10")
+        return int(os.getenv(f"{provider.upper()}_MAX_KEEPALIVE", default))
+
+    @property
+    def llm_keepalive_expiry(self) -> float:
+        return float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+    # ✅ LLM price overrides, USD per 1M tokens: {"groq:llama-3.3-70b-versatile": [0.59, 0.79], "deepseek": [0.27, 1.1]}
+    @property
+    def llm_prices(self) -> dict:
+        return json.loads(os.getenv("LLM_PRICES", "{}") or "{}")
+
+    # ✅ LLM response cache (memory LRU + on-disk store)
+    @property
+    def llm_cache_enabled(self) -> bool:
+        return os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def llm_cache_max_entries(self) -> int:
+        return int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+    @property
+    def llm_cache_ttl_seconds(self) -> float:
+        return float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    @property
+    def llm_cache_dir(self) -> str:
+        default = Path(__file__).resolve().parent / "data" / "llm_cache"
+        return os.getenv("LLM_CACHE_DIR", str(default))
+
+    @property
+    def llm_cache_disk_max_entries(self) -> int:
+        return int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "10000"))
+
+    # ✅ Hedged provider calls (backup fires after the primary's p-th percentile latency)
+    @property
+    def llm_hedge_enabled(self) -> bool:
+        return os.getenv("LLM_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def llm_hedge_percentile(self) -> float:
+        return float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+
+    @property
+    def llm_hedge_default_delay(self) -> float:
+        return float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "4.0"))
+
+    @property
+    def llm_hedge_min_samples(self) -> int:
+        return int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+    # ✅ Circuit breakers (per provider/model)
+    @property
+    def llm_breaker_failure_threshold(self) -> int:
+        return int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+
+    @property
+    def llm_breaker_cooldown(self) -> float:
+        return float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+    # ✅ Adaptive provider deadlines (p99 latency x multiplier, clamped to min/max)
+    @property
+    def llm_timeout_default(self) -> float:
+        return float(os.getenv("LLM_TIMEOUT_DEFAULT", "30"))
+
+    @property
+    def llm_timeout_min(self) -> float:
+        return float(os.getenv("LLM_TIMEOUT_MIN", "5"))
+
+    @property
+    def llm_timeout_max(self) -> float:
+        return float(os.getenv("LLM_TIMEOUT_MAX", "60"))
+
+    @property
+    def llm_timeout_multiplier(self) -> float:
+        return float(os.getenv("LLM_TIMEOUT_MULTIPLIER", "2.0"))
+
+    @property
+    def llm_timeout_min_samples(self) -> int:
+        return int(os.getenv("LLM_TIMEOUT_MIN_SAMPLES", "20"))
+
+    # ✅ Client-side rate limits per provider (e.g. GROQ_RPM=30, GROQ_TPM=6000; 0 = unlimited)
+    def llm_rpm(self, provider: str) -> float:
+        return float(os.getenv(f"{provider.upper()}_RPM", "0"))
+
+    def llm_tpm(self, provider: str) -> float:
+        return float(os.getenv(f"{provider.upper()}_TPM", "0"))
+
+    # ✅ Compare pipeline deadlines (per stage as e.g. PIPELINE_PERFORMANCE_TIMEOUT; seconds)
+    def pipeline_stage_timeout(self, stage: str, default: float) -> float:
+        return float(os.getenv(f"PIPELINE_{stage.upper()}_TIMEOUT", str(default)))
+
+    @property
+    def pipeline_deadline(self) -> float:
+        return float(os.getenv("PIPELINE_DEADLINE", "120"))
+
+    # ✅ Tracing spans (in-memory ring buffer, optional JSONL file, Server-Timing header)
+    @property
+    def tracing_enabled(self) -> bool:
+        return os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def trace_buffer_size(self) -> int:
+        return int(os.getenv("TRACE_BUFFER_SIZE", "5000"))
+
+    @property
+    def trace_jsonl_path(self) -> str:
+        return os.getenv("TRACE_JSONL_PATH", "")
+
+    # ✅ How often /api/compare and /api/orchestrator/compare check for a disconnected client (seconds)
+    @property
+    def disconnect_poll_interval(self) -> float:
+        return float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.25"))
+
+    # ✅ Background compare jobs (POST /api/compare/jobs): worker pool, queue bound, state dir
+    @property
+    def compare_job_workers(self) -> int:
+        return int(os.getenv("COMPARE_JOB_WORKERS", "4"))
+
+    @property
+    def compare_job_queue_size(self) -> int:
+        return int(os.getenv("COMPARE_JOB_QUEUE_SIZE", "100"))
+
+    @property
+    def compare_job_dir(self) -> str:
+        default = Path(__file__).resolve().parent / "data" / "jobs"
+        return os.getenv("COMPARE_JOB_DIR", str(default))
+
+    @property
+    def compare_job_ttl_seconds(self) -> float:
+        return float(os.getenv("COMPARE_JOB_TTL_SECONDS", str(24 * 3600)))
+
+    # ✅ Decision history: append-only JSONL log (fsync each append for durability over speed)
+    @property
+    def decision_log_path(self) -> str:
+        default = Path(__file__).resolve().parent / "data" / "decisions.jsonl"
+        return os.getenv("DECISION_LOG_PATH", str(default))
+
+    @property
+    def decision_log_fsync(self) -> bool:
+        return os.getenv("DECISION_LOG_FSYNC", "false").lower() in ("1", "true", "yes")
+
+    # ✅ Decision log compaction: checked every interval seconds; runs once at least
+    # min_dead dead records exist and they are dead_ratio of all records or the file passes max_bytes
+    @property
+    def decision_log_compact_interval(self) -> float:
+        return float(os.getenv("DECISION_LOG_COMPACT_INTERVAL", "60"))
+
+    @property
+    def decision_log_compact_dead_ratio(self) -> float:
+        return float(os.getenv("DECISION_LOG_COMPACT_DEAD_RATIO", "0.5"))
+
+    @property
+    def decision_log_compact_max_bytes(self) -> int:
+        return int(os.getenv("DECISION_LOG_COMPACT_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    @property
+    def decision_log_compact_min_dead(self) -> int:
+        return int(os.getenv("DECISION_LOG_COMPACT_MIN_DEAD", "100"))
+
+    # ✅ Batch compare (POST /api/compare/batch): pipelines run at once, items per request
+    @property
+    def compare_batch_concurrency(self) -> int:
+        return int(os.getenv("COMPARE_BATCH_CONCURRENCY", "4"))
+
+    @property
+    def compare_batch_max_items(self) -> int:
+        return int(os.getenv("COMPARE_BATCH_MAX_ITEMS", "500"))
+
+    # ✅ Re-asks (with the validation errors as a hint) when an agent's JSON fails its schema
+    @property
+    def agent_output_retries(self) -> int:
+        return int(os.getenv("AGENT_OUTPUT_RETRIES", "1"))
+
+    # ✅ Specialist agent outputs cached per tech pair + constraints (either order)
+    @property
+    def pair_cache_enabled(self) -> bool:
+        return os.getenv("PAIR_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def pair_cache_max_entries(self) -> int:
+        return int(os.getenv("PAIR_CACHE_MAX_ENTRIES", "2000"))
+
+    @property
+    def pair_cache_ttl_seconds(self) -> float:
+        return float(os.getenv("PAIR_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+    # ✅ Rule-based query parsing before the ContextAgent LLM call
+    @property
+    def local_query_parser(self) -> bool:
+        return os.getenv("LOCAL_QUERY_PARSER", "true").lower() in ("1", "true", "yes")
+
+    # ✅ Start specialist agents on a medium-confidence local parse while the LLM parse runs
+    @property
+    def speculative_specialists(self) -> bool:
+        return os.getenv("SPECULATIVE_SPECIALISTS", "true").lower() in ("1", "true", "yes")
+
+    # ✅ One combined LLM call for the cost/performance/risk agents (per-agent fallback per section)
+    @property
+    def fused_specialists(self) -> bool:
+        return os.getenv("FUSED_SPECIALISTS", "false").lower() in ("1", "true", "yes")
+
+    # ✅ Provider endpoint override (e.g. GROQ_BASE_URL pointing at the mock LLM server)
+    def llm_base_url(self, provider: str) -> str:
+        return os.getenv(f"{provider.upper()}_BASE_URL", "")
+
+    # ✅ Offline mock LLM (per provider overrides as e.g. GROQ_MOCK_P99_MS)
+    @property
+    def llm_mock_enabled(self) -> bool:
+        return os.getenv("LLM_MOCK", "false").lower() in ("1", "true", "yes")
+
+    @property
+    def llm_mock_seed(self) -> int:
+        return int(os.getenv("LLM_MOCK_SEED", "0"))
+
+    def llm_mock_p50_ms(self, provider: str) -> float:
+        default = os.getenv("LLM_MOCK_P50_MS", "200")
+        return float(os.getenv(f"{provider.upper()}_MOCK_P50_MS", default))
+
+    def llm_mock_p99_ms(self, provider: str) -> float:
+        default = os.getenv("LLM_MOCK_P99_MS", "1000")
+        return float(os.getenv(f"{provider.upper()}_MOCK_P99_MS", default))
+
+    def llm_mock_error_rate(self, provider: str) -> float:
+        default = os.getenv("LLM_MOCK_ERROR_RATE", "0")
+        return float(os.getenv(f"{provider.upper()}_MOCK_ERROR_RATE", default))
+
+    def llm_mock_rate_limit_rate(self, provider: str) -> float:
+        default = os.getenv("LLM_MOCK_429_RATE", "0")
+        return float(os.getenv(f"{provider.upper()}_MOCK_429_RATE", default))
+
+    @property
+    def llm_mock_chunk_delay_ms(self) -> float:
+        return float(os.getenv("LLM_MOCK_CHUNK_DELAY_MS", "10"))
+
 settings = Settings()
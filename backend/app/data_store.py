@@ -3,46 +3,80 @@ import os
 import threading
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+try:
+    from .config import settings
+    from .utils.decision_log import LogCompactor, RecordLog
+except ImportError:
+    from app.config import settings
+    from app.utils.decision_log import LogCompactor, RecordLog
 
 # Minimal, file-based decision persistence for Phase 5-Lite
 # - No DB, no Redis
-# - Stores data in backend/app/data/decisions.json
+# - Append-only log in backend/app/data/decisions.jsonl (utils/decision_log.py):
+#   saves append one line, deletes append a tombstone, lookups read one line
+# - Superseded lines and tombstones are dropped by a background compaction
+#   once they pass the DECISION_LOG_COMPACT_* thresholds
+# - The old whole-file decisions.json is imported once when the log is first created
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 DATA_FILE = os.path.join(DATA_DIR, 'decisions.json')
 
-_file_lock = threading.Lock()
-
-
-def _ensure_store_initialized() -> None:
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f, ensure_ascii=False)
-
+_store: Optional[RecordLog] = None
+_store_lock = threading.Lock()
 
-def _read_all() -> List[Dict[str, Any]]:
-    _ensure_store_initialized()
-    with _file_lock:
-        try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return data
-                return []
-        except json.JSONDecodeError:
-            # Corrupted file: reset to empty list
-            return []
-        except FileNotFoundError:
-            return []
 
-
-def _write_all(items: List[Dict[str, Any]]) -> None:
-    _ensure_store_initialized()
-    with _file_lock:
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(items, f, ensure_ascii=False, separators=(',', ':'), indent=0)
+def _read_legacy() -> List[Dict[str, Any]]:
+    try:
+        with open(DATA_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            return data if isinstance(data, list) else []
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def _import_legacy(path: str) -> None:
+    """Build the log from decisions.json in a side file, renamed into place once complete."""
+    # A crash mid-import leaves only the side file, so the next start imports again
+    staging = path + '.import'
+    if os.path.exists(staging):
+        os.remove(staging)
+    log = RecordLog(staging)
+    for item in _read_legacy():
+        norm = _normalize_decision(item if isinstance(item, dict) else {})
+        log.put(norm['id'], norm, norm['timestamp'])
+    log.close()
+    with open(staging, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(staging, path)
+
+
+def open_store() -> RecordLog:
+    """The decision log, opened (index rebuilt from disk) on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = settings.decision_log_path
+                if not os.path.exists(path):
+                    _import_legacy(path)
+                _store = RecordLog(path, fsync=settings.decision_log_fsync)
+    return _store
+
+
+def store_stats() -> Dict[str, Any]:
+    return open_store().stats()
+
+
+# Started/stopped with the app; rewrites the log without its dead records
+compactor = LogCompactor(
+    open_store,
+    interval=settings.decision_log_compact_interval,
+    dead_ratio=settings.decision_log_compact_dead_ratio,
+    max_bytes=settings.decision_log_compact_max_bytes,
+    min_dead=settings.decision_log_compact_min_dead,
+)
 
 
 def _normalize_decision(decision: Dict[str, Any]) -> Dict[str, Any]:
@@ -68,37 +102,23 @@ def _normalize_decision(decision: Dict[str, Any]) -> Dict[str, Any]:
 def save_decision(decision: Dict[str, Any]) -> Dict[str, Any]:
     """Append a decision to the store, generating id/timestamp if missing."""
     item = _normalize_decision(decision)
-    items = _read_all()
-    items.append(item)
-    _write_all(items)
+    open_store().put(item['id'], item, item['timestamp'])
     return item
 
 
 def get_all_decisions() -> List[Dict[str, Any]]:
     """Return all decisions sorted by timestamp desc."""
-    items = _read_all()
-    try:
-        return sorted(items, key=lambda x: x.get('timestamp', 0), reverse=True)
-    except Exception:
-        return items
+    return open_store().values(newest_first=True)
 
 
 def get_decision_by_id(decision_id: str) -> Optional[Dict[str, Any]]:
     if not decision_id:
         return None
-    for item in _read_all():
-        if str(item.get('id')) == str(decision_id):
-            return item
-    return None
+    return open_store().get(str(decision_id))
 
 
 def delete_decision(decision_id: str) -> bool:
-    items = _read_all()
-    new_items = [it for it in items if str(it.get('id')) != str(decision_id)]
-    if len(new_items) == len(items):
-        return False
-    _write_all(new_items)
-    return True
+    return open_store().delete(str(decision_id))
 
 
 # Bulk import and admin helpers
@@ -106,26 +126,16 @@ def import_decisions(decisions: List[Dict[str, Any]]) -> int:
     """Import a list of decisions (dedupe by id). Returns number imported/updated."""
     if not isinstance(decisions, list):
         return 0
-    existing = _read_all()
-    id_to_index = {str(it.get('id')): i for i, it in enumerate(existing) if it.get('id')}
+    store = open_store()
     imported = 0
     for dec in decisions:
         norm = _normalize_decision(dec or {})
-        key = str(norm.get('id'))
-        if key in id_to_index:
-            existing[id_to_index[key]] = norm
-        else:
-            id_to_index[key] = len(existing)
-            existing.append(norm)
+        # A repeated id supersedes the stored version
+        store.put(str(norm['id']), norm, norm['timestamp'])
         imported += 1
-    _write_all(existing)
     return imported
 
 
 def clear_all_decisions() -> int:
     """Delete all decisions. Returns previous count."""
-    items = _read_all()
-    count = len(items)
-    _write_all([])
-    return count
-
+    return open_store().clear()
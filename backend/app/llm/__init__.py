@@ -0,0 +1,26 @@
+# Async LLM provider layer shared by all agents
+from .errors import CircuitOpenError, ProviderError, ProviderTimeout
+from .providers import (
+    LLMProvider,
+    LLMResponse,
+    complete,
+    configured_providers,
+    get_provider,
+    register_provider,
+    stream,
+    uncache,
+)
+from .breaker import breaker_stats
+from .cache import response_cache
+from .hedging import Route, agent_routes, hedge_stats, hedged_complete, hedged_stream
+from .latency import latency_stats
+from .mock import MockProfile, MockProvider, install_mock_providers
+from .registry import registry
+from .scheduler import BATCH, INTERACTIVE, WARMING, priority, scheduler_stats
+from .usage import track_usage, usage_stage, usage_stats, usage_totals
+
+from ..config import settings as _settings
+
+if _settings.llm_mock_enabled:
+    # Offline mode: canned answers for every provider (see mock.py)
+    install_mock_providers()
@@ -0,0 +1,111 @@
+# backend/app/llm/breaker.py
+"""
+Per provider/model circuit breakers and adaptive deadlines.
+
+A breaker opens after consecutive failures so requests skip a provider that
+is down instead of each waiting to time out. After a cooldown it goes
+half-open and lets a single probe through: success closes it, failure
+re-opens it. Deadlines come from observed latency (p99 x multiplier,
+clamped) rather than a fixed guess.
+"""
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+from .latency import latency_tracker
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30.0, half_open_probes: int = 1):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. Reserves a probe slot when half-open."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.probes_in_flight = 0
+        if self.state == HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self.probes_in_flight += 1
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Call ended without a verdict (cancelled, misconfigured): free the probe slot."""
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.times_opened += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+_BREAKERS: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+
+def circuit_breaker(provider: str, model: str) -> CircuitBreaker:
+    key = (provider, model)
+    breaker = _BREAKERS.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            cooldown_seconds=settings.llm_breaker_cooldown,
+        )
+        _BREAKERS[key] = breaker
+    return breaker
+
+
+def deadline(provider: str, model: str, kind: str = "complete") -> float:
+    """Seconds a call (or first streamed chunk) may take before it is abandoned."""
+    tracker = latency_tracker(provider, model, kind)
+    if len(tracker) < settings.llm_timeout_min_samples:
+        return settings.llm_timeout_default
+    observed = tracker.percentile(99) * settings.llm_timeout_multiplier
+    return min(settings.llm_timeout_max, max(settings.llm_timeout_min, observed))
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    result = {}
+    for (provider, model), breaker in sorted(_BREAKERS.items()):
+        entry = breaker.to_dict()
+        entry["deadline"] = round(deadline(provider, model), 3)
+        result[f"{provider}:{model}"] = entry
+    return result
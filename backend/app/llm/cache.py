@@ -0,0 +1,198 @@
+# backend/app/llm/cache.py
+"""
+Content-addressed cache for LLM responses.
+
+Entries are keyed on a SHA-256 of (provider, model, normalized prompt,
+temperature, max_tokens). Lookups hit a bounded in-memory LRU first, then a
+local on-disk store (one JSON file per key) that survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so cosmetic prompt differences share an entry."""
+    return _WHITESPACE.sub(" ", prompt or "").strip()
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    prompt: str,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    payload = json.dumps(
+        [provider, model, normalize_prompt(system or ""), normalize_prompt(prompt), temperature, max_tokens],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskStore:
+    """One JSON file per key under `root/<2-char prefix>/<key>.json`."""
+
+    def __init__(self, root: str, max_entries: int = 10000):
+        self.root = root
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        # Atomic swap so a crash never leaves a half-written entry
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, ttl_seconds: Optional[float]) -> int:
+        """Drop expired entries, then the oldest beyond `max_entries`. Returns files removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        now = time.time()
+        files = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        files.sort()
+        removed = 0
+        excess = len(files) - self.max_entries
+        for mtime, path in files:
+            expired = ttl_seconds is not None and now - mtime > ttl_seconds
+            if expired or excess > 0 or path.endswith(".tmp"):
+                try:
+                    os.remove(path)
+                    removed += 1
+                    excess -= 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class ResponseCache:
+    """Memory LRU in front of the disk store, with hit/miss counters."""
+
+    def __init__(
+        self,
+        root: str,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = None,
+        disk_max_entries: int = 10000,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self._memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._disk = DiskStore(root, max_entries=disk_max_entries)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.disk_errors = 0
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return time.time() - entry.get("created_at", 0) > self.ttl_seconds
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        entry = self._memory.get(key)
+        if entry is not None:
+            self.memory_hits += 1
+            return entry
+        try:
+            entry = await asyncio.to_thread(self._disk.read, key)
+        except OSError as e:
+            self.disk_errors += 1
+            logger.warning(f"LLM cache disk read failed: {e}")
+            entry = None
+        if entry is not None and not self._expired(entry):
+            self.disk_hits += 1
+            # Promote to memory, keeping the original age for TTL purposes
+            self._memory.set(key, entry, stored_at=entry.get("created_at"))
+            return entry
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        entry = dict(entry)
+        entry.setdefault("created_at", time.time())
+        self._memory.set(key, entry, stored_at=entry["created_at"])
+        self.writes += 1
+        try:
+            await asyncio.to_thread(self._disk.write, key, entry)
+        except OSError as e:
+            self.disk_errors += 1
+            logger.warning(f"LLM cache disk write failed: {e}")
+
+    async def invalidate(self, key: str) -> None:
+        self._memory.delete(key)
+        await asyncio.to_thread(self._disk.delete, key)
+
+    async def prune(self) -> int:
+        return await asyncio.to_thread(self._disk.prune, self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_max_entries": self._memory.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self._memory.evictions,
+            "expirations": self._memory.expirations,
+            "disk_errors": self.disk_errors,
+        }
+
+
+response_cache = ResponseCache(
+    root=settings.llm_cache_dir,
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    disk_max_entries=settings.llm_cache_disk_max_entries,
+    enabled=settings.llm_cache_enabled,
+)
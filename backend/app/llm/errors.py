@@ -0,0 +1,16 @@
+# backend/app/llm/errors.py
+"""
+Exceptions raised by the LLM provider layer.
+"""
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot be used (missing API key, SDK or registration)."""
+
+
+class CircuitOpenError(ProviderError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+class ProviderTimeout(ProviderError):
+    """Raised when a provider misses its adaptive deadline."""
@@ -0,0 +1,224 @@
+# backend/app/llm/hedging.py
+"""
+Hedged and failover provider calls.
+
+Each agent declares an ordered provider preference list (routes). The first
+route is called right away; if it hasn't answered within its observed
+p-th percentile latency, the next route is fired as a backup. Whichever
+answers first wins and the others are cancelled. A route that fails hands
+over to the next one immediately instead of waiting out a timeout.
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..config import settings
+from ..utils.tracing import Span, span, start_span
+from .latency import latency_tracker
+from .errors import ProviderError
+from .providers import LLMResponse, complete, get_provider, stream
+
+
+class Route:
+    """One provider/model option, with optional per-route parameter overrides."""
+
+    def __init__(self, provider: str, model: Optional[str] = None, **params: Any):
+        self.provider = provider
+        self.model = model
+        self.params = params
+
+    def model_name(self) -> str:
+        return self.model or get_provider(self.provider).default_model
+
+    def __repr__(self) -> str:
+        return f"{self.provider}:{self.model}" if self.model else self.provider
+
+
+class HedgeStats:
+    def __init__(self):
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.exhausted = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+hedge_stats = HedgeStats()
+
+
+def parse_routes(spec: str) -> List[Route]:
+    """Parse "gemini:gemini-1.5-flash-latest,groq:llama-3.3-70b-versatile"."""
+    routes = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        provider, _, model = part.partition(":")
+        routes.append(Route(provider.strip(), model.strip() or None))
+    return routes
+
+
+def agent_routes(agent: str, default: List[Route]) -> List[Route]:
+    """
+    Provider preference list for `agent`, overridable with <AGENT>_PROVIDERS.
+    Routes whose provider isn't configured are skipped; if none are, the first
+    route is kept so the caller still gets a meaningful error.
+    """
+    spec = os.getenv(f"{agent.upper()}_PROVIDERS")
+    routes = parse_routes(spec) if spec else list(default)
+    usable = []
+    for route in routes:
+        try:
+            if get_provider(route.provider).is_configured():
+                usable.append(route)
+        except ProviderError:
+            continue
+    return usable or routes[:1]
+
+
+def hedge_delay(route: Route, kind: str = "complete") -> float:
+    """Seconds to wait on `route` before firing a backup."""
+    tracker = latency_tracker(route.provider, route.model_name(), kind)
+    if len(tracker) < settings.llm_hedge_min_samples:
+        return settings.llm_hedge_default_delay
+    return max(0.05, tracker.percentile(settings.llm_hedge_percentile))
+
+
+async def _race(routes: List[Route], start, kind: str, trace: Span):
+    """
+    Shared hedging loop. `start(route)` returns an awaitable attempt; returns
+    (winning route, result, still-running attempts) or raises ProviderError.
+    Attempts, hedges and failovers are recorded on `trace`.
+    """
+    if not routes:
+        raise ProviderError("No provider routes configured")
+
+    queue = list(routes)
+    running: Dict[asyncio.Task, Route] = {}
+    hedged = set()
+    errors = []
+    last_error: Optional[BaseException] = None
+    hedge_stats.calls += 1
+
+    def launch() -> Route:
+        route = queue.pop(0)
+        running[asyncio.ensure_future(start(route))] = route
+        trace.set(attempts=len(routes) - len(queue))
+        return route
+
+    current = launch()
+    try:
+        while running:
+            timeout = hedge_delay(current, kind) if settings.llm_hedge_enabled and queue else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Primary is slower than usual: fire a backup alongside it
+                hedge_stats.hedges += 1
+                current = launch()
+                trace.set(hedged=True)
+                hedged.add(id(current))
+                continue
+            for task in done:
+                route = running.pop(task)
+                if task.exception() is None:
+                    if id(route) in hedged:
+                        hedge_stats.hedge_wins += 1
+                    trace.set(winner=str(route))
+                    return route, task.result(), running
+                last_error = task.exception()
+                errors.append(f"{route}: {last_error}")
+            if not running and queue:
+                hedge_stats.failovers += 1
+                current = launch()
+                trace.set(failovers=trace.attributes.get("failovers", 0) + 1)
+    except BaseException:
+        _cancel(running)
+        raise
+
+    hedge_stats.exhausted += 1
+    raise ProviderError("All providers failed: " + "; ".join(errors)) from last_error
+
+
+def _cancel(running: Dict[asyncio.Task, Route]) -> None:
+    """Cancel losing attempts; their provider calls stop once nobody else awaits them."""
+    for task in running:
+        task.cancel()
+        task.add_done_callback(_consume_result)
+
+
+def _consume_result(task: asyncio.Task) -> None:
+    # Losers may still finish with an error; mark it retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+async def hedged_complete(
+    routes: List[Route],
+    prompt: str,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> LLMResponse:
+    """
+    `complete()` across a provider preference list with hedging and failover.
+    Route-level params (e.g. temperature) override the call-level ones.
+    """
+    def start(route: Route):
+        params = {"temperature": temperature, "max_tokens": max_tokens, **route.params}
+        return complete(route.provider, prompt, model=route.model, system=system, use_cache=use_cache, **params)
+
+    with span("llm.hedged", routes=[str(r) for r in routes]) as trace:
+        _, response, losers = await _race(routes, start, "complete", trace)
+    _cancel(losers)
+    return response
+
+
+async def hedged_stream(
+    routes: List[Route],
+    prompt: str,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """
+    `stream()` across a provider preference list. Routes race to their first
+    chunk; the winner's stream is relayed and the rest are closed. Failures
+    after the first chunk are not retried.
+    """
+    streams: Dict[int, AsyncIterator[str]] = {}
+    # Not made current: context changes inside a generator leak into the consumer
+    trace = start_span("llm.hedged", routes=[str(r) for r in routes], stream=True)
+
+    async def start(route: Route) -> Optional[str]:
+        params = {"temperature": temperature, "max_tokens": max_tokens, **route.params}
+        agen = stream(route.provider, prompt, model=route.model, system=system, use_cache=use_cache, **params)
+        streams[id(route)] = agen
+        try:
+            return await agen.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    try:
+        winner, first, losers = await _race(routes, start, "first_chunk", trace)
+        _cancel(losers)
+        if first is None:
+            return
+        yield first
+        async for chunk in streams[id(winner)]:
+            yield chunk
+    except BaseException as e:
+        trace.finish(e)
+        raise
+    finally:
+        trace.finish()
+        for agen in streams.values():
+            try:
+                await agen.aclose()
+            except Exception:
+                pass
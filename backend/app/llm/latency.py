@@ -0,0 +1,66 @@
+# backend/app/llm/latency.py
+"""
+Observed latency per provider/model.
+
+Keeps a window of recent successful call durations plus an EWMA, so the
+provider layer can derive hedge delays and deadlines from real behaviour
+instead of fixed guesses.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class LatencyTracker:
+    """Sliding window of latencies (seconds) with percentile and EWMA."""
+
+    def __init__(self, window: int = 200, alpha: float = 0.2):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p in [0, 100]; None until at least one sample exists."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def fmt(value: Optional[float]) -> Optional[float]:
+            return round(value, 4) if value is not None else None
+
+        return {
+            "samples": len(self._samples),
+            "ewma": fmt(self.ewma),
+            "p50": fmt(self.percentile(50)),
+            "p95": fmt(self.percentile(95)),
+            "p99": fmt(self.percentile(99)),
+        }
+
+
+# (provider, model, kind) -> tracker; kind is "complete" or "first_chunk"
+_TRACKERS: Dict[Tuple[str, str, str], LatencyTracker] = {}
+
+
+def latency_tracker(provider: str, model: str, kind: str = "complete") -> LatencyTracker:
+    key = (provider, model, kind)
+    tracker = _TRACKERS.get(key)
+    if tracker is None:
+        tracker = LatencyTracker()
+        _TRACKERS[key] = tracker
+    return tracker
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    return {f"{p}:{m}:{k}": t.to_dict() for (p, m, k), t in sorted(_TRACKERS.items())}
@@ -0,0 +1,334 @@
+# backend/app/llm/mock.py
+"""
+Deterministic stand-in for Groq, DeepSeek and Gemini, for offline load and
+latency testing.
+
+With LLM_MOCK=true every provider is replaced by a `MockProvider` that
+answers each agent prompt with schema-valid JSON (or brief text for the
+narrative), so the full multi-agent pipeline runs with no keys and no
+network. Latency follows a log-normal distribution fitted to a p50/p99
+pair, and errors and 429s are injected at configurable rates; all of it is
+per provider (e.g. GROQ_MOCK_P99_MS=4000) and seeded by LLM_MOCK_SEED, so
+repeated runs give the same numbers.
+
+`create_mock_app()` serves the same answers over the OpenAI chat-completions
+API (Groq and DeepSeek speak it), for exercising the real SDK clients and
+connection pools:
+
+    uvicorn app.llm.mock:create_mock_app --factory --port 9100
+    GROQ_BASE_URL=http://localhost:9100 DEEPSEEK_BASE_URL=http://localhost:9100/v1
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+import zlib
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from ..config import settings
+from .providers import LLMProvider, register_provider
+
+# z-score of the 99th percentile of a standard normal
+_Z99 = 2.3263
+
+
+class MockProviderError(Exception):
+    """Injected provider failure; carries an HTTP status like the real SDK errors."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MockProfile:
+    """Latency distribution and fault rates for one mocked provider."""
+
+    def __init__(
+        self,
+        p50_ms: float = 200.0,
+        p99_ms: float = 1000.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        chunk_delay_ms: float = 10.0,
+        seed: int = 0,
+    ):
+        self.p50 = max(p50_ms, 0.0) / 1000.0
+        self.p99 = max(p99_ms, p50_ms) / 1000.0
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_delay = max(chunk_delay_ms, 0.0) / 1000.0
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_settings(cls, provider: str) -> "MockProfile":
+        return cls(
+            p50_ms=settings.llm_mock_p50_ms(provider),
+            p99_ms=settings.llm_mock_p99_ms(provider),
+            error_rate=settings.llm_mock_error_rate(provider),
+            rate_limit_rate=settings.llm_mock_rate_limit_rate(provider),
+            chunk_delay_ms=settings.llm_mock_chunk_delay_ms,
+            # Stable per provider so providers don't share one random sequence
+            seed=settings.llm_mock_seed + zlib.crc32(provider.encode("utf-8")),
+        )
+
+    def latency(self) -> float:
+        """Seconds for the next call, log-normal with the configured p50/p99."""
+        if self.p50 <= 0:
+            return 0.0
+        sigma = math.log(self.p99 / self.p50) / _Z99
+        return self.p50 * math.exp(sigma * self.rng.gauss(0.0, 1.0))
+
+    def fault(self) -> Optional[MockProviderError]:
+        """The error to inject for the next call, if any."""
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return MockProviderError("Mock rate limit exceeded", status_code=429)
+        if roll < self.rate_limit_rate + self.error_rate:
+            return MockProviderError("Mock provider error", status_code=500)
+        return None
+
+
+class MockProvider(LLMProvider):
+    """Replaces a real provider with canned, prompt-aware answers."""
+
+    def __init__(self, name: str, default_model: str = "mock", profile: Optional[MockProfile] = None):
+        self.name = name
+        self.default_model = default_model
+        self.profile = profile or MockProfile.from_settings(name)
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        delay, error = self.profile.latency(), self.profile.fault()
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return mock_response(prompt)
+
+    async def _stream(self, prompt, model, system, temperature, max_tokens) -> AsyncIterator[str]:
+        # Sampled latency is time to first chunk; the rest trickles out
+        text = await self._generate(prompt, model, system, temperature, max_tokens)
+        for i, word in enumerate(text.split(" ")):
+            if i:
+                await asyncio.sleep(self.profile.chunk_delay)
+            yield word if i == 0 else " " + word
+
+
+def install_mock_providers(names: Tuple[str, ...] = ("groq", "deepseek", "gemini")) -> None:
+    """Register a `MockProvider` in place of each named provider."""
+    for name in names:
+        register_provider(MockProvider(name))
+
+
+# ---------------------------------------------------------------------------
+# Canned answers
+# ---------------------------------------------------------------------------
+
+def _pair(prompt: str, pattern: str) -> Tuple[str, str]:
+    match = re.search(pattern, prompt)
+    if not match:
+        return "Option A", "Option B"
+    return match.group(1).strip(), match.group(2).strip()
+
+
+def _rng(*parts: str) -> random.Random:
+    # Same options -> same numbers, whatever the call order
+    digest = hashlib.sha256("\x00".join(parts).lower().encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def _context(prompt: str) -> Dict:
+    match = re.search(r'User query: "(.*)"', prompt)
+    query = match.group(1) if match else ""
+    a, b = _pair(query, r"(?i)^(?:compare\s+)?(.+?)\s+(?:vs\.?|versus|or)\s+(.+?)(?:\s+for\b.*)?[?.!]?$")
+    lowered = query.lower().replace("-", " ")
+    constraints = [word for word in ("MVP", "low cost", "bootstrapped", "mobile first", "real time")
+                   if word.lower() in lowered]
+    return {
+        "option_a": a,
+        "option_b": b,
+        "constraints": constraints,
+        "use_case": None,
+        "team_size": None,
+        "timeline": None,
+        "budget": "cost-sensitive" if "cost" in query.lower() else None,
+    }
+
+
+def _cost(a: str, b: str) -> Dict:
+    rng = _rng("cost", a, b)
+    levels = [1000, 10000, 50000]
+    costs_a = sorted(rng.randrange(0, 60) * 5 * (i + 1) for i in range(3))
+    costs_b = sorted(rng.randrange(0, 60) * 5 * (i + 1) for i in range(3))
+    return {
+        "year1_tco": {"a": costs_a[1] * 12, "b": costs_b[1] * 12},
+        "breakeven_users": rng.choice([5000, 20000, 40000, 100000]),
+        "slider_data": {"users_levels": levels, "costs_a": costs_a, "costs_b": costs_b},
+        "traps": [f"{a} overage pricing past the free tier", f"{b} paid add-ons for advanced features"],
+    }
+
+
+def _performance(a: str, b: str) -> Dict:
+    rng = _rng("performance", a, b)
+    return {
+        "benchmarks": {
+            "latency_ms": {"a": rng.randrange(20, 300), "b": rng.randrange(20, 300)},
+            "scalability": {"a": "strong to 100K users", "b": "strong to 50K users"},
+        },
+        "war_stories": [f"One team cut p95 latency by moving hot paths from {b} to {a}"],
+    }
+
+
+def _risks(a: str, b: str) -> Dict:
+    rng = _rng("risks", a, b)
+    return {
+        "gotchas_a": [f"{a} vendor lock-in", "Pricing changes at scale"],
+        "gotchas_b": [f"{b} smaller ecosystem"],
+        "migration_effort": {
+            "a_to_b": f"{rng.randrange(2, 10)} days",
+            "b_to_a": f"{rng.randrange(1, 4)} weeks",
+        },
+        "dx_notes": [f"{a} has better docs", f"{b} has simpler local setup"],
+    }
+
+
+def _metrics(a: str, b: str) -> Dict:
+    rng = _rng("metrics", a, b)
+    metrics = []
+    for name in ("Performance", "Ease of Use", "Community Support", "Cost"):
+        score_a, score_b = rng.randrange(60, 96), rng.randrange(60, 96)
+        metrics.append({
+            "name": name,
+            "A": score_a,
+            "B": score_b,
+            "delta": f"{round((score_a - score_b) / score_b * 100):+d}%",
+            "explanation": f"How {a} and {b} compare on {name.lower()}",
+            "A_reason": f"{a} scores {score_a} on {name.lower()} in mock data.",
+            "B_reason": f"{b} scores {score_b} on {name.lower()} in mock data.",
+        })
+    return {
+        "left": a,
+        "right": b,
+        "metrics": metrics,
+        "summary": f"Mock comparison of {a} and {b}.",
+        "confidence": "medium",
+        "evidence": ["Deterministic mock data"],
+    }
+
+
+def _profile(prompt: str) -> Dict:
+    name = re.search(r"Technology to profile: (.+)", prompt).group(1).strip()
+    match = re.search(r"Metrics: (.+)", prompt)
+    names = [m.strip() for m in match.group(1).split(",")] if match else ["Performance", "Ease of Use"]
+    rng = _rng("profile", name)
+    metrics = []
+    for metric in names:
+        score = rng.randrange(55, 96)
+        metrics.append({"name": metric, "score": score, "reason": f"{name} scores {score} on {metric.lower()} in mock data."})
+    return {"name": name, "metrics": metrics, "evidence": [f"Deterministic mock profile of {name}"]}
+
+
+def _narrative(prompt: str) -> str:
+    match = re.search(r'Start with: "Pick (.+?)\. Here', prompt)
+    winner = match.group(1) if match else "the first option"
+    return (
+        f"Pick {winner}. Here's why.\n\n"
+        f"You said cost matters, and {winner} keeps your Year 1 bill lower while you find product-market fit. "
+        f"It also gets you shipping faster because the defaults are sensible.\n\n"
+        f"The catch? You'll want to revisit this once you pass the breakeven point. "
+        f"Until then, {winner} wins."
+    )
+
+
+def mock_response(prompt: str) -> str:
+    """Schema-valid answer for whichever agent wrote `prompt`."""
+    if "combined analysis in one pass" in prompt:
+        a, b = _pair(prompt, r"Compare (.+?) \(A\) vs (.+?) \(B\)")
+        return json.dumps({"cost_breakdown": _cost(a, b), "performance": _performance(a, b), "risks": _risks(a, b)})
+    if "query parser" in prompt:
+        return json.dumps(_context(prompt))
+    if "cost analyst" in prompt:
+        return json.dumps(_cost(*_pair(prompt, r"Compare (.+?) vs (.+?)\.\n")))
+    if "Compare performance of" in prompt:
+        return json.dumps(_performance(*_pair(prompt, r"Compare performance of (.+?) vs (.+?) using")))
+    if "Analyze risks" in prompt:
+        return json.dumps(_risks(*_pair(prompt, r"migration paths for (.+?) vs (.+?)\.\n")))
+    if "Technology to profile:" in prompt:
+        return json.dumps(_profile(prompt))
+    if "Options to compare:" in prompt:
+        return json.dumps(_metrics(*_pair(prompt, r"Options to compare: (.+?) vs (.+)")))
+    return _narrative(prompt)
+
+
+# ---------------------------------------------------------------------------
+# OpenAI-compatible HTTP server
+# ---------------------------------------------------------------------------
+
+def create_mock_app():
+    """FastAPI app serving /v1/chat/completions (DeepSeek) and /openai/v1/... (Groq)."""
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI(title="PM Architect mock LLM")
+    profiles: Dict[str, MockProfile] = {}
+
+    def profile(model: str) -> MockProfile:
+        if model not in profiles:
+            provider = "deepseek" if model.startswith("deepseek") else "groq"
+            profiles[model] = MockProfile.from_settings(provider)
+        return profiles[model]
+
+    def chunk(completion_id: str, model: str, delta: Dict, finish: Optional[str] = None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    async def chat_completions(body: Dict):
+        model = body.get("model", "mock")
+        prompt = "\n\n".join(m.get("content", "") for m in body.get("messages", []))
+        mock = profile(model)
+        delay, error = mock.latency(), mock.fault()
+        await asyncio.sleep(delay)
+        if error is not None:
+            return JSONResponse(
+                {"error": {"message": str(error), "type": "mock_error", "code": error.status_code}},
+                status_code=error.status_code,
+            )
+
+        text = mock_response(prompt)
+        completion_id = f"chatcmpl-mock-{int(time.time() * 1000)}"
+        if body.get("stream"):
+            async def events():
+                yield chunk(completion_id, model, {"role": "assistant", "content": ""})
+                for i, word in enumerate(text.split(" ")):
+                    if i:
+                        await asyncio.sleep(mock.chunk_delay)
+                    yield chunk(completion_id, model, {"content": word if i == 0 else " " + word})
+                yield chunk(completion_id, model, {}, finish="stop")
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(text) // 4
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    app.post("/v1/chat/completions")(chat_completions)
+    app.post("/openai/v1/chat/completions")(chat_completions)
+    return app
@@ -0,0 +1,500 @@
+# backend/app/llm/providers.py
+"""
+Async LLM provider layer for PM Architect.
+
+Every agent goes through `complete()` instead of holding its own SDK client,
+so provider calls never block the event loop:
+- Groq and DeepSeek use their async chat-completions clients
+- Gemini uses `generate_content_async`
+
+Clients come from the shared pooled registry in `registry.py`, and
+responses are served from the content-addressed cache in `cache.py` when
+the same request was answered before. Identical requests that are already
+in flight share one provider call. Each call waits for its provider's
+rate limits (`scheduler.py`) and is guarded by a per provider/model circuit
+breaker and an adaptive deadline (`breaker.py`).
+"""
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from groq import AsyncGroq
+from openai import AsyncOpenAI
+
+# Optional: import Gemini SDK if available
+try:
+    import google.generativeai as genai
+    GENAI_AVAILABLE = True
+except ImportError:
+    GENAI_AVAILABLE = False
+
+from ..config import settings
+from ..utils.metrics import llm_calls
+from ..utils.singleflight import SingleFlight
+from ..utils.tracing import span, start_span
+from .breaker import circuit_breaker, deadline
+from .cache import cache_key, response_cache
+from .errors import CircuitOpenError, ProviderError, ProviderTimeout
+from .latency import latency_tracker
+from .registry import registry
+from .scheduler import is_rate_limit_error, scheduler
+from .tokens import estimate_request_tokens, estimate_tokens
+from .usage import capture_usage, record_usage, report_usage, usage_for
+
+
+class LLMResponse:
+    """Response wrapper that tracks whether data is from real API or stub."""
+    def __init__(
+        self,
+        text: str,
+        is_stub: bool = False,
+        error: str = None,
+        provider: str = None,
+        model: str = None,
+        latency: float = 0.0,
+        cached: bool = False,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        usage_estimated: bool = True,
+    ):
+        self.text = text
+        self.is_stub = is_stub
+        self.error = error
+        self.provider = provider
+        self.model = model
+        self.latency = latency
+        self.cached = cached
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.usage_estimated = usage_estimated
+        # Response cache entry holding this text, if it was stored or served from one
+        self.cache_key: Optional[str] = None
+
+
+class LLMProvider:
+    """
+    Base class for async providers. Subclasses implement `_generate` and,
+    when the API supports it, `_stream` for incremental output.
+    """
+    name = ""
+    default_model = ""
+
+    def is_configured(self) -> bool:
+        """Whether credentials/SDKs are present, so routing can skip dead options."""
+        return True
+
+    async def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        model_name = model or self.default_model
+        await scheduler(self.name).acquire(estimate_request_tokens(prompt, system, max_tokens))
+        breaker = self._admit(model_name)
+        stats = registry.provider_stats(self.name)
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        start = time.perf_counter()
+        timeout = deadline(self.name, model_name)
+        try:
+            with capture_usage() as reported:
+                text = await asyncio.wait_for(
+                    self._generate(prompt, model_name, system, temperature, max_tokens),
+                    timeout=timeout,
+                )
+        except BaseException as e:
+            self._record_failure(breaker, stats, e)
+            llm_calls.observe(time.perf_counter() - start, self.name, model_name, _call_status(e))
+            if isinstance(e, asyncio.TimeoutError):
+                raise ProviderTimeout(f"{self.name}:{model_name} exceeded {timeout:.1f}s deadline") from e
+            raise
+        finally:
+            stats.in_flight -= 1
+        breaker.record_success()
+        latency = time.perf_counter() - start
+        latency_tracker(self.name, model_name).record(latency)
+        llm_calls.observe(latency, self.name, model_name, "ok")
+        prompt_tokens, completion_tokens, estimated = usage_for(reported, prompt, system, text)
+        return LLMResponse(
+            text=text,
+            provider=self.name,
+            model=model_name,
+            latency=latency,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            usage_estimated=estimated,
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield response text chunks as the provider produces them. The adaptive
+        deadline applies to the first chunk; later chunks may each take up to
+        LLM_TIMEOUT_MAX.
+        """
+        model_name = model or self.default_model
+        # Not made current: context changes inside a generator leak into the consumer
+        call_span = start_span("llm.stream", provider=self.name, model=model_name)
+        try:
+            await scheduler(self.name).acquire(estimate_request_tokens(prompt, system, max_tokens))
+            breaker = self._admit(model_name)
+        except BaseException as e:
+            call_span.finish(e)
+            raise
+        stats = registry.provider_stats(self.name)
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        start = time.perf_counter()
+        timeout = deadline(self.name, model_name, "first_chunk")
+        chunks = self._stream(prompt, model_name, system, temperature, max_tokens)
+        first = True
+        tokens_out = 0
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    break
+                if first:
+                    first_chunk = time.perf_counter() - start
+                    latency_tracker(self.name, model_name, "first_chunk").record(first_chunk)
+                    call_span.set(first_chunk=round(first_chunk, 4))
+                    timeout = settings.llm_timeout_max
+                    first = False
+                tokens_out += estimate_tokens(chunk)
+                yield chunk
+        except BaseException as e:
+            self._record_failure(breaker, stats, e)
+            llm_calls.observe(time.perf_counter() - start, self.name, model_name, _call_status(e))
+            call_span.finish(e)
+            if isinstance(e, asyncio.TimeoutError):
+                raise ProviderTimeout(f"{self.name}:{model_name} stream stalled for {timeout:.1f}s") from e
+            raise
+        finally:
+            stats.in_flight -= 1
+            await chunks.aclose()
+        breaker.record_success()
+        llm_calls.observe(time.perf_counter() - start, self.name, model_name, "ok")
+        call_span.set(tokens_in=estimate_tokens(prompt) + estimate_tokens(system), tokens_out=tokens_out)
+        call_span.finish()
+
+    def _admit(self, model: str):
+        """Breaker for this provider/model; raises at once if it is open."""
+        breaker = circuit_breaker(self.name, model)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{self.name}:{model} circuit open, skipping call")
+        return breaker
+
+    def _record_failure(self, breaker, stats, error: BaseException) -> None:
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit, ProviderError)):
+            # Caller gave up or provider is misconfigured: not a health signal
+            breaker.release()
+            return
+        stats.errors += 1
+        if isinstance(error, asyncio.TimeoutError):
+            stats.timeouts += 1
+        if is_rate_limit_error(error):
+            scheduler(self.name).on_rate_limited()
+        breaker.record_failure()
+
+    async def _generate(
+        self,
+        prompt: str,
+        model: str,
+        system: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt, model, system, temperature, max_tokens) -> AsyncIterator[str]:
+        # Providers without native streaming deliver the whole text as one chunk
+        yield await self._generate(prompt, model, system, temperature, max_tokens)
+
+
+def _call_status(error: BaseException) -> str:
+    """Metric label for a failed provider call."""
+    if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+        return "cancelled"
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if is_rate_limit_error(error):
+        return "rate_limited"
+    return "error"
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Shared chat-completions path for Groq and DeepSeek."""
+    api_key_env = ""
+
+    def _create_client(self, api_key: str, http_client):
+        raise NotImplementedError
+
+    def is_configured(self) -> bool:
+        return bool(os.getenv(self.api_key_env))
+
+    def get_client(self):
+        api_key = os.getenv(self.api_key_env)
+        if not api_key:
+            raise ProviderError(
+                f"{self.api_key_env} not found in environment variables. Please set it in .env or .env.local"
+            )
+        return registry.sdk_client(self.name, lambda http_client: self._create_client(api_key, http_client))
+
+    def _request_kwargs(self, prompt, model, system, temperature, max_tokens) -> Dict:
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        kwargs = {"model": model, "messages": messages}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        return kwargs
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        kwargs = self._request_kwargs(prompt, model, system, temperature, max_tokens)
+        completion = await self.get_client().chat.completions.create(**kwargs)
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            report_usage(usage.prompt_tokens, usage.completion_tokens)
+        return (completion.choices[0].message.content or "").strip()
+
+    async def _stream(self, prompt, model, system, temperature, max_tokens) -> AsyncIterator[str]:
+        kwargs = self._request_kwargs(prompt, model, system, temperature, max_tokens)
+        chunks = await self.get_client().chat.completions.create(stream=True, **kwargs)
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class GroqProvider(OpenAICompatibleProvider):
+    name = "groq"
+    default_model = "llama-3.3-70b-versatile"
+    api_key_env = "GROQ_API_KEY"
+
+    def _create_client(self, api_key: str, http_client):
+        return AsyncGroq(api_key=api_key, base_url=settings.llm_base_url(self.name) or None, http_client=http_client)
+
+
+class DeepSeekProvider(OpenAICompatibleProvider):
+    name = "deepseek"
+    default_model = "deepseek-chat"
+    api_key_env = "DEEPSEEK_API_KEY"
+
+    def _create_client(self, api_key: str, http_client):
+        base_url = settings.llm_base_url(self.name) or "https://api.deepseek.com"
+        return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    @property
+    def default_model(self) -> str:
+        return settings.gemini_model
+
+    def is_configured(self) -> bool:
+        return GENAI_AVAILABLE and bool(settings.gemini_api_key)
+
+    def _model(self, model, temperature, max_tokens):
+        if not GENAI_AVAILABLE:
+            raise ProviderError("google-generativeai SDK not installed")
+        api_key = settings.gemini_api_key
+        if not api_key:
+            raise ProviderError("GEMINI_API_KEY not found in environment variables")
+
+        generation_config = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if max_tokens is not None:
+            generation_config["max_output_tokens"] = max_tokens
+
+        return registry.gemini_model(genai, api_key, model, generation_config)
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        gemini_model = self._model(model, temperature, max_tokens)
+        response = await gemini_model.generate_content_async(_join_system(system, prompt))
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            report_usage(usage.prompt_token_count, usage.candidates_token_count)
+        return response.text
+
+    async def _stream(self, prompt, model, system, temperature, max_tokens) -> AsyncIterator[str]:
+        gemini_model = self._model(model, temperature, max_tokens)
+        response = await gemini_model.generate_content_async(_join_system(system, prompt), stream=True)
+        async for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+
+def _join_system(system: Optional[str], prompt: str) -> str:
+    # Gemini has no separate system role in this SDK version; prepend it
+    return f"{system}\n\n{prompt}" if system else prompt
+
+
+_PROVIDERS: Dict[str, LLMProvider] = {}
+
+# Coalesces identical in-flight completions across agents and requests
+_flights = SingleFlight("llm")
+
+
+def register_provider(provider: LLMProvider) -> None:
+    """Register (or replace) the provider used for `provider.name`."""
+    _PROVIDERS[provider.name] = provider
+
+
+def get_provider(name: str) -> LLMProvider:
+    provider = _PROVIDERS.get(name)
+    if provider is None:
+        raise ProviderError(f"Unknown LLM provider: {name}")
+    return provider
+
+
+async def complete(
+    provider: str,
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> LLMResponse:
+    """
+    Run a single completion against `provider` without blocking the event loop.
+
+    Args:
+        provider: Registered provider name ("groq", "gemini", "deepseek")
+        prompt: User prompt
+        model: Model name (defaults to the provider's default model)
+        system: Optional system instructions
+        temperature: Sampling temperature (provider default if None)
+        max_tokens: Maximum response length (provider default if None)
+        use_cache: Serve/store the response through the response cache
+
+    Returns:
+        LLMResponse with text, provider, model and latency
+    """
+    llm = get_provider(provider)
+    model_name = model or llm.default_model
+    with span("llm.complete", provider=provider, model=model_name) as complete_span:
+        response = await _complete(llm, provider, model_name, prompt, system, temperature, max_tokens, use_cache)
+        complete_span.set(cache_hit=response.cached)
+        return response
+
+
+async def _complete(llm, provider, model_name, prompt, system, temperature, max_tokens, use_cache) -> LLMResponse:
+    key = cache_key(provider, model_name, prompt, system, temperature, max_tokens)
+    store = use_cache and response_cache.enabled
+
+    if store:
+        entry = await response_cache.get(key)
+        if entry is not None:
+            # Priced as what the call would have cost: the cache's savings
+            record_usage(provider, model_name, estimate_tokens(prompt) + estimate_tokens(system),
+                         estimate_tokens(entry["text"]), estimated=True, cached=True)
+            response = LLMResponse(text=entry["text"], provider=provider, model=model_name, cached=True)
+            response.cache_key = key
+            return response
+
+    async def call() -> LLMResponse:
+        with span("llm.call", provider=provider, model=model_name) as call_span:
+            response = await llm.complete(
+                prompt,
+                model=model_name,
+                system=system,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            # Recorded once here, not per coalesced waiter
+            entry = record_usage(provider, model_name, response.prompt_tokens, response.completion_tokens,
+                                 estimated=response.usage_estimated)
+            call_span.set(
+                tokens_in=response.prompt_tokens,
+                tokens_out=response.completion_tokens,
+                tokens_estimated=response.usage_estimated,
+                cost_usd=round(entry["cost_usd"], 6),
+                latency=round(response.latency, 4),
+            )
+        if store and response.text:
+            await response_cache.set(key, {"text": response.text, "provider": provider, "model": model_name})
+            response.cache_key = key
+        return response
+
+    # A call whose answer goes to the cache outlives a disconnected client
+    return await _flights.do(key, call, keep=store)
+
+
+async def uncache(response: LLMResponse) -> None:
+    """Drop `response` from the response cache, e.g. because its text turned out unusable."""
+    if response.cache_key is not None:
+        await response_cache.invalidate(response.cache_key)
+
+
+register_provider(GroqProvider())
+register_provider(DeepSeekProvider())
+register_provider(GeminiProvider())
+
+
+def configured_providers() -> Tuple[str, ...]:
+    """Names of HTTP-pooled providers whose API key is set (warmed on startup)."""
+    return tuple(
+        p.name for p in _PROVIDERS.values()
+        if isinstance(p, OpenAICompatibleProvider) and os.getenv(p.api_key_env)
+    )
+
+
+async def stream(
+    provider: str,
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of `complete()`: yields text chunks as they arrive.
+
+    A cached response is replayed as a single chunk; a fully streamed
+    response is stored in the cache once it finishes.
+    """
+    llm = get_provider(provider)
+    model_name = model or llm.default_model
+    key = cache_key(provider, model_name, prompt, system, temperature, max_tokens)
+    store = use_cache and response_cache.enabled
+
+    if store:
+        entry = await response_cache.get(key)
+        if entry is not None:
+            record_usage(provider, model_name, estimate_tokens(prompt) + estimate_tokens(system),
+                         estimate_tokens(entry["text"]), estimated=True, cached=True)
+            yield entry["text"]
+            return
+
+    chunks = []
+    async for chunk in llm.stream(prompt, model=model_name, system=system, temperature=temperature, max_tokens=max_tokens):
+        chunks.append(chunk)
+        yield chunk
+
+    text = "".join(chunks).strip()
+    # Streamed responses carry no usage block; always estimated
+    record_usage(provider, model_name, estimate_tokens(prompt) + estimate_tokens(system),
+                 estimate_tokens(text), estimated=True)
+    if store and text:
+        await response_cache.set(key, {"text": text, "provider": provider, "model": model_name})
@@ -0,0 +1,143 @@
+# backend/app/llm/registry.py
+"""
+Shared client registry for all LLM providers.
+
+One pooled keep-alive httpx client per provider (with its own connection
+limits), one SDK client per provider built on top of it, and one cached
+GenerativeModel per Gemini model/config. The registry is opened on FastAPI
+startup and closed on shutdown; anything requested before startup (scripts,
+tests) is created lazily and closed the same way.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderStats:
+    """Request counters for one provider, reported by `ClientRegistry.stats()`."""
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+class ClientRegistry:
+    """Owns every long-lived provider client so they can be reused and closed together."""
+
+    def __init__(self):
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._sdk_clients: Dict[str, Any] = {}
+        self._gemini_models: Dict[Tuple, Any] = {}
+        self._gemini_key: Optional[str] = None
+        self._stats: Dict[str, ProviderStats] = {}
+        self.started = False
+
+    def http_client(self, provider: str) -> httpx.AsyncClient:
+        """Pooled keep-alive HTTP client for `provider` (created on first use)."""
+        client = self._http_clients.get(provider)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.llm_max_connections(provider),
+                max_keepalive_connections=settings.llm_max_keepalive(provider),
+                keepalive_expiry=settings.llm_keepalive_expiry,
+            )
+            client = httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(60.0, connect=10.0))
+            self._http_clients[provider] = client
+        return client
+
+    def sdk_client(self, provider: str, factory: Callable[[httpx.AsyncClient], Any]) -> Any:
+        """SDK client for `provider`, built once by `factory(http_client)`."""
+        client = self._sdk_clients.get(provider)
+        if client is None:
+            client = factory(self.http_client(provider))
+            self._sdk_clients[provider] = client
+        return client
+
+    def gemini_model(self, genai: Any, api_key: str, model_name: str, generation_config: Optional[Dict[str, Any]]) -> Any:
+        """Cached GenerativeModel; `genai.configure` only runs when the key changes."""
+        if self._gemini_key != api_key:
+            genai.configure(api_key=api_key)
+            self._gemini_key = api_key
+            self._gemini_models.clear()
+
+        key = (model_name, tuple(sorted((generation_config or {}).items())))
+        model = self._gemini_models.get(key)
+        if model is None:
+            model = genai.GenerativeModel(model_name=model_name, generation_config=generation_config or None)
+            self._gemini_models[key] = model
+        return model
+
+    def provider_stats(self, provider: str) -> ProviderStats:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = ProviderStats()
+            self._stats[provider] = stats
+        return stats
+
+    async def start(self, providers: Tuple[str, ...] = ()) -> None:
+        """Open pooled clients up front so the first compare doesn't pay for it."""
+        for provider in providers:
+            self.http_client(provider)
+        self.started = True
+        logger.info(f"LLM client registry started ({', '.join(providers) or 'lazy'})")
+
+    async def aclose(self) -> None:
+        """Close every pooled connection and drop cached clients."""
+        for provider, client in list(self._http_clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close {provider} HTTP client: {e}")
+        self._http_clients.clear()
+        self._sdk_clients.clear()
+        self._gemini_models.clear()
+        self._gemini_key = None
+        self.started = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider pool usage and request counters."""
+        providers = set(self._stats) | set(self._http_clients)
+        result = {}
+        for provider in sorted(providers):
+            entry = self.provider_stats(provider).to_dict()
+            entry["pool"] = _pool_stats(self._http_clients.get(provider))
+            result[provider] = entry
+        result["gemini_models_cached"] = len(self._gemini_models)
+        return result
+
+
+def _pool_stats(client: Optional[httpx.AsyncClient]) -> Dict[str, Any]:
+    if client is None or client.is_closed:
+        return {"open": False}
+    # httpx doesn't expose pool state publicly; read it from httpcore best-effort
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+    return {
+        "open": True,
+        "max_connections": getattr(pool, "_max_connections", None),
+        "max_keepalive_connections": getattr(pool, "_max_keepalive_connections", None),
+        "connections": len(connections),
+        "idle": idle,
+        "active": len(connections) - idle,
+    }
+
+
+registry = ClientRegistry()
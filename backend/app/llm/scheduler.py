@@ -0,0 +1,203 @@
+# backend/app/llm/scheduler.py
+"""
+Client-side rate limiting for LLM providers.
+
+Each provider gets a token bucket for requests per minute and one for
+(estimated) tokens per minute, sized from <PROVIDER>_RPM / <PROVIDER>_TPM.
+Calls that would exceed either bucket wait in a priority queue: interactive
+/api/compare traffic is always served before batch jobs, and batch before
+cache warming. A 429 from the provider drains its buckets so the queue backs
+off instead of hammering it.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from .latency import LatencyTracker
+
+INTERACTIVE = 0
+BATCH = 1
+WARMING = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", WARMING: "warming"}
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Run LLM calls (and tasks created inside) at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` per second up to `per_minute`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class ProviderScheduler:
+    """Priority queue in front of one provider's request and token buckets."""
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._heap: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.wait = LatencyTracker()
+        self.granted = 0
+        self.throttled = 0
+        self.rate_limited = 0
+
+    @property
+    def limited(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def _delay(self, est_tokens: int) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(est_tokens))
+        return delay
+
+    def _consume(self, est_tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(est_tokens)
+        self.granted += 1
+
+    async def acquire(self, est_tokens: int, level: Optional[int] = None) -> None:
+        """Wait until the buckets allow one call of about `est_tokens` tokens."""
+        if not self.limited:
+            self.granted += 1
+            return
+        level = current_priority() if level is None else level
+        if not self._pending() and self._delay(est_tokens) == 0:
+            self._consume(est_tokens)
+            self.wait.record(0.0)
+            return
+
+        self.throttled += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (level, next(self._seq), est_tokens, future))
+        start = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        finally:
+            if not future.done():
+                future.cancel()
+            # A cancelled head may have been blocking the queue
+            self._dispatch()
+        self.wait.record(time.monotonic() - start)
+
+    def _pending(self) -> int:
+        return sum(1 for *_, future in self._heap if not future.done())
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._heap:
+            level, _, est_tokens, future = self._heap[0]
+            if future.done():
+                heapq.heappop(self._heap)
+                continue
+            delay = self._delay(est_tokens)
+            if delay > 0:
+                # Strict priority: the head waits, nothing behind it jumps ahead
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self._consume(est_tokens)
+            future.set_result(None)
+
+    def on_rate_limited(self) -> None:
+        """Provider returned 429: empty the buckets so queued calls back off."""
+        self.rate_limited += 1
+        if self.requests is not None:
+            self.requests.drain()
+        if self.tokens is not None:
+            self.tokens.drain()
+
+    def stats(self) -> Dict[str, Any]:
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for level, _, _, future in self._heap:
+            if not future.done():
+                depth[PRIORITY_NAMES.get(level, str(level))] += 1
+        wait = self.wait.to_dict()
+        return {
+            "limited": self.limited,
+            "rpm": self.requests.capacity if self.requests else None,
+            "tpm": self.tokens.capacity if self.tokens else None,
+            "queue_depth": depth,
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "wait_p50": wait["p50"],
+            "wait_p95": wait["p95"],
+        }
+
+
+_SCHEDULERS: Dict[str, ProviderScheduler] = {}
+
+
+def scheduler(provider: str) -> ProviderScheduler:
+    sched = _SCHEDULERS.get(provider)
+    if sched is None:
+        sched = ProviderScheduler(provider, rpm=settings.llm_rpm(provider), tpm=settings.llm_tpm(provider))
+        _SCHEDULERS[provider] = sched
+    return sched
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """429 from Groq/OpenAI SDKs or ResourceExhausted from Gemini."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ in ("RateLimitError", "ResourceExhausted")
+
+
+def scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: sched.stats() for name, sched in sorted(_SCHEDULERS.items())}
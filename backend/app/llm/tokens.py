@@ -0,0 +1,18 @@
+# backend/app/llm/tokens.py
+"""
+Offline token estimates for rate limiting when the real count isn't known yet.
+"""
+
+from typing import Optional
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token for English/JSON)."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def estimate_request_tokens(prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> int:
+    """Prompt tokens plus the completion budget, as provider TPM limits count both."""
+    return estimate_tokens(prompt) + estimate_tokens(system) + (max_tokens or 512)
@@ -0,0 +1,206 @@
+# backend/app/llm/usage.py
+"""
+Token usage and dollar cost of LLM calls.
+
+Providers report the token counts from their API responses via
+`report_usage()`; when a provider doesn't (streams, stubs, fakes) the
+offline estimator fills in and the entry is marked estimated. Each call is
+priced from PRICES (USD per million tokens, LLM_PRICES overrides) and
+recorded into the ledger of the pipeline run it belongs to, tagged with the
+stage that made it, and into process-wide totals per stage/provider/model.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from .tokens import estimate_tokens
+
+# (input, output) USD per 1M tokens; "*" is the provider's fallback price
+PRICES: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "groq": {
+        "llama-3.3-70b-versatile": (0.59, 0.79),
+        "llama-3.1-8b-instant": (0.05, 0.08),
+        "*": (0.59, 0.79),
+    },
+    "deepseek": {
+        "deepseek-chat": (0.27, 1.10),
+        "deepseek-reasoner": (0.55, 2.19),
+        "*": (0.27, 1.10),
+    },
+    "gemini": {
+        "gemini-2.5-flash": (0.30, 2.50),
+        "gemini-2.0-flash": (0.10, 0.40),
+        "gemini-1.5-flash": (0.075, 0.30),
+        "gemini-1.5-flash-latest": (0.075, 0.30),
+        "*": (0.30, 2.50),
+    },
+}
+
+
+def price(provider: str, model: str) -> Optional[Tuple[float, float]]:
+    """(input, output) USD per 1M tokens, or None if the provider isn't priced."""
+    override = settings.llm_prices.get(f"{provider}:{model}") or settings.llm_prices.get(provider)
+    if override:
+        return float(override[0]), float(override[1])
+    table = PRICES.get(provider)
+    if table is None:
+        return None
+    return table.get(model, table["*"])
+
+
+def cost_usd(provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    rates = price(provider, model)
+    if rates is None:
+        return 0.0
+    return (prompt_tokens * rates[0] + completion_tokens * rates[1]) / 1_000_000
+
+
+# Filled by a provider's _generate with the counts its API returned
+_reported: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_reported_usage", default=None)
+
+
+@contextmanager
+def capture_usage() -> Iterator[Dict[str, int]]:
+    """Collect what the provider reports for the call made inside the block."""
+    holder: Dict[str, int] = {}
+    token = _reported.set(holder)
+    try:
+        yield holder
+    finally:
+        _reported.reset(token)
+
+
+def report_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+    """Called by providers with the token counts from an API response."""
+    holder = _reported.get()
+    if holder is not None and prompt_tokens is not None and completion_tokens is not None:
+        holder["prompt_tokens"] = int(prompt_tokens)
+        holder["completion_tokens"] = int(completion_tokens)
+
+
+def usage_for(reported: Dict[str, int], prompt: str, system: Optional[str], text: str) -> Tuple[int, int, bool]:
+    """(prompt tokens, completion tokens, estimated) for one call."""
+    if "prompt_tokens" in reported:
+        return reported["prompt_tokens"], reported["completion_tokens"], False
+    return estimate_tokens(prompt) + estimate_tokens(system), estimate_tokens(text), True
+
+
+class UsageTotals:
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.estimated_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.saved_usd = 0.0
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self.calls += 1
+        if entry["cached"]:
+            self.cached_calls += 1
+            self.saved_usd += entry["cost_usd"]
+            return
+        if entry["estimated"]:
+            self.estimated_calls += 1
+        self.prompt_tokens += entry["prompt_tokens"]
+        self.completion_tokens += entry["completion_tokens"]
+        self.cost_usd += entry["cost_usd"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "estimated_calls": self.estimated_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "saved_usd": round(self.saved_usd, 6),
+        }
+
+
+class UsageLedger:
+    """Every LLM call of one pipeline run (or one request), by stage."""
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+
+    def summary(self) -> Dict[str, Any]:
+        total = UsageTotals()
+        stages: Dict[str, UsageTotals] = {}
+        for entry in self.entries:
+            total.add(entry)
+            stages.setdefault(entry["stage"], UsageTotals()).add(entry)
+        return {"total": total.to_dict(), "stages": {name: t.to_dict() for name, t in stages.items()}}
+
+
+_ledger: ContextVar[Optional[UsageLedger]] = ContextVar("llm_usage_ledger", default=None)
+_stage: ContextVar[str] = ContextVar("llm_usage_stage", default="other")
+
+# (stage, provider, model) -> totals since start
+_TOTALS: Dict[Tuple[str, str, str], UsageTotals] = {}
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageLedger]:
+    """Record the LLM calls made inside the block (and tasks it spawns) into a new ledger."""
+    ledger = UsageLedger()
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+@contextmanager
+def usage_stage(stage: str) -> Iterator[None]:
+    """Attribute calls made inside the block to `stage`."""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def record_usage(
+    provider: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    estimated: bool,
+    cached: bool = False,
+) -> Dict[str, Any]:
+    """
+    Price one call and add it to the current ledger and the global totals.
+    For a cache hit the cost is what the call would have cost (saved).
+    """
+    entry = {
+        "stage": _stage.get(),
+        "provider": provider,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "estimated": estimated,
+        "cached": cached,
+        "cost_usd": cost_usd(provider, model, prompt_tokens, completion_tokens),
+    }
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.entries.append(entry)
+    key = (entry["stage"], provider, model)
+    if key not in _TOTALS:
+        _TOTALS[key] = UsageTotals()
+    _TOTALS[key].add(entry)
+    return entry
+
+
+def usage_stats() -> Dict[str, Dict[str, Any]]:
+    """Totals per stage:provider:model, most expensive first."""
+    ordered = sorted(_TOTALS.items(), key=lambda item: item[1].cost_usd + item[1].saved_usd, reverse=True)
+    return {f"{s}:{p}:{m}": totals.to_dict() for (s, p, m), totals in ordered}
+
+
+def usage_totals() -> Dict[Tuple[str, str, str], UsageTotals]:
+    return dict(_TOTALS)
@@ -4,21 +4,27 @@ PM Architect Backend - Lite Orchestrator Version
 
 Clean, minimal FastAPI backend with:
 - Single Gemini-powered comparison endpoint
-- File-based JSON persistence
-- No PostgreSQL, no Redis, no background jobs
+- File-based persistence (append-only decision log)
+- No PostgreSQL, no Redis; background jobs run on an in-process worker pool
 - Production-ready for Render deployment
 """
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 
 from .config import settings
+from .data_store import compactor as decision_compactor, open_store
 from .orchestrator import router as orchestrator_router
 from .routers.history import router as history_router
 from .routers.options import router as options_router
 from .routers.catalog import router as catalog_router
-from .routers.multi_agent_compare import router as multi_agent_router
+from .routers.multi_agent_compare import compare_jobs, router as multi_agent_router
+from .routers.ops import metrics_router, router as ops_router
+from .llm import configured_providers, registry as llm_registry, response_cache
+from .utils.metrics import MetricsMiddleware, loop_lag
+from .utils.tracing import TracingMiddleware
 
 
 # Configure logging
@@ -44,8 +50,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Root span per request; stage timings go out as a Server-Timing header
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -53,9 +64,28 @@ async def startup_event():
     logger.info("🚀 PM Architect Backend starting...")
     logger.info(f"   Environment: {settings.app_env}")
     logger.info(f"   Gemini API: {'Configured ✅' if settings.gemini_api_key else 'Dev Stub Mode ⚠️'}")
+    await llm_registry.start(configured_providers())
+    if response_cache.enabled:
+        pruned = await response_cache.prune()
+        logger.info(f"   LLM cache: enabled ({pruned} stale entries pruned)")
+    decisions = await asyncio.to_thread(open_store)
+    logger.info(f"   Decision log: {len(decisions)} decisions indexed")
+    decision_compactor.start()
+    await compare_jobs.start()
+    loop_lag.start()
     logger.info("🎉 Backend ready!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop job workers and close pooled LLM provider connections"""
+    await loop_lag.stop()
+    await decision_compactor.stop()
+    await compare_jobs.stop()
+    await llm_registry.aclose()
+    logger.info("👋 LLM clients closed")
+
+
 @app.get("/")
 def root():
     """Root endpoint - confirms backend is live"""
@@ -85,6 +115,8 @@ app.include_router(orchestrator_router, prefix="/api")  # Legacy endpoint
 app.include_router(history_router, prefix="/api")
 app.include_router(options_router, prefix="/api")
 app.include_router(catalog_router, prefix="/api")
+app.include_router(ops_router, prefix="/api")
+app.include_router(metrics_router)
 
 
 logger.info("✅ All routes registered successfully")
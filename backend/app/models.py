@@ -13,6 +13,7 @@ class ComparisonContext(BaseModel):
     timeline: Optional[str] = None
     budget: Optional[str] = None
     tech_category: str = Field(default="other", description="Technology category (database, language, web_framework, etc.)")
+    parse_path: str = Field(default="llm", description="How the query was parsed: 'local' rule-based parser or 'llm'")
     cost_breakdown: Dict[str, Any] = Field(default_factory=dict)
     performance: Dict[str, Any] = Field(default_factory=dict)
     risks: Dict[str, Any] = Field(default_factory=dict)
@@ -29,6 +30,7 @@ class SavedComparison(BaseModel):
     brief: str
     slider_data: Optional[Dict[str, Any]] = None
     value_metrics: Optional[Dict[str, Any]] = None
+    usage: Optional[Dict[str, Any]] = None  # Tokens and USD per pipeline stage
     created_at: datetime = Field(default_factory=datetime.utcnow)
     view_count: int = 0
     
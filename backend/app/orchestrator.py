@@ -6,12 +6,18 @@ This simplified orchestrator:
 - Takes comparison request (query, options, context)
 - Makes ONE Gemini API call
 - Returns structured JSON comparison
-- Auto-saves to decisions.json (file-based persistence)
+- Auto-saves to the decision log (file-based persistence)
+
+With more than two options it ranks them instead: one profiling call per
+distinct technology (in parallel), scored on a shared metric set, from which
+the pairwise matrix and the ranking are computed without further LLM calls.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import json
 import time
 import uuid
@@ -19,7 +25,12 @@ import os
 from .config import settings
 
 from .agents.llm_client import call_gemini, LLMResponse
+from .agents.query_parser import canonical_tech
 from .data_store import save_decision
+from .llm.usage import track_usage, usage_stage
+from .utils.cancellation import ClientDisconnected, cancel_on_disconnect
+from .utils.json_extract import JSONExtractError, extract_json, extract_object
+from .utils.tracing import span
 
 
 router = APIRouter(tags=["Orchestrator"])
@@ -28,7 +39,7 @@ router = APIRouter(tags=["Orchestrator"])
 class CompareRequest(BaseModel):
     """Request model for comparison endpoint"""
     query: Optional[str] = Field(None, description="Natural language comparison query")
-    options: List[str] = Field(..., min_length=2, description="Two options to compare [A, B]")
+    options: List[str] = Field(..., min_length=2, description="Options to compare [A, B, ...]; more than two are ranked")
     metrics: Optional[List[str]] = Field(default_factory=list, description="Specific metrics to evaluate")
     context: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional context")
 
@@ -87,18 +98,76 @@ Rules:
 """
 
 
+# Metrics every option is scored on when ranking more than two
+DEFAULT_METRICS = ["Performance", "Ease of Use", "Community Support", "Cost"]
+
+# System prompt for the per-technology profiles behind N-way rankings
+PROFILE_SYSTEM_PROMPT = """You are a technology profiling engine for PM Architect.
+
+Given one technology and a list of metrics, score it on every metric so that
+scores are comparable across technologies: judge it against the whole field,
+not against any single alternative.
+
+Output **ONLY valid JSON** in this exact format:
+{
+  "name": "<Technology name>",
+  "metrics": [
+    {"name": "Performance", "score": 85, "reason": "Why it got this score (1-2 sentences)"}
+  ],
+  "evidence": ["Specific factual point"]
+}
+
+Rules:
+- Score every metric you are given, using the exact metric names
+- Scores must be 0-100, higher is always better (for Cost: cheaper)
+- Keep all text concise (1-2 sentences per reason)
+- Respond ONLY with valid JSON, no markdown, no extra text
+"""
+
+
 @router.post("/orchestrator/compare")
-async def compare(request: CompareRequest) -> Dict[str, Any]:
+async def compare(request: CompareRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Single-call comparison endpoint (a ranking for more than two options).
+
+    The LLM calls are cancelled if the client disconnects before they finish.
+    """
+    try:
+        return await cancel_on_disconnect(http_request, "orchestrator_compare", _tracked_compare(request))
+    except ClientDisconnected:
+        return Response(status_code=499)
+
+
+async def _tracked_compare(request: CompareRequest) -> Dict[str, Any]:
+    """`_compare` with its token usage and cost attached, then saved."""
+    with track_usage() as ledger, usage_stage("orchestrator"):
+        response, stub_reason = await _compare(request)
+    response["usage"] = ledger.summary()
+    _save(response, stub_reason)
+    return response
+
+
+def _save(response: Dict[str, Any], stub_reason: Optional[str]) -> None:
+    """Save to the decision log, only if this is a REAL API response (not stub data)."""
+    if stub_reason is not None:
+        print(f"⚠️  Skipping save: stub response ({stub_reason})")
+        return
+    try:
+        with span("persistence", store="decisions"):
+            save_decision(response)
+    except Exception as e:
+        # Log but don't fail the request if persistence fails
+        print(f"⚠️  Failed to save decision: {e}")
+
+
+async def _compare(request: CompareRequest) -> Tuple[Dict[str, Any], Optional[str]]:
     """
-    Single-call comparison endpoint.
-    
     Process:
     1. Validate input (need at least 2 options)
     2. Build prompt from request
     3. Call Gemini once
     4. Parse JSON response
-    5. Save to decisions.json
-    6. Return structured result
+    5. Return structured result, and why it is stub data (None if it isn't)
     """
     # Validate options
     if len(request.options) < 2:
@@ -107,6 +176,9 @@ async def compare(request: CompareRequest) -> Dict[str, Any]:
             detail="Must provide at least two options to compare"
         )
     
+    if len(request.options) > 2:
+        return await _compare_many(request)
+
     option_a = request.options[0]
     option_b = request.options[1]
     task_id = str(uuid.uuid4())
@@ -132,7 +204,7 @@ async def compare(request: CompareRequest) -> Dict[str, Any]:
     stub_reason = None
     
     try:
-        llm_response: LLMResponse = call_gemini(
+        llm_response: LLMResponse = await call_gemini(
             system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
             max_tokens=700,
@@ -144,16 +216,9 @@ async def compare(request: CompareRequest) -> Dict[str, Any]:
         raw_response = llm_response.text
         
         # Parse JSON response
-        # Remove markdown code blocks if present
-        cleaned = raw_response.strip()
-        if cleaned.startswith("```"):
-            # Extract JSON from code block
-            lines = cleaned.split("\n")
-            cleaned = "\n".join([l for l in lines if not l.startswith("```")])
+        comparison_data = extract_object(raw_response)
         
-        comparison_data = json.loads(cleaned)
-        
-    except json.JSONDecodeError as e:
+    except JSONExtractError as e:
         # If JSON parsing fails, return a fallback structure
         is_stub_response = True
         stub_reason = f"JSON parse error: {str(e)}"
@@ -192,17 +257,7 @@ async def compare(request: CompareRequest) -> Dict[str, Any]:
         "source": "stub" if is_stub_response else "gemini",
     }
     
-    # Only save to decisions.json if this is a REAL API response (not stub data)
-    if not is_stub_response:
-        try:
-            save_decision(response)
-        except Exception as e:
-            # Log but don't fail the request if persistence fails
-            print(f"⚠️  Failed to save decision: {e}")
-    else:
-        print(f"⚠️  Skipping save: stub response ({stub_reason})")
-    
-    return response
+    return response, (stub_reason or "stub data") if is_stub_response else None
 
 
 def _normalize_metrics(metrics: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
@@ -223,6 +278,159 @@ def _normalize_metrics(metrics: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any
     return result
 
 
+async def _profile_tech(option: str, metrics: List[str], request: CompareRequest) -> Dict[str, Any]:
+    """
+    Scores one technology on `metrics`. Parse failures and missing metrics
+    fall back to a neutral 50 and mark the profile as stub data.
+    """
+    user_prompt_parts = []
+    if request.query:
+        user_prompt_parts.append(f"Query: {request.query}")
+    user_prompt_parts.append(f"Technology to profile: {option}")
+    user_prompt_parts.append(f"Metrics: {', '.join(metrics)}")
+    if request.context:
+        user_prompt_parts.append(f"Context: {json.dumps(request.context)}")
+
+    llm_response: LLMResponse = await call_gemini(
+        system_prompt=PROFILE_SYSTEM_PROMPT,
+        user_prompt="\n".join(user_prompt_parts),
+        max_tokens=500,
+        model=None
+    )
+    profile = {
+        "option": option,
+        "scores": {},
+        "reasons": {},
+        "evidence": [],
+        "is_stub": llm_response.is_stub,
+        "error": llm_response.error,
+    }
+    try:
+        data = extract_object(llm_response.text)
+        rows = {m.get("name"): m for m in data.get("metrics", []) if isinstance(m, dict)}
+        profile["evidence"] = data.get("evidence", [])
+    except (JSONExtractError, AttributeError) as e:
+        rows = {}
+        profile["is_stub"] = True
+        profile["error"] = f"JSON parse error: {str(e)}"
+
+    for metric in metrics:
+        row = rows.get(metric, {})
+        try:
+            profile["scores"][metric] = float(row["score"])
+            profile["reasons"][metric] = row.get("reason", "")
+        except (KeyError, TypeError, ValueError):
+            profile["scores"][metric] = 50.0
+            profile["reasons"][metric] = "No score available; neutral fallback"
+            profile["is_stub"] = True
+    return profile
+
+
+def _delta(a: float, b: float) -> str:
+    return f"{round((a - b) / b * 100):+d}%" if b else "0%"
+
+
+def _rank(profiles: List[Dict[str, Any]], metrics: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Pairwise matrix and ranking from per-technology scores.
+
+    Each pair is scored once and mirrored: the option winning more metrics
+    takes the pair (a tie gives both half). Options are ranked by pairs won,
+    then by average score.
+    """
+    average = {p["option"]: sum(p["scores"].values()) / len(metrics) for p in profiles}
+    matrix: Dict[str, Dict[str, Any]] = {p["option"]: {} for p in profiles}
+    pairs_won = {p["option"]: 0.0 for p in profiles}
+
+    for i, left in enumerate(profiles):
+        for right in profiles[i + 1:]:
+            a, b = left["option"], right["option"]
+            wins = [m for m in metrics if left["scores"][m] > right["scores"][m]]
+            losses = [m for m in metrics if left["scores"][m] < right["scores"][m]]
+            delta = round(average[a] - average[b], 1)
+            matrix[a][b] = {"wins": wins, "losses": losses, "delta": delta}
+            matrix[b][a] = {"wins": losses, "losses": wins, "delta": -delta}
+            if len(wins) == len(losses):
+                pairs_won[a] += 0.5
+                pairs_won[b] += 0.5
+            else:
+                pairs_won[a if len(wins) > len(losses) else b] += 1
+
+    order = sorted(average, key=lambda option: (pairs_won[option], average[option]), reverse=True)
+    ranking = [
+        {"rank": n + 1, "option": option, "score": round(average[option], 1), "pairs_won": pairs_won[option]}
+        for n, option in enumerate(order)
+    ]
+    return matrix, ranking
+
+
+async def _compare_many(request: CompareRequest) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    N-way comparison: every distinct option is profiled once, concurrently,
+    and the ranking is derived from those profiles.
+    """
+    # Aliases of the same technology ("Postgres", "PostgreSQL") are profiled once
+    options: Dict[str, str] = {}
+    for option in request.options:
+        options.setdefault(canonical_tech(option), option)
+    if len(options) < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Must provide at least two distinct options to compare"
+        )
+    options_list = list(options.values())
+    metrics = request.metrics or DEFAULT_METRICS
+    task_id = str(uuid.uuid4())
+
+    try:
+        profiles = await asyncio.gather(*(_profile_tech(option, metrics, request) for option in options_list))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Comparison generation failed: {str(e)}"
+        )
+
+    matrix, ranking = _rank(profiles, metrics)
+    by_option = {p["option"]: p for p in profiles}
+    first, second = by_option[ranking[0]["option"]], by_option[ranking[1]["option"]]
+    stub_reasons = [p["error"] for p in profiles if p["is_stub"]]
+    undefeated = ranking[0]["pairs_won"] == len(profiles) - 1
+
+    response = {
+        "id": task_id,
+        "task_id": task_id,
+        "timestamp": int(time.time()),
+        "query": request.query or f"Compare {', '.join(options_list)}",
+        "mode": "ranking",
+        "options": options_list,
+        "ranking": ranking,
+        "matrix": matrix,
+        "scores": {p["option"]: p["scores"] for p in profiles},
+        "reasons": {p["option"]: p["reasons"] for p in profiles},
+        # Top two in the two-option shape, so history views still render it
+        "left": first["option"],
+        "right": second["option"],
+        "metrics": {
+            metric: {
+                "A": first["scores"][metric],
+                "B": second["scores"][metric],
+                "delta": _delta(first["scores"][metric], second["scores"][metric]),
+            }
+            for metric in metrics
+        },
+        "summary": (
+            f"{first['option']} ranks first of {len(profiles)} across {', '.join(metrics)}, "
+            f"ahead of {second['option']} by {matrix[first['option']][second['option']]['delta']} points on average."
+        ),
+        "confidence": "low" if stub_reasons else ("high" if undefeated else "medium"),
+        "evidence": [item for p in profiles for item in p["evidence"]],
+        "context": request.context or {},
+        "source": "stub" if stub_reasons else "gemini",
+    }
+
+    return response, (stub_reasons[0] or "stub data") if stub_reasons else None
+
+
 @router.get("/debug/compare")
 async def debug_compare():
     """
@@ -240,15 +448,15 @@ async def debug_compare():
     )
     
     try:
-        llm_response: LLMResponse = call_gemini(system_prompt, user_prompt)
+        llm_response: LLMResponse = await call_gemini(system_prompt, user_prompt)
         duration = round(time.time() - start, 2)
         
         mode = "stub" if llm_response.is_stub else "real"
         
         # Try to parse as JSON, fallback to raw text
         try:
-            parsed_result = json.loads(llm_response.text) if llm_response.text.strip().startswith("{") else {"raw_text": llm_response.text}
-        except json.JSONDecodeError:
+            parsed_result = extract_json(llm_response.text)
+        except JSONExtractError:
             parsed_result = {"raw_text": llm_response.text}
         
         return {
@@ -0,0 +1,277 @@
+"""
+Multi-agent compare pipeline, declared as a stage graph (utils/dag.py):
+
+    context -> cost, performance, risks (parallel) -> narrative -> value_metrics
+
+Used by /api/compare (and its streaming variant) and by the root
+orchestrator.py CLI. The specialist stages are non-critical: if one fails
+or misses its deadline the brief is still written from the remaining data
+and the gap is reported in the result.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import settings
+from .llm.usage import track_usage, usage_stage
+from .models import ComparisonContext
+from .agents.context_agent import run as context_run
+from .agents.context_agent import speculate as context_speculate
+from .agents.cost_agent import run as cost_run
+from .agents.fused_agent import run as fused_run
+from .agents.narrative_agent import run as narrative_run
+from .agents.narrative_agent import stream as narrative_stream
+from .agents.pair_cache import pair_cache
+from .agents.performance_agent import run as perf_run
+from .agents.query_parser import canonical_constraints, canonical_tech
+from .agents.risk_agent import run as risk_run
+from .utils.cancellation import cancellation_stats, client_disconnected
+from .utils.dag import Stage, StageOutcome, run_dag
+from .utils.metrics import stage_durations
+from .utils.speculation import speculation_stats
+from .utils.tracing import span
+from .utils.value_calculator import calculate_value_delivered
+
+# Async callback receiving (event name, payload) as pipeline stages finish
+EmitFn = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Specialist stage -> agent, and the ComparisonContext field it fills
+SPECIALISTS = {"cost": cost_run, "performance": perf_run, "risks": risk_run}
+STAGE_FIELDS = {"cost": "cost_breakdown", "performance": "performance", "risks": "risks"}
+
+# Default per-stage timeouts in seconds (PIPELINE_<STAGE>_TIMEOUT overrides)
+STAGE_TIMEOUTS = {"context": 30, "cost": 40, "performance": 40, "risks": 40, "narrative": 60, "value_metrics": 5}
+
+
+def stage_payload(context: ComparisonContext, stage: str) -> Dict[str, Any]:
+    """Event payload sent when a pipeline stage finishes."""
+    if stage == "context":
+        return {
+            "option_a": context.option_a,
+            "option_b": context.option_b,
+            "constraints": context.constraints,
+            "use_case": context.use_case,
+            "team_size": context.team_size,
+            "timeline": context.timeline,
+            "budget": context.budget,
+            "tech_category": context.tech_category,
+            "parse_path": context.parse_path,
+        }
+    if stage == "cost":
+        return {
+            "cost_breakdown": context.cost_breakdown,
+            "slider_data": context.cost_breakdown.get("slider_data", {}),
+        }
+    if stage == "performance":
+        return {"performance": context.performance}
+    return {"risks": context.risks}
+
+
+# Specialist inputs besides the pair and constraints; a kept guess's values replace the parse's
+_GUESS_FIELDS = ("use_case", "team_size", "budget")
+
+
+def _same_options(guess: ComparisonContext, context: ComparisonContext) -> bool:
+    """Whether a speculative guess compared the same two techs, in the same order."""
+    return (
+        canonical_tech(guess.option_a) == canonical_tech(context.option_a)
+        and canonical_tech(guess.option_b) == canonical_tech(context.option_b)
+    )
+
+
+def _same_constraints(guess: ComparisonContext, context: ComparisonContext) -> bool:
+    return canonical_constraints(guess.constraints) == canonical_constraints(context.constraints)
+
+
+class ComparePipeline:
+    """State shared by the stages of one compare run."""
+
+    def __init__(self, query: str, emit: Optional[EmitFn] = None):
+        self.query = query
+        self.emit = emit
+        self.context = ComparisonContext(query=query, option_a="", option_b="")
+        # Context the specialists work on: the parsed one, or an agreeing guess
+        self.source = self.context
+        self.work: Dict[str, asyncio.Future] = {}
+        # Combined specialist call behind `work`, if one was made
+        self.fused: Optional[asyncio.Future] = None
+        self._spawned: List[asyncio.Future] = []
+        self.finished: List[str] = []
+        self.value_metrics: Dict[str, Any] = {}
+
+    async def send(self, event: str, data: Dict[str, Any]) -> None:
+        if self.emit is not None:
+            await self.emit(event, data)
+
+    def _spawn(self, coro) -> asyncio.Future:
+        task = asyncio.ensure_future(coro)
+        self._spawned.append(task)
+        return task
+
+    def _launch(self, context: ComparisonContext) -> Dict[str, asyncio.Future]:
+        """Start the specialist work for `context`: pair cache, fused call, then per-agent."""
+        cached = {stage: pair_cache.get(stage, context) for stage in SPECIALISTS}
+        todo = [stage for stage, value in cached.items() if value is None]
+        fused = None
+        if settings.fused_specialists and len(todo) > 1:
+            # One combined call first; only sections that fail validation go per-agent
+            fused = self._spawn(self._fused(context, todo))
+        self.fused = fused
+        return {
+            stage: self._spawn(self._produce(stage, context, cached[stage], fused))
+            for stage in SPECIALISTS
+        }
+
+    async def _fused(self, context: ComparisonContext, todo: List[str]) -> List[str]:
+        with usage_stage("fused"):
+            return await fused_run(context, todo)
+
+    async def _produce(self, stage: str, context: ComparisonContext, cached, fused) -> Tuple[Dict[str, Any], bool]:
+        """(stage output, whether it is fresh and should be cached)."""
+        field = STAGE_FIELDS[stage]
+        if cached is not None:
+            setattr(context, field, cached)
+            return cached, False
+        if fused is not None:
+            # Shielded: one stage timing out must not cancel the others' call
+            if stage in await asyncio.shield(fused):
+                return getattr(context, field), True
+        # Spawned from the context stage; bill the agent's calls to its own stage
+        with usage_stage(stage):
+            await SPECIALISTS[stage](context)
+        return getattr(context, field), True
+
+    # -- stages ------------------------------------------------------------
+
+    async def parse_context(self) -> None:
+        # If the LLM has to be asked, specialists start right away on the
+        # local parser's best guess and are kept if the LLM agrees
+        guess = context_speculate(self.query)
+        if guess is not None:
+            self.work = self._launch(guess)
+        started = time.perf_counter()
+        await context_run(self.context)
+        parsed_in = time.perf_counter() - started
+
+        same_pair = guess is not None and _same_options(guess, self.context)
+        if same_pair and _same_constraints(guess, self.context):
+            self.source = guess
+            # The specialists ran on the guess; report the context they actually saw
+            for field in _GUESS_FIELDS:
+                setattr(self.context, field, getattr(guess, field))
+            speculation_stats.record_hit(parsed_in)
+        else:
+            if guess is not None:
+                # The stage tasks await the fused call through a shield, so it goes separately
+                for task in [*self.work.values(), self.fused]:
+                    if task is not None:
+                        task.cancel()
+                speculation_stats.record_mismatch(parsed_in, constraints_only=same_pair)
+            self.work = self._launch(self.context)
+        await self.send("context", stage_payload(self.context, "context"))
+
+    async def specialist(self, stage: str) -> None:
+        value, fresh = await self.work[stage]
+        if not value:
+            raise RuntimeError(f"{stage} agent returned no data")
+        if "error" in value:
+            # Keep the failure out of the narrative and the result
+            setattr(self.context, STAGE_FIELDS[stage], {})
+            raise RuntimeError(f"{stage} agent failed: {value['error']}")
+        if fresh:
+            pair_cache.set(stage, self.source, value)
+        setattr(self.context, STAGE_FIELDS[stage], value)
+        await self.send(stage, stage_payload(self.context, stage))
+
+    async def narrative(self) -> None:
+        if self.emit is None:
+            await narrative_run(self.context)
+        else:
+            async for token in narrative_stream(self.context):
+                await self.send("narrative", {"delta": token})
+
+    async def compute_value_metrics(self) -> None:
+        self.value_metrics = calculate_value_delivered(
+            self.context,
+            self.context.cost_breakdown,
+            self.context.performance,
+            self.context.risks
+        )
+        await self.send("value_metrics", {"value_metrics": self.value_metrics})
+
+    def stages(self) -> List[Stage]:
+        def timeout(stage: str) -> float:
+            return settings.pipeline_stage_timeout(stage, STAGE_TIMEOUTS[stage])
+
+        def traced(stage: str, run: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+            async def run_traced() -> None:
+                with span(f"stage.{stage}"), usage_stage(stage):
+                    await run()
+            return run_traced
+
+        graph = [Stage("context", traced("context", self.parse_context), provides=["context"], timeout=timeout("context"))]
+        for stage, field in STAGE_FIELDS.items():
+            graph.append(Stage(
+                stage,
+                traced(stage, lambda stage=stage: self.specialist(stage)),
+                requires=["context"],
+                provides=[field],
+                critical=False,
+                timeout=timeout(stage),
+            ))
+        graph.append(Stage(
+            "narrative",
+            traced("narrative", self.narrative),
+            requires=list(STAGE_FIELDS.values()),
+            provides=["final_brief"],
+            timeout=timeout("narrative"),
+        ))
+        graph.append(Stage(
+            "value_metrics",
+            traced("value_metrics", self.compute_value_metrics),
+            requires=["final_brief"],
+            critical=False,
+            timeout=timeout("value_metrics"),
+        ))
+        return graph
+
+    async def _on_outcome(self, outcome: StageOutcome) -> None:
+        self.finished.append(outcome.stage.name)
+        stage_durations.observe(outcome.duration, outcome.stage.name, outcome.status)
+        if not outcome.ok and not outcome.stage.critical:
+            print(f"Pipeline: {outcome.stage.name} {outcome.status}, continuing without it")
+            await self.send("gap", {"stage": outcome.stage.name, "reason": outcome.status})
+
+    async def run(self) -> Dict[str, Any]:
+        stages = self.stages()
+        try:
+            with span("pipeline", query=self.query, streaming=self.emit is not None), track_usage() as ledger:
+                dag = await run_dag(stages, deadline=settings.pipeline_deadline, on_outcome=self._on_outcome)
+        except asyncio.CancelledError:
+            if client_disconnected():
+                cancellation_stats.record_stages(len(stages) - len(self.finished))
+            raise
+        finally:
+            for task in self._spawned:
+                task.cancel()
+
+        # Return both brief and any interactive data, plus context for saving
+        return {
+            "brief": self.context.final_brief,
+            "slider_data": self.context.cost_breakdown.get("slider_data", {}),
+            "value_metrics": self.value_metrics,  # Add value metrics separately
+            "gaps": dag.gaps,
+            "timings": dag.timings(),
+            "usage": ledger.summary(),
+            "context": self.context  # Return context for saving
+        }
+
+
+async def run_pipeline(query: str, emit: Optional[EmitFn] = None) -> Dict[str, Any]:
+    """
+    Runs every stage of the pipeline. When `emit` is given, each stage's
+    output is sent as soon as it is ready, the narrative is streamed, and a
+    `gap` event reports any specialist stage that was dropped.
+    """
+    return await ComparePipeline(query, emit).run()
@@ -3,110 +3,151 @@ Multi-Agent Compare Router
 The new $500/hr technical co-founder endpoint powered by multi-agent architecture.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 import asyncio
+import json
+import os
 import sys
+import time
 from pathlib import Path
 
 # Import the multi-agent orchestrator
-from ..models import ComparisonContext, SavedComparison
-from ..agents.context_agent import run as context_run
-from ..agents.cost_agent import run as cost_run
-from ..agents.performance_agent import run as perf_run
-from ..agents.risk_agent import run as risk_run
-from ..agents.narrative_agent import run as narrative_run
-from ..utils.value_calculator import calculate_value_delivered
+from ..agents.query_parser import canonical_constraints, canonical_tech, parse_query
+from ..llm import BATCH, priority
+from ..models import SavedComparison
+from ..pipeline import run_pipeline
+from ..config import settings
+from ..utils.cancellation import ClientDisconnected, cancel_on_disconnect
 from ..utils.comparison_storage import save_comparison, get_comparison, get_storage_stats
+from ..utils.job_queue import Job, JobQueue, QueueFullError
+from ..utils.singleflight import SingleFlight
+from ..utils.tracing import span
 
 router = APIRouter(tags=["Multi-Agent Compare"])
 
+# Concurrent identical queries share one pipeline run
+_compare_flights = SingleFlight("compare")
+
 
 class QueryRequest(BaseModel):
     """Request model for multi-agent comparison"""
     query: str
 
 
+class BatchPair(BaseModel):
+    """One tech pair to compare, as an alternative to a free-text query"""
+    option_a: str
+    option_b: str
+    constraints: List[str] = []
+
+
+class BatchRequest(BaseModel):
+    """Request model for batch comparison"""
+    items: List[Union[str, BatchPair]] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+def _query_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _batch_query(item: Union[str, BatchPair]) -> str:
+    if isinstance(item, str):
+        return item
+    query = f"{item.option_a} vs {item.option_b}"
+    if item.constraints:
+        query += f" for {', '.join(item.constraints)}"
+    return query
+
+
+def _batch_key(item: Union[str, BatchPair]) -> Tuple:
+    """Items comparing the same pair (same order) under the same constraints share a run."""
+    if isinstance(item, str):
+        parsed = parse_query(item)
+        if parsed is None:
+            return ("query", _query_key(item))
+        a, b, constraints = parsed.option_a, parsed.option_b, parsed.constraints
+    else:
+        a, b, constraints = item.option_a, item.option_b, item.constraints
+    return ("pair", canonical_tech(a), canonical_tech(b), canonical_constraints(constraints))
+
+
 async def compare_anything(query: str) -> Dict[str, Any]:
     """
     Full multi-agent pipeline orchestrator.
     Returns both the result and the context for saving.
-    """
-    # Start with raw query
-    context = ComparisonContext(query=query, option_a="", option_b="")
-
-    # 1. Parse context
-    context = await context_run(context)
 
-    # 2. Run specialist agents in parallel
-    cost_task = cost_run(context)
-    perf_task = perf_run(context)
-    risk_task = risk_run(context)
-
-    # Agents modify context in place, so we just await them
-    await asyncio.gather(cost_task, perf_task, risk_task)
+    Identical queries already in flight await the same run; a caller that
+    disconnects does not cancel it for the others.
+    """
+    return await _compare_flights.do(_query_key(query), lambda: run_pipeline(query))
 
-    # 3. Synthesize final brief
-    context = await narrative_run(context)
 
-    # 4. Calculate value metrics
-    value_metrics = calculate_value_delivered(
-        context,
-        context.cost_breakdown,
-        context.performance,
-        context.risks
+def _save_result(query: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Saves a pipeline result and returns the public response body.
+    """
+    # Get context from result
+    context = result.get("context")
+    
+    # Save the comparison
+    saved_comparison = SavedComparison(
+        query=query,
+        option_a=context.option_a if context else "",
+        option_b=context.option_b if context else "",
+        tech_category=context.tech_category if context else "other",
+        brief=result["brief"],
+        slider_data=result.get("slider_data"),
+        value_metrics=result.get("value_metrics"),
+        usage=result.get("usage")
     )
-
-    # Return both brief and any interactive data, plus context for saving
+    
+    with span("persistence", store="comparisons"):
+        comparison_id = save_comparison(saved_comparison)
+    
+    # Get base URL from environment or use default
+    base_url = os.getenv("BASE_URL", "http://localhost:3000")  # Default to localhost for dev
+    
     return {
-        "brief": context.final_brief,
-        "slider_data": context.cost_breakdown.get("slider_data", {}),
-        "value_metrics": value_metrics,  # Add value metrics separately
-        "context": context  # Return context for saving
+        "brief": result["brief"],
+        "slider_data": result.get("slider_data", {}),  # For future interactive frontend
+        "value_metrics": result.get("value_metrics", {}),  # Value metrics for frontend
+        "query": query,
+        "comparison_id": comparison_id,  # NEW: Return the shareable ID
+        "share_url": f"{base_url}/c/{comparison_id}",  # NEW: Shareable URL
+        "gaps": result.get("gaps", []),  # Stages dropped (timeout/error); brief written without them
+        "timings": result.get("timings", {}),
+        "usage": result.get("usage", {}),  # Tokens and USD per stage
     }
 
 
+def _format_event(event: str, data: Dict[str, Any], fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps({"event": event, "data": data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("/compare")
-async def compare(request: QueryRequest) -> Dict[str, Any]:
+async def compare(request: QueryRequest, http_request: Request) -> Dict[str, Any]:
     """
     Main endpoint: Takes a raw query and returns the full Decision Brief.
     
     This is the $500/hr technical co-founder in your pocket - delivering
     instant, opinionated Decision Briefs that drive immediate action.
+
+    If the client disconnects first, the pipeline is cancelled unless other
+    identical requests are still waiting on it.
     """
     try:
         # Run the comparison pipeline
-        result = await compare_anything(request.query)
-        
-        # Get context from result
-        context = result.get("context")
-        
-        # Save the comparison
-        saved_comparison = SavedComparison(
-            query=request.query,
-            option_a=context.option_a if context else "",
-            option_b=context.option_b if context else "",
-            tech_category=context.tech_category if context else "other",
-            brief=result["brief"],
-            slider_data=result.get("slider_data"),
-            value_metrics=result.get("value_metrics")
-        )
-        
-        comparison_id = save_comparison(saved_comparison)
-        
-        # Get base URL from environment or use default
-        import os
-        base_url = os.getenv("BASE_URL", "http://localhost:3000")  # Default to localhost for dev
-        
-        return {
-            "brief": result["brief"],
-            "slider_data": result.get("slider_data", {}),  # For future interactive frontend
-            "value_metrics": result.get("value_metrics", {}),  # Value metrics for frontend
-            "query": request.query,
-            "comparison_id": comparison_id,  # NEW: Return the shareable ID
-            "share_url": f"{base_url}/c/{comparison_id}"  # NEW: Shareable URL
-        }
+        result = await cancel_on_disconnect(http_request, "compare", compare_anything(request.query))
+        return _save_result(request.query, result)
+    except ClientDisconnected:
+        # Nobody is listening; 499 is the conventional "client closed request"
+        return Response(status_code=499)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -114,6 +155,224 @@ async def compare(request: QueryRequest) -> Dict[str, Any]:
         )
 
 
+@router.post("/compare/stream")
+async def compare_stream(
+    request: QueryRequest,
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+) -> StreamingResponse:
+    """
+    Streaming variant of /compare.
+
+    Sends an event as each stage finishes: `context`, then `cost`,
+    `performance` and `risks` in completion order, `narrative` token deltas,
+    `value_metrics`, and finally `done` with the same body /compare returns.
+    A specialist stage that fails or misses its deadline is reported as a
+    `gap` event and the brief is written without it.
+    Failures are reported as an `error` event. Use `?format=ndjson` for
+    newline-delimited JSON instead of Server-Sent Events.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: Dict[str, Any]) -> None:
+        await queue.put((event, data))
+
+    async def produce() -> None:
+        try:
+            result = await run_pipeline(request.query, emit)
+            await queue.put(("done", _save_result(request.query, result)))
+        except Exception as e:
+            await queue.put(("error", {"detail": f"Comparison generation failed: {str(e)}"}))
+        finally:
+            await queue.put(None)
+
+    async def events() -> AsyncIterator[str]:
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield _format_event(item[0], item[1], format)
+        finally:
+            if not task.done():
+                task.cancel()
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _run_compare_job(payload: Dict[str, Any], emit) -> Dict[str, Any]:
+    result = await run_pipeline(payload["query"], emit)
+    return _save_result(payload["query"], result)
+
+
+# Background comparisons: run by a worker pool, independent of the request
+compare_jobs = JobQueue(
+    "compare",
+    _run_compare_job,
+    workers=settings.compare_job_workers,
+    max_queued=settings.compare_job_queue_size,
+    store_dir=settings.compare_job_dir,
+    ttl_seconds=settings.compare_job_ttl_seconds,
+)
+
+
+def _job_body(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "query": job.payload.get("query"),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "result": job.result,
+        "error": job.error,
+    }
+
+
+async def _get_job(job_id: str) -> Job:
+    job = await compare_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/compare/jobs", status_code=202)
+async def submit_compare_job(request: QueryRequest) -> Dict[str, Any]:
+    """
+    Queues a comparison and returns its job id at once.
+
+    The job runs on a server-side worker whether or not anyone is still
+    listening; poll `GET /compare/jobs/{job_id}` or stream its events.
+    """
+    try:
+        job = await compare_jobs.submit({"query": request.query})
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/compare/jobs/{job_id}")
+async def get_compare_job(job_id: str) -> Dict[str, Any]:
+    """
+    Job status (`queued`, `running`, `completed`, `failed`), with the same
+    body /compare returns as `result` once it has completed.
+    """
+    return _job_body(await _get_job(job_id))
+
+
+@router.get("/compare/jobs/{job_id}/events")
+async def compare_job_events(
+    job_id: str,
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+) -> StreamingResponse:
+    """
+    Stage events of a job, as /compare/stream sends them: the events so far
+    are replayed, then new ones follow until `done` or `error`.
+    Disconnecting only stops the stream, not the job.
+    """
+    job = await _get_job(job_id)
+
+    async def events() -> AsyncIterator[str]:
+        sent = 0
+        while True:
+            finished = job.finished
+            while sent < len(job.events):
+                event, data = job.events[sent]
+                sent += 1
+                yield _format_event(event, data, format)
+            if finished:
+                break
+            await job.wait_for_change()
+        if job.error is not None:
+            yield _format_event("error", {"detail": f"Comparison generation failed: {job.error}"}, format)
+        else:
+            yield _format_event("done", job.result or {}, format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/compare/batch")
+async def compare_batch(request: BatchRequest) -> StreamingResponse:
+    """
+    Runs many comparisons, streaming one NDJSON line per item as it finishes.
+
+    Items are free-text queries or {option_a, option_b, constraints} pairs.
+    At most `concurrency` pipelines run at once (capped by
+    COMPARE_BATCH_CONCURRENCY), at batch priority so interactive /compare
+    traffic is served first. Items repeating a pair already in the batch
+    reuse its result. Each line is a `result` event with the item's index;
+    a final `done` event summarizes the batch.
+    """
+    if len(request.items) > settings.compare_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.items)} items (max {settings.compare_batch_max_items})"
+        )
+    limit = min(request.concurrency or settings.compare_batch_concurrency, settings.compare_batch_concurrency)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_one(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            with priority(BATCH):
+                result = await run_pipeline(query)
+            return _save_result(query, result)
+
+    async def events() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        runs: Dict[Tuple, asyncio.Task] = {}
+        indexes: Dict[asyncio.Task, List[int]] = {}
+        for index, item in enumerate(request.items):
+            key = _batch_key(item)
+            if key not in runs:
+                runs[key] = asyncio.ensure_future(run_one(_batch_query(item)))
+                indexes[runs[key]] = []
+            indexes[runs[key]].append(index)
+
+        succeeded = failed = 0
+        pending = set(indexes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    for n, index in enumerate(indexes[task]):
+                        line = {"index": index, "query": _batch_query(request.items[index]), "reused": n > 0}
+                        if error is None:
+                            line.update(status="ok", result=task.result())
+                            succeeded += 1
+                        else:
+                            line.update(status="error", error=f"Comparison generation failed: {error}")
+                            failed += 1
+                        yield _format_event("result", line, "ndjson")
+        finally:
+            for task in pending:
+                task.cancel()
+
+        yield _format_event("done", {
+            "items": len(request.items),
+            "unique": len(indexes),
+            "succeeded": succeeded,
+            "failed": failed,
+            "duration": round(time.perf_counter() - started, 3),
+        }, "ndjson")
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/comparison/{comparison_id}")
 async def get_saved_comparison(comparison_id: str) -> Dict[str, Any]:
     """
@@ -133,6 +392,7 @@ async def get_saved_comparison(comparison_id: str) -> Dict[str, Any]:
         "brief": comparison.brief,
         "slider_data": comparison.slider_data,
         "value_metrics": comparison.value_metrics,
+        "usage": comparison.usage,
         "created_at": comparison.created_at.isoformat() if comparison.created_at else None,
         "view_count": comparison.view_count
     }
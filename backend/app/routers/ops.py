@@ -0,0 +1,210 @@
+"""
+Ops Router
+Operational visibility into the LLM provider layer.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import asyncio
+from typing import Any, Dict, Iterator, Optional
+
+from ..agents import context_agent, fused_agent, output_schemas
+from ..data_store import open_store, store_stats
+from ..agents.pair_cache import pair_cache
+from ..llm import (
+    breaker_stats,
+    hedge_stats,
+    latency_stats,
+    registry,
+    response_cache,
+    scheduler_stats,
+    usage_stats,
+    usage_totals,
+)
+from ..utils import json_extract
+from ..utils.cancellation import cancellation_stats
+from ..utils.metrics import loop_lag, metrics
+from ..utils.singleflight import singleflight_stats
+from ..utils.speculation import speculation_stats
+from ..utils.tracing import tracer
+from .multi_agent_compare import compare_jobs
+
+router = APIRouter(tags=["Ops"])
+
+# Served at the app root (/metrics), where Prometheus scrapes by default
+metrics_router = APIRouter(tags=["Ops"])
+
+
+@router.get("/ops/llm")
+async def llm_stats() -> Dict[str, Any]:
+    """
+    Operational stats, one section per subsystem:
+
+    - pools, cache, singleflight: pooled connections and request counters per
+      provider, response cache hits/misses, coalesced identical calls
+    - hedging, latency, breakers: failover/hedge counters, latency
+      percentiles, breaker state and adaptive deadline per provider/model
+    - rate_limits: queue depth and wait times per provider
+    - fused_specialists, query_parser, speculation, pair_cache: how specialist
+      work was saved (fused calls, local parses, speculative runs, pair hits)
+    - compare_jobs, cancellation: background job queue and disconnect savings
+    - tracing: recorded traces
+    - usage: tokens and USD cost (and cache savings) per stage:provider:model
+    - json_extract, agent_outputs: JSON parse outcomes and schema validity per agent
+    - decision_log: live/dead records, size, and compactions
+    """
+    return {
+        "registry_started": registry.started,
+        "pools": registry.stats(),
+        "cache": response_cache.stats(),
+        "singleflight": singleflight_stats(),
+        "hedging": hedge_stats.to_dict(),
+        "latency": latency_stats(),
+        "breakers": breaker_stats(),
+        "rate_limits": scheduler_stats(),
+        "fused_specialists": dict(fused_agent.stats),
+        "query_parser": dict(context_agent.stats),
+        "speculation": speculation_stats.to_dict(),
+        "pair_cache": pair_cache.stats(),
+        "compare_jobs": compare_jobs.stats(),
+        "cancellation": cancellation_stats.to_dict(),
+        "tracing": tracer.stats(),
+        "usage": usage_stats(),
+        "json_extract": dict(json_extract.stats),
+        "agent_outputs": output_schemas.validity_stats(),
+        "decision_log": store_stats(),
+    }
+
+
+@router.get("/ops/traces")
+async def recent_traces(
+    limit: int = Query(20, ge=1, le=500),
+    name: Optional[str] = Query(None, description="Only traces whose root span has this name (request, job)"),
+) -> Dict[str, Any]:
+    """Latest traces, newest first, summarized by their root span."""
+    return {"traces": tracer.recent(limit=limit, name=name)}
+
+
+@router.post("/ops/decision-log/compact")
+async def compact_decision_log() -> Dict[str, Any]:
+    """Compact the decision log now, regardless of the thresholds."""
+    report = await asyncio.to_thread(open_store().compact)
+    if report is None:
+        raise HTTPException(status_code=409, detail="Another compaction is running (or the log was cleared meanwhile)")
+    return report
+
+
+@router.get("/ops/traces/{trace_id}")
+async def get_trace(trace_id: str) -> Dict[str, Any]:
+    """Every span of one trace: stages, provider calls and persistence, with attributes."""
+    trace = tracer.trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+
+def _collect() -> Iterator:
+    """Stats kept by the provider layer, caches, queues and agents, as metric families."""
+    pools = registry.stats()
+    pools.pop("gemini_models_cached", None)
+    yield ("llm_provider_requests_total", "counter", "Provider calls started",
+           [({"provider": p}, s["requests"]) for p, s in pools.items()])
+    yield ("llm_provider_errors_total", "counter", "Provider calls that failed (timeouts included)",
+           [({"provider": p}, s["errors"]) for p, s in pools.items()])
+    yield ("llm_provider_timeouts_total", "counter", "Provider calls that exceeded their deadline",
+           [({"provider": p}, s["timeouts"]) for p, s in pools.items()])
+    yield ("llm_provider_in_flight", "gauge", "Provider calls currently running",
+           [({"provider": p}, s["in_flight"]) for p, s in pools.items()])
+
+    hedging = hedge_stats.to_dict()
+    yield ("llm_hedged_calls_total", "counter", "Calls made through a provider preference list",
+           [({}, hedging["calls"])])
+    yield ("llm_fallbacks_total", "counter", "Backup routes used: hedges fired, failovers after errors, all routes failed",
+           [({"kind": "hedge"}, hedging["hedges"]), ({"kind": "hedge_win"}, hedging["hedge_wins"]),
+            ({"kind": "failover"}, hedging["failovers"]), ({"kind": "exhausted"}, hedging["exhausted"])])
+
+    breakers = breaker_stats()
+    yield ("llm_breaker_open", "gauge", "1 while a provider/model circuit breaker is not closed",
+           [(dict(zip(("provider", "model"), key.split(":", 1))), float(b["state"] != "closed")) for key, b in breakers.items()])
+    yield ("llm_deadline_seconds", "gauge", "Current adaptive deadline per provider/model",
+           [(dict(zip(("provider", "model"), key.split(":", 1))), b["deadline"]) for key, b in breakers.items()])
+
+    cache = response_cache.stats()
+    yield ("llm_cache_lookups_total", "counter", "Response cache lookups by result",
+           [({"result": "memory_hit"}, cache["memory_hits"]), ({"result": "disk_hit"}, cache["disk_hits"]),
+            ({"result": "miss"}, cache["misses"])])
+    pairs = pair_cache.stats()
+    yield ("pair_cache_lookups_total", "counter", "Pair-level agent cache lookups by result",
+           [({"result": "hit"}, pairs["hits"]), ({"result": "miss"}, pairs["misses"])])
+    yield ("cache_hit_ratio", "gauge", "Hit ratio since start",
+           [({"cache": "llm_response"}, cache["hit_ratio"]), ({"cache": "pair"}, pairs["hit_ratio"])])
+    yield ("cache_entries", "gauge", "Entries held in memory",
+           [({"cache": "llm_response"}, cache["memory_entries"]), ({"cache": "pair"}, pairs["entries"])])
+
+    schedulers = scheduler_stats()
+    yield ("llm_rate_limit_queue_depth", "gauge", "Calls waiting for rate-limit tokens",
+           [({"provider": p, "priority": level}, n) for p, s in schedulers.items() for level, n in s["queue_depth"].items()])
+    yield ("llm_rate_limited_total", "counter", "429 responses from providers",
+           [({"provider": p}, s["rate_limited"]) for p, s in schedulers.items()])
+    jobs = compare_jobs.stats()
+    yield ("compare_job_queue_depth", "gauge", "Background compare jobs waiting for a worker", [({}, jobs["queue_depth"])])
+    yield ("compare_jobs_running", "gauge", "Background compare jobs running", [({}, jobs["running"])])
+    yield ("compare_jobs_total", "counter", "Background compare jobs by outcome",
+           [({"outcome": o}, jobs[o]) for o in ("submitted", "rejected", "completed", "failed")])
+    yield ("singleflight_in_flight", "gauge", "Coalesced operations currently running",
+           [({"group": g}, s["in_flight"]) for g, s in singleflight_stats().items()])
+
+    yield ("query_parses_total", "counter", "Compare queries parsed, by path",
+           [({"path": path}, n) for path, n in context_agent.stats.items()])
+    yield ("fused_sections_total", "counter", "Fused specialist sections, validated or sent to per-agent fallback",
+           [({"outcome": "ok"}, fused_agent.stats["sections_ok"]),
+            ({"outcome": "fallback"}, fused_agent.stats["sections_fallback"])])
+    yield ("llm_json_parses_total", "counter", "Agent JSON outputs by how they parsed",
+           [({"outcome": outcome}, n) for outcome, n in json_extract.stats.items()])
+    yield ("agent_outputs_total", "counter", "Agent outputs by schema validation outcome",
+           [({"agent": agent, "outcome": outcome}, n)
+            for agent, counters in output_schemas.stats.items()
+            for outcome, n in counters.items() if outcome != "retries"])
+    yield ("agent_output_retries_total", "counter", "Correction retries sent after a schema failure",
+           [({"agent": agent}, counters["retries"]) for agent, counters in output_schemas.stats.items()])
+    speculation = speculation_stats.to_dict()
+    yield ("speculation_total", "counter", "Speculative specialist runs by outcome",
+           [({"outcome": "hit"}, speculation["hits"]), ({"outcome": "mismatch"}, speculation["mismatches"])])
+    cancelled = cancellation_stats.to_dict()
+    yield ("client_disconnects_total", "counter", "Requests whose work was cancelled because the client left",
+           [({"route": r}, n) for r, n in cancelled["disconnects"].items()])
+    decisions = store_stats()
+    yield ("decision_log_records", "gauge", "Records in the decision log by state",
+           [({"state": "live"}, decisions["live_records"]), ({"state": "dead"}, decisions["dead_records"])])
+    yield ("decision_log_bytes", "gauge", "Size of the decision log file", [({}, decisions["bytes"])])
+    yield ("decision_log_compactions_total", "counter", "Decision log compactions completed",
+           [({}, decisions["compactions"])])
+    yield ("decision_log_reclaimed_bytes_total", "counter", "Bytes of dead records dropped by compaction",
+           [({}, decisions["reclaimed_bytes"])])
+    last = decisions["last_compaction"] or {}
+    yield ("decision_log_last_compaction_seconds", "gauge", "How long the latest compaction took",
+           [({}, last.get("duration_s", 0.0))])
+    yield ("event_loop_lag_last_seconds", "gauge", "Most recent event loop lag sample", [({}, loop_lag.last_lag)])
+
+    usage = usage_totals()
+    yield ("llm_tokens_total", "counter", "Tokens sent and received (cache hits excluded)",
+           [({"stage": s, "provider": p, "model": m, "kind": kind}, n)
+            for (s, p, m), t in usage.items()
+            for kind, n in (("prompt", t.prompt_tokens), ("completion", t.completion_tokens))])
+    yield ("llm_cost_usd_total", "counter", "Estimated USD spent on provider calls",
+           [({"stage": s, "provider": p, "model": m}, t.cost_usd) for (s, p, m), t in usage.items()])
+    yield ("llm_cost_saved_usd_total", "counter", "USD the response cache saved (priced cache hits)",
+           [({"stage": s, "provider": p, "model": m}, t.saved_usd) for (s, p, m), t in usage.items()])
+
+
+metrics.register_collector(_collect)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Prometheus text format: latency histograms per route, pipeline stage and
+    provider/model, plus error/fallback counts, cache hit ratios, queue
+    depths, event loop lag, and tokens and cost per stage/provider/model.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,127 @@
+"""
+Cancelling request work when the HTTP client goes away.
+A handler's work runs as a task next to a watcher polling for disconnect;
+if the client leaves first the task is cancelled, so stages that haven't
+started never spend provider quota. Work other callers still wait on is
+left alone (single-flight only cancels when the last waiter leaves), and an
+in-flight provider call whose answer is bound for the response cache is
+allowed to finish so the quota already spent isn't thrown away.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Optional, Tuple, TypeVar
+
+from fastapi import Request
+
+from ..config import settings
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client disconnected before the response was ready."""
+
+
+class RequestScope:
+    """Per-request flag, visible to every task the request's work spawns."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.client_gone = False
+
+
+_scope: ContextVar[Optional[RequestScope]] = ContextVar("request_scope", default=None)
+
+
+def client_disconnected() -> bool:
+    """Whether the current work is being cancelled because its client left."""
+    scope = _scope.get()
+    return scope is not None and scope.client_gone
+
+
+def start_shared(work: Awaitable[T], route: str) -> Tuple["asyncio.Future[T]", RequestScope]:
+    """
+    Start work other requests may join under a scope of its own, not the
+    starter's: its client leaving says nothing about the other waiters. The
+    caller marks the returned scope once the work is really abandoned.
+    """
+    scope = RequestScope(route)
+    token = _scope.set(scope)
+    try:
+        return asyncio.ensure_future(work), scope
+    finally:
+        _scope.reset(token)
+
+
+class CancellationStats:
+    """What disconnect cancellation stopped, and what it let finish."""
+
+    def __init__(self):
+        self.disconnects: Dict[str, int] = {}
+        self.stages_cancelled = 0
+        self.flights_cancelled = 0
+        self.flights_detached = 0
+
+    def record_disconnect(self, route: str) -> None:
+        self.disconnects[route] = self.disconnects.get(route, 0) + 1
+
+    def record_stages(self, count: int) -> None:
+        """Pipeline stages that were running or not yet started when cancelled."""
+        self.stages_cancelled += count
+
+    def record_flight(self, detached: bool) -> None:
+        """Shared in-flight work abandoned by its last waiter: cancelled or left to finish."""
+        if detached:
+            self.flights_detached += 1
+        else:
+            self.flights_cancelled += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "disconnects": dict(self.disconnects),
+            "stages_cancelled": self.stages_cancelled,
+            "flights_cancelled": self.flights_cancelled,
+            "flights_detached": self.flights_detached,
+        }
+
+
+cancellation_stats = CancellationStats()
+
+
+async def _watch(request: Request, interval: float) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+
+
+async def cancel_on_disconnect(request: Request, route: str, work: Awaitable[T]) -> T:
+    """
+    Await `work`, cancelling it if the client disconnects first.
+
+    Raises:
+        ClientDisconnected: The client left and the work was cancelled
+    """
+    scope = RequestScope(route)
+    token = _scope.set(scope)
+    try:
+        # The task copies the current context, so everything it spawns sees `scope`
+        task = asyncio.ensure_future(work)
+    finally:
+        _scope.reset(token)
+    watcher = asyncio.ensure_future(_watch(request, settings.disconnect_poll_interval))
+    try:
+        done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task in done:
+            return task.result()
+        if watcher.exception() is not None:
+            # Can't tell whether the client is there; just finish the work
+            return await task
+        scope.client_gone = True
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        cancellation_stats.record_disconnect(route)
+        raise ClientDisconnected(f"client disconnected from {route}")
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,203 @@
+"""
+Declarative stage-graph executor.
+Stages name the outputs they need and the outputs they provide; each one
+starts as soon as the producers of its inputs have finished, so independent
+stages run concurrently. Every stage can have its own timeout, the whole run
+can have a deadline, and each stage's status and timing are recorded.
+
+A critical stage that fails or times out aborts the run (`StageFailed`). A
+non-critical one becomes a gap: its outputs are missing, but stages that
+depend on them still run with whatever data there is.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+OK = "ok"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+class StageFailed(Exception):
+    """A critical stage failed, timed out or was cut off by the run deadline."""
+
+    def __init__(self, stage: str, status: str, error: Optional[str] = None):
+        detail = f": {error}" if error else ""
+        super().__init__(f"stage '{stage}' {status}{detail}")
+        self.stage = stage
+        self.status = status
+        self.error = error
+
+
+class Stage:
+    """
+    One node of the graph.
+
+    Args:
+        name: Stage name (used in timings and gaps)
+        run: Zero-argument coroutine function doing the work
+        requires: Outputs that must be produced before this stage starts
+        provides: Outputs this stage produces
+        critical: Whether failure aborts the run instead of leaving a gap
+        timeout: Seconds the stage may take (None = only the run deadline)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[Any]],
+        requires: Iterable[str] = (),
+        provides: Iterable[str] = (),
+        critical: bool = True,
+        timeout: Optional[float] = None,
+    ):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.provides = tuple(provides) or (name,)
+        self.critical = critical
+        self.timeout = timeout
+
+
+class StageOutcome:
+    def __init__(self, stage: Stage, status: str, started: float, duration: float, error: Optional[str] = None):
+        self.stage = stage
+        self.status = status
+        self.started = started
+        self.duration = duration
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {"status": self.status, "started": round(self.started, 4), "duration": round(self.duration, 4)}
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+
+class DagRun:
+    """Outcomes of one executed graph."""
+
+    def __init__(self):
+        self.outcomes: Dict[str, StageOutcome] = {}
+        self.duration = 0.0
+
+    @property
+    def gaps(self) -> List[Dict[str, Any]]:
+        """Stages that did not complete, with the outputs that are missing."""
+        return [
+            {"stage": name, "reason": outcome.status, "missing": list(outcome.stage.provides)}
+            for name, outcome in self.outcomes.items()
+            if not outcome.ok
+        ]
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        return {name: outcome.to_dict() for name, outcome in self.outcomes.items()}
+
+
+def _producers(stages: List[Stage]) -> Dict[str, Stage]:
+    producers: Dict[str, Stage] = {}
+    for stage in stages:
+        for output in stage.provides:
+            if output in producers:
+                raise ValueError(f"output '{output}' provided by both '{producers[output].name}' and '{stage.name}'")
+            producers[output] = stage
+    for stage in stages:
+        for needed in stage.requires:
+            if needed not in producers:
+                raise ValueError(f"stage '{stage.name}' requires '{needed}', which no stage provides")
+    return producers
+
+
+async def _run_stage(stage: Stage, timeout: Optional[float], origin: float) -> StageOutcome:
+    started = time.perf_counter()
+    status, error = OK, None
+    try:
+        if timeout is None:
+            await stage.run()
+        else:
+            await asyncio.wait_for(stage.run(), timeout=max(timeout, 0.0))
+    except asyncio.TimeoutError:
+        status = TIMEOUT
+    except Exception as e:
+        status, error = ERROR, str(e) or type(e).__name__
+    return StageOutcome(stage, status, started - origin, time.perf_counter() - started, error)
+
+
+async def run_dag(
+    stages: List[Stage],
+    deadline: Optional[float] = None,
+    on_outcome: Optional[Callable[[StageOutcome], Awaitable[None]]] = None,
+) -> DagRun:
+    """
+    Execute `stages` respecting their dependencies.
+
+    Args:
+        stages: Graph nodes; dependencies come from requires/provides
+        deadline: Seconds the whole run may take (None = unbounded)
+        on_outcome: Awaited with each stage's outcome as it finishes
+
+    Returns:
+        DagRun with per-stage status/timing and the gaps left by
+        non-critical stages
+
+    Raises:
+        StageFailed: A critical stage did not complete
+    """
+    producers = _producers(stages)
+    origin = time.perf_counter()
+    end = origin + deadline if deadline is not None else None
+    result = DagRun()
+    running: Dict[asyncio.Future, Stage] = {}
+    started: Dict[str, float] = {}
+
+    def remaining() -> Optional[float]:
+        return None if end is None else end - time.perf_counter()
+
+    def ready(stage: Stage) -> bool:
+        return stage.name not in started and all(
+            producers[needed].name in result.outcomes for needed in stage.requires
+        )
+
+    async def record(outcome: StageOutcome) -> None:
+        result.outcomes[outcome.stage.name] = outcome
+        if on_outcome is not None:
+            await on_outcome(outcome)
+        if not outcome.ok and outcome.stage.critical:
+            raise StageFailed(outcome.stage.name, outcome.status, outcome.error)
+
+    try:
+        while True:
+            for stage in stages:
+                if ready(stage):
+                    started[stage.name] = time.perf_counter()
+                    left = remaining()
+                    timeout = stage.timeout if left is None else min(stage.timeout or left, left)
+                    running[asyncio.ensure_future(_run_stage(stage, timeout, origin))] = stage
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Run deadline passed: whatever is still going becomes a timeout
+                now = time.perf_counter()
+                for task, stage in list(running.items()):
+                    task.cancel()
+                    del running[task]
+                    began = started[stage.name]
+                    await record(StageOutcome(stage, TIMEOUT, began - origin, now - began, "run deadline exceeded"))
+                continue
+            for task in done:
+                running.pop(task)
+                await record(task.result())
+        if len(result.outcomes) < len(stages):
+            raise ValueError("stage graph has a dependency cycle")
+    finally:
+        for task in running:
+            task.cancel()
+        result.duration = time.perf_counter() - origin
+    return result
@@ -0,0 +1,311 @@
+"""
+Append-only JSONL record log with an in-memory index.
+
+Every save appends one line (`put`) and every delete appends a tombstone
+(`del`); nothing is rewritten in place. The index maps each live id to the
+byte offset and length of its latest `put`, so a lookup reads and parses
+one line, and it is rebuilt by scanning the file when the log is opened.
+A line torn by a crash mid-append is the only thing that can be incomplete,
+so recovery truncates the file back to the last full line. Superseded puts
+and tombstones stay in the file as dead records until `compact()` copies
+the live ones into a fresh segment and swaps it in; `LogCompactor` does
+that in the background once dead records pass a ratio or size threshold.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PUT = "put"
+DELETE = "del"
+
+# id -> (offset, length, timestamp) of the id's latest put line
+Location = Tuple[int, int, float]
+
+
+def _line(entry: Dict[str, Any]) -> bytes:
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _apply(index: Dict[str, Location], entry: Dict[str, Any], offset: int, length: int) -> int:
+    """Apply one log entry to `index`; returns how many records it made dead."""
+    record_id = str(entry["id"])
+    if entry["op"] == PUT:
+        dead = 1 if record_id in index else 0
+        index[record_id] = (offset, length, float(entry.get("ts") or 0))
+        return dead
+    if entry["op"] == DELETE:
+        # The tombstone and the put it cancels are both dead from here on
+        return 2 if index.pop(record_id, None) is not None else 1
+    raise ValueError(f"unknown op {entry['op']!r}")
+
+
+class RecordLog:
+    """
+    Args:
+        path: JSONL file; created if missing
+        fsync: fsync after every append (survives power loss, not just a crash)
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.created = not os.path.exists(path)
+        self._index: Dict[str, Location] = {}
+        self._size = 0
+        self._dead = 0
+        self._lock = threading.Lock()
+        self.recovered_bytes = 0
+        self.corrupt_lines = 0
+        # Bumped by clear(), so a compaction that started before it is dropped
+        self._epoch = 0
+        self._compaction_lock = threading.Lock()
+        self.compactions = 0
+        self.reclaimed_bytes = 0
+        self.last_compaction: Optional[Dict[str, Any]] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(self._segment_path):
+            # Left by a compaction interrupted before its swap; the log itself is intact
+            os.remove(self._segment_path)
+        self._recover()
+        self._writer = open(path, "ab")
+        # Unbuffered: a read-ahead buffer would go stale when clear() truncates
+        self._reader = open(path, "rb", buffering=0)
+
+    def _recover(self) -> None:
+        """Rebuild the index from the file, cutting off a torn final line."""
+        with open(self.path, "a+b") as f:
+            f.seek(0)
+            offset = 0
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Crash mid-append: the record was never acknowledged
+                    self.recovered_bytes = os.path.getsize(self.path) - offset
+                    f.truncate(offset)
+                    logger.warning("Record log %s: dropped %d bytes of a torn record", self.path, self.recovered_bytes)
+                    break
+                try:
+                    self._dead += _apply(self._index, json.loads(raw), offset, len(raw))
+                except (ValueError, KeyError, TypeError):
+                    self.corrupt_lines += 1
+                    self._dead += 1
+                offset += len(raw)
+            self._size = offset
+
+    @property
+    def _segment_path(self) -> str:
+        return self.path + ".compact"
+
+    def _append(self, entry: Dict[str, Any]) -> Tuple[int, int]:
+        line = _line(entry)
+        self._writer.write(line)
+        self._writer.flush()
+        if self.fsync:
+            os.fsync(self._writer.fileno())
+        offset = self._size
+        self._size += len(line)
+        return offset, len(line)
+
+    def _read(self, location: Location) -> Dict[str, Any]:
+        offset, length, _ = location
+        self._reader.seek(offset)
+        return json.loads(self._reader.read(length))["value"]
+
+    def put(self, record_id: str, value: Dict[str, Any], timestamp: float = 0) -> None:
+        """Append `value` as the current version of `record_id`."""
+        entry = {"op": PUT, "id": str(record_id), "ts": timestamp, "value": value}
+        with self._lock:
+            offset, length = self._append(entry)
+            self._dead += _apply(self._index, entry, offset, length)
+
+    def delete(self, record_id: str) -> bool:
+        """Append a tombstone for `record_id`. False if it isn't live."""
+        entry = {"op": DELETE, "id": str(record_id)}
+        with self._lock:
+            if str(record_id) not in self._index:
+                return False
+            offset, length = self._append(entry)
+            self._dead += _apply(self._index, entry, offset, length)
+        return True
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            location = self._index.get(str(record_id))
+            return self._read(location) if location is not None else None
+
+    def values(self, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """Every live record, ordered by timestamp."""
+        with self._lock:
+            locations = sorted(self._index.values(), key=lambda loc: loc[2], reverse=newest_first)
+            # Read in file order to keep the reads sequential, then restore the sort
+            by_offset = {loc[0]: self._read(loc) for loc in sorted(locations)}
+        return [by_offset[loc[0]] for loc in locations]
+
+    def clear(self) -> int:
+        """Drop every record (truncates the file). Returns how many were live."""
+        with self._lock:
+            count = len(self._index)
+            self._writer.truncate(0)
+            self._index.clear()
+            self._size = 0
+            self._dead = 0
+            self._epoch += 1
+        return count
+
+    def needs_compaction(self, dead_ratio: float, max_bytes: int, min_dead: int) -> bool:
+        """At least `min_dead` dead records, and either their share or the file size is past its limit."""
+        if self._dead < min_dead:
+            return False
+        return self._dead / (len(self._index) + self._dead) >= dead_ratio or self._size >= max_bytes
+
+    def compact(self) -> Optional[Dict[str, Any]]:
+        """
+        Rewrite the live records into a fresh segment and swap it in.
+
+        The copy runs without the lock, so reads and appends carry on against
+        the old file; only the catch-up of records appended meanwhile and the
+        rename happen under it. Returns what was reclaimed, or None if a
+        compaction was already running or clear() raced it.
+        """
+        if not self._compaction_lock.acquire(blocking=False):
+            return None
+        try:
+            started = time.perf_counter()
+            with self._lock:
+                live = sorted(self._index.items(), key=lambda item: item[1][0])
+                copied_to = self._size
+                epoch = self._epoch
+
+            index: Dict[str, Location] = {}
+            src = open(self.path, "rb")
+            dst = open(self._segment_path, "wb")
+            try:
+                offset = 0
+                for record_id, (old_offset, length, timestamp) in live:
+                    src.seek(old_offset)
+                    dst.write(src.read(length))
+                    index[record_id] = (offset, length, timestamp)
+                    offset += length
+
+                with self._lock:
+                    if epoch != self._epoch:
+                        return None
+                    # Appends that landed while copying go over verbatim
+                    src.seek(copied_to)
+                    dead = 0
+                    for raw in src.read(self._size - copied_to).splitlines(keepends=True):
+                        dead += _apply(index, json.loads(raw), offset, len(raw))
+                        dst.write(raw)
+                        offset += len(raw)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                    before = self._size
+                    src.close()
+                    dst.close()
+                    self._writer.close()
+                    self._reader.close()
+                    try:
+                        os.replace(self._segment_path, self.path)
+                    finally:
+                        self._writer = open(self.path, "ab")
+                        self._reader = open(self.path, "rb", buffering=0)
+                    self._index = index
+                    self._size = offset
+                    self._dead = dead
+            finally:
+                src.close()
+                dst.close()
+                if os.path.exists(self._segment_path):
+                    os.remove(self._segment_path)
+
+            report = {
+                "reclaimed_bytes": before - offset,
+                "bytes_before": before,
+                "bytes_after": offset,
+                "live_records": len(index),
+                "duration_s": round(time.perf_counter() - started, 4),
+                "at": time.time(),
+            }
+            self.compactions += 1
+            self.reclaimed_bytes += report["reclaimed_bytes"]
+            self.last_compaction = report
+            logger.info("Compacted %s: %d bytes reclaimed in %.3fs", self.path, report["reclaimed_bytes"], report["duration_s"])
+            return report
+        finally:
+            self._compaction_lock.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> Dict[str, Any]:
+        total = len(self._index) + self._dead
+        return {
+            "path": self.path,
+            "live_records": len(self._index),
+            "dead_records": self._dead,
+            "dead_ratio": round(self._dead / total, 4) if total else 0.0,
+            "bytes": self._size,
+            "recovered_bytes": self.recovered_bytes,
+            "corrupt_lines": self.corrupt_lines,
+            "compactions": self.compactions,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "last_compaction": self.last_compaction,
+        }
+
+
+class LogCompactor:
+    """
+    Background task compacting a log (in a worker thread) whenever it passes
+    `RecordLog.needs_compaction()`, checked every `interval` seconds.
+    """
+
+    def __init__(
+        self,
+        get_log: Callable[[], RecordLog],
+        interval: float = 60.0,
+        dead_ratio: float = 0.5,
+        max_bytes: int = 64 * 1024 * 1024,
+        min_dead: int = 100,
+    ):
+        self.get_log = get_log
+        self.interval = interval
+        self.dead_ratio = dead_ratio
+        self.max_bytes = max_bytes
+        self.min_dead = min_dead
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def check(self) -> Optional[Dict[str, Any]]:
+        """Compact now if the log is past its thresholds."""
+        log = self.get_log()
+        if not log.needs_compaction(self.dead_ratio, self.max_bytes, self.min_dead):
+            return None
+        return await asyncio.to_thread(log.compact)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Decision log compaction failed")
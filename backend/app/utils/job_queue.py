@@ -0,0 +1,289 @@
+"""
+In-process background jobs with a bounded asyncio worker pool.
+A request enqueues work and gets a job id back immediately; workers run the
+job independently of any HTTP connection, recording progress events that
+clients can poll or stream. Job state is persisted as one JSON file per job
+so finished results survive a restart and interrupted jobs are re-queued.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Async callback receiving (event name, payload) as the job makes progress
+EmitFn = Callable[[str, Dict[str, Any]], Awaitable[None]]
+# Does the work: (job payload, emit) -> result body
+JobHandler = Callable[[Dict[str, Any], EmitFn], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(Exception):
+    """Raised by `submit` when the bounded queue has no room."""
+
+
+class Job:
+    """One unit of work and its progress."""
+
+    def __init__(self, payload: Dict[str, Any], job_id: Optional[str] = None):
+        self.id = job_id or secrets.token_urlsafe(12)
+        self.payload = payload
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Progress events, kept in memory for pollers/streamers of this process
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    async def emit(self, event: str, data: Dict[str, Any]) -> None:
+        self.events.append((event, data))
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake everyone waiting on the old event, then arm a fresh one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self) -> None:
+        await self._changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "payload": self.payload,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data.get("payload", {}), job_id=data["job_id"])
+        job.status = data.get("status", QUEUED)
+        job.created_at = data.get("created_at", job.created_at)
+        job.started_at = data.get("started_at")
+        job.finished_at = data.get("finished_at")
+        job.result = data.get("result")
+        job.error = data.get("error")
+        return job
+
+
+class JobQueue:
+    """
+    Bounded queue in front of a fixed number of asyncio workers.
+
+    Args:
+        name: Queue name (for logs and stats)
+        handler: Coroutine doing the work for one job
+        workers: Jobs run concurrently
+        max_queued: Jobs waiting before `submit` refuses new ones
+        store_dir: Directory for persisted job state (None = memory only)
+        ttl_seconds: How long finished jobs are kept
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: JobHandler,
+        workers: int = 4,
+        max_queued: int = 100,
+        store_dir: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.store_dir = store_dir
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the workers and re-queue jobs a previous process didn't finish."""
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        resumed = await asyncio.to_thread(self._load)
+        for job in resumed:
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                await self._finish(job, error="Job queue full after restart")
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        logger.info("Job queue %s started with %d workers (%d jobs resumed)", self.name, self.workers, len(resumed))
+
+    async def stop(self) -> None:
+        """Stop the workers. Unfinished jobs stay persisted and resume on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, payload: Dict[str, Any]) -> Job:
+        """Enqueue a job and return it at once (status `queued`)."""
+        if not self.started:
+            await self.start()
+        job = Job(payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self.max_queued} jobs waiting)")
+        self._jobs[job.id] = job
+        self.submitted += 1
+        await self._persist(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Job from this process, else its persisted state."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        data = await asyncio.to_thread(self._read, job_id)
+        return Job.from_dict(data) if data else None
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        await self._persist(job)
+        try:
+            # Jobs run outside any request, so each one is its own trace
+            with span("job", queue=self.name, job_id=job.id):
+                result = await self.handler(job.payload, job.emit)
+        except asyncio.CancelledError:
+            # Shutting down: leave it `running` on disk so the next start resumes it
+            raise
+        except Exception as e:
+            logger.warning("Job %s failed: %s", job.id, e)
+            await self._finish(job, error=str(e))
+        else:
+            await self._finish(job, result=result)
+
+    async def _finish(self, job: Job, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        job.result = result
+        job.error = error
+        job.status = FAILED if error is not None else COMPLETED
+        job.finished_at = time.time()
+        if error is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._jobs[job.id] = job
+        await self._persist(job)
+        job._notify()
+
+    # -- persistence -------------------------------------------------------
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.store_dir, f"{job_id}.json")
+
+    async def _persist(self, job: Job) -> None:
+        if self.store_dir is None:
+            return
+        try:
+            await asyncio.to_thread(self._write, job.to_dict())
+        except OSError as e:
+            # A job still runs if its state can't be saved; only restarts lose it
+            logger.warning("Could not persist job %s: %s", job.id, e)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self._path(data["job_id"])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        # Atomic swap so a crash never leaves a half-written job
+        os.replace(tmp_path, path)
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if self.store_dir is None or not job_id.replace("-", "").replace("_", "").isalnum():
+            return None
+        try:
+            with open(self._path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _load(self) -> List[Job]:
+        """Drop expired finished jobs; return unfinished ones to resume."""
+        if self.store_dir is None or not os.path.isdir(self.store_dir):
+            return []
+        now = time.time()
+        resumed = []
+        for name in sorted(os.listdir(self.store_dir)):
+            path = os.path.join(self.store_dir, name)
+            if not name.endswith(".json"):
+                if name.endswith(".tmp"):
+                    os.remove(path)
+                continue
+            data = self._read(name[:-len(".json")])
+            if data is None:
+                continue
+            job = Job.from_dict(data)
+            if job.finished:
+                if self.ttl_seconds is not None and now - (job.finished_at or 0) > self.ttl_seconds:
+                    os.remove(path)
+                continue
+            job.status = QUEUED
+            job.started_at = None
+            self._jobs[job.id] = job
+            resumed.append(job)
+        resumed.sort(key=lambda j: j.created_at)
+        return resumed
+
+    def stats(self) -> Dict[str, Any]:
+        states = {QUEUED: 0, RUNNING: 0}
+        for job in self._jobs.values():
+            if job.status in states:
+                states[job.status] += 1
+        return {
+            "workers": len(self._tasks),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "queued": states[QUEUED],
+            "running": states[RUNNING],
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
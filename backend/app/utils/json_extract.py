@@ -0,0 +1,216 @@
+"""
+Tolerant JSON extraction from LLM output.
+Models wrap their JSON in code fences, add a sentence before or after it,
+or get cut off by `max_tokens` halfway through an array. `extract_json()`
+finds the first balanced JSON object (or array) in the text, skipping
+anything around it, and when the text ends before the value closes it
+repairs the truncation: an unterminated string value is closed, a dangling
+key, comma or partial literal is dropped, and the open arrays/objects are
+closed. `JSONStream` does the same incrementally over streamed chunks.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_OPENERS = {"{": "}", "[": "]"}
+_SCALAR_CHARS = set("-+0123456789.eEtruefalsn")
+_WHITESPACE = set(" \t\r\n")
+# A trailing comma before a closer (`{"a": 1,}`), a common model slip
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# An escape cut off mid-way at the end of a truncated string
+_PARTIAL_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{0,3}$|\\$")
+
+# How parses went: clean json.loads, found inside noise, repaired, or unusable
+stats: Dict[str, int] = {"clean": 0, "extracted": 0, "repaired": 0, "failed": 0}
+
+
+class JSONExtractError(ValueError):
+    """No JSON value could be found or repaired in the text."""
+
+
+class JSONStream:
+    """
+    Incremental extractor: `feed()` chunks as they arrive and get the value
+    back as soon as the first balanced object closes; `partial()` gives a
+    repaired view of what has arrived so far; `value()` finishes the parse.
+    """
+
+    def __init__(self, openers: str = "{["):
+        self.openers = openers
+        self.buffer = ""
+        self.done = False
+        self.repaired = False
+        self._value: Any = None
+        self._reset(0)
+
+    def _reset(self, scan_from: int) -> None:
+        self._pos = scan_from
+        self._start: Optional[int] = None
+        # Open containers: [opener, expecting] with expecting one of key/colon/value/comma
+        self._stack: List[List[str]] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._scalar_start: Optional[int] = None
+        # Last prefix end that is valid JSON once the open containers are closed
+        self._safe: Optional[Tuple[int, str]] = None
+
+    def _closers(self) -> str:
+        return "".join(_OPENERS[opener] for opener, _ in reversed(self._stack))
+
+    def _value_ended(self, end: int) -> None:
+        self._stack[-1][1] = "comma"
+        self._safe = (end, self._closers())
+
+    def _restart(self) -> None:
+        """The current candidate isn't JSON; look for the next opener after it."""
+        self._reset(self._start + 1)
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """Add text; returns the value once the first complete one is found."""
+        if self.done:
+            return self._value
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text):
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self._start is None:
+                if c in self.openers:
+                    self._start = i
+                    self._stack.append([c, "key" if c == "{" else "value"])
+                    self._safe = (i + 1, self._closers())
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._stack[-1][1] = "colon"
+                    else:
+                        self._value_ended(i + 1)
+                continue
+
+            if self._scalar_start is not None:
+                if c in _SCALAR_CHARS:
+                    continue
+                self._scalar_start = None
+                self._value_ended(i)
+
+            top = self._stack[-1]
+            if c in _WHITESPACE:
+                continue
+            if c == '"' and top[1] in ("key", "value"):
+                self._in_string = True
+                self._string_is_key = top[1] == "key"
+            elif c in _OPENERS and top[1] == "value":
+                self._stack.append([c, "key" if c == "{" else "value"])
+                self._safe = (i + 1, self._closers())
+            elif c in "}]" and _OPENERS[top[0]] == c:
+                self._stack.pop()
+                if self._stack:
+                    self._value_ended(i + 1)
+                elif self._finish(text[self._start:i + 1]):
+                    return self._value
+                else:
+                    self._restart()
+            elif c == ":" and top[1] == "colon":
+                top[1] = "value"
+            elif c == "," and top[1] in ("comma", "key", "value"):
+                # A comma where a value was expected is kept for the trailing-comma fix
+                top[1] = "key" if top[0] == "{" else "value"
+            elif c in _SCALAR_CHARS and top[1] == "value":
+                self._scalar_start = i
+            else:
+                self._restart()
+        return None
+
+    def _finish(self, candidate: str, repaired: bool = False) -> bool:
+        for attempt, text in ((repaired, candidate), (True, _TRAILING_COMMA.sub(r"\1", candidate))):
+            try:
+                # Raw newlines inside strings are common in model output
+                self._value = json.loads(text, strict=False)
+            except ValueError:
+                continue
+            self.done = True
+            self.repaired = attempt
+            return True
+        return False
+
+    def _repair(self) -> Optional[str]:
+        """The text so far, truncated to its last complete value and closed."""
+        if self._start is None:
+            return None
+        text = self.buffer
+        if self._in_string and not self._string_is_key:
+            # Keep a cut-off string value: it is usually most of the content
+            return _PARTIAL_ESCAPE.sub("", text[self._start:]) + '"' + self._closers()
+        if self._scalar_start is not None and text[self._scalar_start:] in ("true", "false", "null"):
+            # A number at the cut may itself be cut short (1140 -> 11), so only literals are kept
+            return text[self._start:] + self._closers()
+        end, closers = self._safe
+        return text[self._start:end] + closers
+
+    def partial(self) -> Optional[Any]:
+        """Best-effort value of what has arrived so far (None if nothing usable yet)."""
+        if self.done:
+            return self._value
+        candidate = self._repair()
+        if candidate is None:
+            return None
+        try:
+            return json.loads(_TRAILING_COMMA.sub(r"\1", candidate), strict=False)
+        except ValueError:
+            return None
+
+    def value(self) -> Any:
+        """
+        The complete value, or the repaired truncated one at end of input.
+
+        Raises:
+            JSONExtractError: Nothing in the text could be read as JSON
+        """
+        if self.done:
+            return self._value
+        candidate = self._repair()
+        if candidate is not None and self._finish(candidate, repaired=True):
+            return self._value
+        raise JSONExtractError(f"no JSON value found in {len(self.buffer)} chars of output")
+
+
+def extract_json(text: str, openers: str = "{[") -> Any:
+    """
+    Parse the first JSON object or array in `text`, tolerating code fences,
+    surrounding prose, trailing commas and truncated output.
+
+    Raises:
+        JSONExtractError: Nothing in the text could be read as JSON
+    """
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict) or (isinstance(value, list) and "[" in openers):
+            stats["clean"] += 1
+            return value
+    except (TypeError, ValueError):
+        pass
+    stream = JSONStream(openers)
+    try:
+        stream.feed(text or "")
+        value = stream.value()
+    except JSONExtractError:
+        stats["failed"] += 1
+        raise
+    stats["repaired" if stream.repaired else "extracted"] += 1
+    return value
+
+
+def extract_object(text: str) -> Dict[str, Any]:
+    """`extract_json()` for callers that need a JSON object: arrays around it are skipped."""
+    return extract_json(text, openers="{")
@@ -0,0 +1,97 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key await one shared task instead of
+each starting their own copy of the work.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from .cancellation import RequestScope, cancellation_stats, client_disconnected, start_shared
+
+T = TypeVar("T")
+
+# All named groups, for ops reporting
+_GROUPS: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key starts the work as a task; later callers with
+    the same key await that task until it finishes. Waiters are shielded, so a
+    caller that gets cancelled stops waiting without cancelling the shared
+    work for everyone else. Only when the last waiter is gone is the work
+    itself cancelled, since nobody needs its result any more, unless the
+    waiter's client disconnected and the call was made with `keep=True`
+    (its result is cached for later callers): then it is left to finish.
+    The work runs under its own request scope, which reports a disconnect
+    only once that last waiter has left because its client did.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._scopes: Dict[asyncio.Task, RequestScope] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+        self.detached = 0
+        _GROUPS[name] = self
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], keep: bool = False) -> T:
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task, scope = start_shared(fn(), self.name)
+            self._scopes[task] = scope
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if self._waiters[task] == 0:
+                del self._waiters[task]
+                if not task.done():
+                    gone = client_disconnected()
+                    if gone:
+                        # Nested flights inside the work now see the disconnect too
+                        self._scopes[task].client_gone = True
+                    if keep and gone:
+                        self.detached += 1
+                    else:
+                        task.cancel()
+                        self.abandoned += 1
+                    if gone:
+                        cancellation_stats.record_flight(detached=keep)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._scopes.pop(task, None)
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight(),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "detached": self.detached,
+        }
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: group.stats() for name, group in _GROUPS.items()}
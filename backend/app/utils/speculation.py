@@ -0,0 +1,49 @@
+"""
+Bookkeeping for speculative pipeline work.
+Specialist agents may start on a guessed context before the real one is
+known; these counters show how often the guess held and what it bought.
+"""
+
+from typing import Any, Dict
+
+
+class SpeculationStats:
+    """Hit/mismatch counts with the latency saved by hits and wasted by misses."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.hits = 0
+        self.mismatches = 0
+        # Mismatches where the pair agreed but the constraints didn't
+        self.constraint_mismatches = 0
+        self.saved_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    def record_hit(self, saved: float) -> None:
+        """The guess held; downstream work started `saved` seconds earlier."""
+        self.attempts += 1
+        self.hits += 1
+        self.saved_seconds += saved
+
+    def record_mismatch(self, wasted: float, constraints_only: bool = False) -> None:
+        """The guess was wrong; `wasted` seconds of speculative work were cancelled."""
+        self.attempts += 1
+        self.mismatches += 1
+        if constraints_only:
+            self.constraint_mismatches += 1
+        self.wasted_seconds += wasted
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "mismatches": self.mismatches,
+            "constraint_mismatches": self.constraint_mismatches,
+            "mismatch_rate": round(self.mismatches / self.attempts, 4) if self.attempts else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "avg_saved_seconds": round(self.saved_seconds / self.hits, 3) if self.hits else 0.0,
+            "wasted_seconds": round(self.wasted_seconds, 3),
+        }
+
+
+speculation_stats = SpeculationStats()
@@ -0,0 +1,246 @@
+"""
+Lightweight in-process tracing.
+Spans nest through a context variable, so a span opened in a request, a
+pipeline stage or a provider call becomes the parent of everything started
+inside it, including tasks spawned from there. Finished spans go to an
+in-memory ring buffer (queried through /api/ops/traces) and, when
+TRACE_JSONL_PATH is set, are appended to a JSONL file. The HTTP middleware
+opens the root span per request and reports stage timings in a
+`Server-Timing` response header.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+
+class Span:
+    """One timed operation with attributes."""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status = OK
+        self.error: Optional[str] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+
+    @property
+    def elapsed(self) -> float:
+        return self.duration if self.duration is not None else time.perf_counter() - self._start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            cancelled = isinstance(error, (asyncio.CancelledError, GeneratorExit))
+            self.status = CANCELLED if cancelled else ERROR
+            self.error = None if cancelled else (str(error) or type(error).__name__)
+        tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": round(self.started_at, 6),
+            "duration_ms": round(self.elapsed * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span, if there is one."""
+    active = _current.get()
+    if active is not None:
+        active.set(**attributes)
+
+
+def start_span(name: str, **attributes: Any) -> Span:
+    """
+    Span under the current one that is not made current. For async
+    generators, where a context variable set between yields would leak
+    into the consumer; call `finish()` when done.
+    """
+    return Span(name, _current.get(), attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Open a span as the current one for the enclosed block."""
+    active = Span(name, _current.get(), attributes)
+    token = _current.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.finish(e)
+        raise
+    finally:
+        _current.reset(token)
+        active.finish()
+
+
+class Tracer:
+    """
+    Keeps the most recent finished spans, grouped by trace.
+
+    Args:
+        max_spans: Spans kept in memory before the oldest are dropped
+        jsonl_path: File each finished span is appended to ("" = none)
+    """
+
+    def __init__(self, max_spans: int = 5000, jsonl_path: str = ""):
+        self.enabled = True
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self.jsonl_path = jsonl_path
+        self._file = None
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, finished: Span) -> None:
+        if not self.enabled:
+            return
+        if len(self._spans) == self._spans.maxlen:
+            # Drop the evicted span from its trace as well
+            oldest = self._spans[0]
+            siblings = self._traces.get(oldest.trace_id)
+            if siblings is not None:
+                siblings.remove(oldest)
+                if not siblings:
+                    del self._traces[oldest.trace_id]
+        self._spans.append(finished)
+        self._traces.setdefault(finished.trace_id, []).append(finished)
+        self._traces.move_to_end(finished.trace_id)
+        self.exported += 1
+        if self.jsonl_path:
+            self._write(finished)
+
+    def _write(self, finished: Span) -> None:
+        line = json.dumps(finished.to_dict(), default=str) + "\n"
+        try:
+            with self._lock:
+                if self._file is None:
+                    # Line-buffered append: one small write per span, no rewrite
+                    self._file = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line)
+        except OSError as e:
+            logger.warning("Could not write span to %s: %s", self.jsonl_path, e)
+            self.jsonl_path = ""
+
+    def spans(self, trace_id: str) -> List[Span]:
+        return list(self._traces.get(trace_id, []))
+
+    def trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        spans = self.spans(trace_id)
+        if not spans:
+            return None
+        return {"trace_id": trace_id, "spans": [s.to_dict() for s in sorted(spans, key=lambda s: s.started_at)]}
+
+    def recent(self, limit: int = 20, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Summaries of the latest traces (newest first), by root span."""
+        summaries = []
+        for trace_id in reversed(self._traces):
+            spans = self._traces[trace_id]
+            root = next((s for s in spans if s.parent_id is None), None)
+            if root is None or (name is not None and root.name != name):
+                continue
+            summaries.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "started_at": round(root.started_at, 6),
+                "duration_ms": round(root.elapsed * 1000, 3),
+                "status": root.status,
+                "spans": len(spans),
+                "attributes": root.attributes,
+            })
+            if len(summaries) >= limit:
+                break
+        return summaries
+
+    def clear(self) -> None:
+        self._spans.clear()
+        self._traces.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "spans": len(self._spans),
+            "traces": len(self._traces),
+            "exported": self.exported,
+            "jsonl_path": self.jsonl_path or None,
+        }
+
+
+tracer = Tracer(max_spans=settings.trace_buffer_size, jsonl_path=settings.trace_jsonl_path)
+tracer.enabled = settings.tracing_enabled
+
+
+def server_timing(root: Span) -> str:
+    """`Server-Timing` value: finished stage/persistence spans of the trace, then the total."""
+    entries: "OrderedDict[str, float]" = OrderedDict()
+    for finished in sorted(tracer.spans(root.trace_id), key=lambda s: s.started_at):
+        if finished.name.startswith("stage.") or finished.name == "persistence":
+            metric = finished.name.split(".", 1)[-1]
+            entries[metric] = entries.get(metric, 0.0) + finished.elapsed
+    entries["total"] = root.elapsed
+    return ", ".join(f"{metric};dur={seconds * 1000:.1f}" for metric, seconds in entries.items())
+
+
+class TracingMiddleware:
+    """ASGI middleware: one root span per HTTP request, plus the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Ops endpoints (including the trace queries) are not traced themselves
+        if scope["type"] != "http" or not tracer.enabled or scope["path"].startswith("/api/ops"):
+            await self.app(scope, receive, send)
+            return
+
+        with span("request", method=scope["method"], path=scope["path"]) as root:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    root.set(status_code=message["status"])
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(root).encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -67,6 +67,8 @@ def calculate_money_saved(cost_data: dict) -> int:
         return 0
     
     tco = cost_data['year1_tco']
+    if not isinstance(tco, dict):
+        return 0
     cost_a = tco.get('a', 0)
     cost_b = tco.get('b', 0)
     
@@ -103,10 +105,12 @@ def calculate_confidence_score(cost_data: dict, perf_data: dict, risk_data: dict
     # Factor 1: Cost difference clarity (30 points max)
     if cost_data and 'year1_tco' in cost_data:
         tco = cost_data['year1_tco']
-        cost_a = tco.get('a', 1)
-        cost_b = tco.get('b', 1)
+        cost_a = tco.get('a', 1) if isinstance(tco, dict) else None
+        cost_b = tco.get('b', 1) if isinstance(tco, dict) else None
         
-        if cost_a > 0 and cost_b > 0:
+        # Schema-checked outputs are numeric; cached or hand-built data may not be
+        numeric = isinstance(cost_a, (int, float)) and isinstance(cost_b, (int, float))
+        if numeric and cost_a > 0 and cost_b > 0:
             max_cost = max(cost_a, cost_b)
             cost_diff_pct = abs(cost_a - cost_b) / max_cost * 100
             
@@ -0,0 +1,77 @@
+import json
+from typing import Callable, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.agents.pair_cache import pair_cache
+from backend.app.llm import LLMProvider, providers, register_provider, response_cache
+from backend.app.main import app
+
+# Providers the agents route to
+PROVIDER_NAMES = ("groq", "deepseek", "gemini")
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers each agent prompt with a fixed, well-formed payload."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.default_model = "scripted"
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        if "query parser" in prompt:
+            return json.dumps({"option_a": "Firebase", "option_b": "Supabase", "constraints": ["low cost"]})
+        if "cost analyst" in prompt:
+            return json.dumps({
+                "year1_tco": {"a": 1140, "b": 300},
+                "breakeven_users": 40000,
+                "slider_data": {"users_levels": [1000], "costs_a": [25], "costs_b": [10]},
+                "traps": [],
+            })
+        if "Compare performance" in prompt:
+            return json.dumps({"benchmarks": {"latency_ms": {"a": 100, "b": 90}}, "war_stories": []})
+        if "Analyze risks" in prompt:
+            return json.dumps({"gotchas_a": ["Read costs"], "gotchas_b": [], "migration_effort": {}})
+        return "Pick Supabase. Here's why."
+
+    async def _stream(self, prompt, model, system, temperature, max_tokens):
+        for word in (await self._generate(prompt, model, system, temperature, max_tokens)).split(" "):
+            yield word + " "
+
+
+@pytest.fixture
+def swap_providers():
+    """
+    Installs fake providers with the response and pair caches off; the real
+    providers and cache settings come back after the test.
+
+    Call it with a factory taking the provider name; returns the providers.
+    """
+    saved = dict(providers._PROVIDERS)
+    cache_enabled = response_cache.enabled
+    response_cache.enabled = False
+    pair_enabled, pair_cache.enabled = pair_cache.enabled, False
+
+    def install(make: Callable[[str], LLMProvider], names=PROVIDER_NAMES) -> List[LLMProvider]:
+        installed = [make(name) for name in names]
+        for provider in installed:
+            register_provider(provider)
+        return installed
+
+    yield install
+    providers._PROVIDERS.clear()
+    providers._PROVIDERS.update(saved)
+    response_cache.enabled = cache_enabled
+    pair_cache.enabled = pair_enabled
+
+
+@pytest.fixture
+def scripted(swap_providers):
+    return swap_providers(ScriptedProvider)
+
+
+@pytest.fixture
+def client(scripted):
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.app.llm import CircuitOpenError, LLMProvider, ProviderTimeout, providers, register_provider
+from backend.app.llm.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, _BREAKERS, deadline
+from backend.app.llm.latency import latency_tracker
+
+
+class FlakyProvider(LLMProvider):
+    def __init__(self, name: str, fail: bool = True, delay: float = 0.0):
+        self.name = name
+        self.default_model = "flaky"
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("503")
+        return "ok"
+
+
+@pytest.fixture
+def flaky_env(monkeypatch, swap_providers):
+    monkeypatch.setenv("LLM_BREAKER_FAILURE_THRESHOLD", "2")
+    yield
+    for key in [k for k in _BREAKERS if k[0].startswith("flaky")]:
+        del _BREAKERS[key]
+
+
+def test_breaker_state_machine():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    # Only one probe at a time while half-open
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_open_breaker_skips_provider_immediately(flaky_env):
+    provider = FlakyProvider("flaky-open")
+    register_provider(provider)
+
+    async def call():
+        return await providers.complete("flaky-open", "hi")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(call())
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call())
+    assert provider.calls == 2
+
+
+def test_adaptive_deadline_times_out_hung_calls(flaky_env, monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT_MIN_SAMPLES", "5")
+    monkeypatch.setenv("LLM_TIMEOUT_MIN", "0.05")
+    tracker = latency_tracker("flaky-slow", "flaky")
+    for _ in range(5):
+        tracker.record(0.02)
+    assert deadline("flaky-slow", "flaky") == pytest.approx(0.05)
+
+    register_provider(FlakyProvider("flaky-slow", fail=False, delay=1.0))
+    start = time.perf_counter()
+    with pytest.raises(ProviderTimeout):
+        asyncio.run(providers.complete("flaky-slow", "hi"))
+    assert time.perf_counter() - start < 0.5
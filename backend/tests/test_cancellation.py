@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from backend.app.utils.cancellation import (
+    ClientDisconnected,
+    cancel_on_disconnect,
+    cancellation_stats,
+    client_disconnected,
+)
+from backend.app.utils.singleflight import SingleFlight
+
+
+class FakeRequest:
+    """Reports a disconnect once `after` seconds have passed."""
+
+    def __init__(self, after: float):
+        self.after = after
+        self.started = None
+
+    async def is_disconnected(self) -> bool:
+        loop = asyncio.get_running_loop()
+        if self.started is None:
+            self.started = loop.time()
+        return loop.time() - self.started >= self.after
+
+
+def test_disconnect_cancels_work_but_lets_cache_bound_calls_finish(monkeypatch):
+    monkeypatch.setattr("backend.app.config.Settings.disconnect_poll_interval", 0.01)
+
+    async def scenario():
+        flight = SingleFlight("disconnect-test")
+        finished = []
+
+        async def provider_call(name):
+            await asyncio.sleep(0.1)
+            finished.append(name)
+            return name
+
+        async def handler():
+            assert not client_disconnected()
+            await asyncio.gather(
+                flight.do("cached", lambda: provider_call("cached"), keep=True),
+                flight.do("uncached", lambda: provider_call("uncached")),
+            )
+            finished.append("handler")
+
+        before = cancellation_stats.to_dict()
+        with pytest.raises(ClientDisconnected):
+            await cancel_on_disconnect(FakeRequest(after=0.02), "test", handler())
+        await asyncio.sleep(0.15)
+        return finished, flight.stats(), before, cancellation_stats.to_dict()
+
+    finished, stats, before, after = asyncio.run(scenario())
+    assert finished == ["cached"]
+    assert (stats["detached"], stats["abandoned"]) == (1, 1)
+    assert after["disconnects"]["test"] == before["disconnects"].get("test", 0) + 1
+    assert after["flights_detached"] == before["flights_detached"] + 1
+    assert after["flights_cancelled"] == before["flights_cancelled"] + 1
+
+
+def test_connected_client_gets_result_and_errors():
+    async def ok():
+        return "brief"
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    assert asyncio.run(cancel_on_disconnect(FakeRequest(after=10), "test", ok())) == "brief"
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(cancel_on_disconnect(FakeRequest(after=10), "test", boom()))
+
+
+def test_one_of_two_coalesced_clients_disconnecting_leaves_shared_work_alone(monkeypatch):
+    monkeypatch.setattr("backend.app.config.Settings.disconnect_poll_interval", 0.01)
+
+    async def scenario():
+        compares = SingleFlight("coalesced-compare-test")
+        calls = SingleFlight("coalesced-call-test")
+        seen = []
+
+        async def provider_call():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def pipeline():
+            await asyncio.sleep(0.05)
+            # The first client is gone by now, but the second still waits
+            seen.append(client_disconnected())
+            return await calls.do("call", provider_call, keep=True)
+
+        async def handler():
+            return await compares.do("query", pipeline)
+
+        before = cancellation_stats.to_dict()
+        first = asyncio.ensure_future(cancel_on_disconnect(FakeRequest(after=0.02), "test", handler()))
+        second = asyncio.ensure_future(cancel_on_disconnect(FakeRequest(after=10), "test", handler()))
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        return results, seen, calls.stats(), before, cancellation_stats.to_dict()
+
+    (first, second), seen, calls, before, after = asyncio.run(scenario())
+    assert isinstance(first, ClientDisconnected)
+    assert second == "answer"
+    assert seen == [False]
+    assert calls["detached"] == 0
+    assert after["flights_detached"] == before["flights_detached"]
+    assert after["flights_cancelled"] == before["flights_cancelled"]
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.routers.multi_agent_compare import compare_jobs
+from backend.app.utils.job_queue import COMPLETED, FAILED, JobQueue, QueueFullError
+
+
+@pytest.fixture
+def client(scripted, tmp_path):
+    store_dir, compare_jobs.store_dir = compare_jobs.store_dir, str(tmp_path)
+    with TestClient(app) as c:
+        yield c
+    compare_jobs.store_dir = store_dir
+
+
+def _wait(client, job_id):
+    for _ in range(200):
+        body = client.get(f"/api/compare/jobs/{job_id}").json()
+        if body["status"] in (COMPLETED, FAILED):
+            return body
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_runs_in_background_and_streams_events(client, tmp_path):
+    r = client.post("/api/compare/jobs", json={"query": "Firebase vs Supabase for a low-cost MVP"})
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+
+    body = _wait(client, job_id)
+    assert body["status"] == COMPLETED
+    assert body["result"]["brief"].startswith("Pick Supabase.")
+    assert body["result"]["comparison_id"]
+    assert json.loads((tmp_path / f"{job_id}.json").read_text())["status"] == COMPLETED
+
+    # Events are replayed after the fact
+    r = client.get(f"/api/compare/jobs/{job_id}/events?format=ndjson")
+    names = [json.loads(line)["event"] for line in r.text.strip().split("\n")]
+    assert names[0] == "context"
+    assert names[-1] == "done"
+
+    assert client.get("/api/compare/jobs/missing").status_code == 404
+
+
+def test_queue_is_bounded_and_unfinished_jobs_resume(tmp_path):
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(payload, emit):
+            await emit("step", {"n": payload["n"]})
+            await release.wait()
+            return {"n": payload["n"]}
+
+        queue = JobQueue("test", handler, workers=1, max_queued=1, store_dir=str(tmp_path))
+        first = await queue.submit({"n": 1})
+        await asyncio.sleep(0.01)  # worker picks up the first job
+        second = await queue.submit({"n": 2})
+        with pytest.raises(QueueFullError):
+            await queue.submit({"n": 3})
+        assert queue.stats()["rejected"] == 1
+        await queue.stop()
+
+        # A new process picks both jobs up again from disk
+        release.set()
+        resumed = JobQueue("test", handler, workers=2, store_dir=str(tmp_path))
+        await resumed.start()
+        for _ in range(100):
+            if resumed.completed == 2:
+                break
+            await asyncio.sleep(0.01)
+        await resumed.stop()
+        return [await resumed.get(job.id) for job in (first, second)]
+
+    first, second = asyncio.run(scenario())
+    assert (first.status, first.result) == (COMPLETED, {"n": 1})
+    assert (second.status, second.result) == (COMPLETED, {"n": 2})
@@ -0,0 +1,68 @@
+import json
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_compare_returns_brief(client):
+    r = client.post("/api/compare", json={"query": "Firebase vs Supabase for a low-cost MVP"})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["brief"].startswith("Pick Supabase.")
+    assert data["slider_data"]["costs_b"] == [10]
+    assert data["comparison_id"]
+
+
+def test_compare_stream_sends_stage_events(client):
+    r = client.post("/api/compare/stream", json={"query": "Firebase vs Supabase for a low-cost MVP"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(r.text)
+    names = [name for name, _ in events]
+    assert names[0] == "context"
+    assert events[0][1]["option_a"] == "Firebase"
+    assert set(names[1:4]) == {"cost", "performance", "risks"}
+    assert names.count("narrative") > 1
+    assert names[-2:] == ["value_metrics", "done"]
+
+    streamed = "".join(data["delta"] for name, data in events if name == "narrative")
+    assert streamed.startswith("Pick Supabase.")
+    assert events[-1][1]["brief"].startswith("Pick Supabase.")
+
+
+def test_compare_stream_ndjson(client):
+    r = client.post("/api/compare/stream?format=ndjson", json={"query": "Firebase vs Supabase"})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.strip().split("\n")]
+    assert lines[0]["event"] == "context"
+    assert lines[-1]["event"] == "done"
+
+
+def test_compare_batch_streams_results_and_reuses_repeated_pairs(client):
+    items = [
+        "Firebase vs Supabase for a low-cost MVP",
+        {"option_a": "Firebase", "option_b": "Supabase", "constraints": ["low cost", "MVP"]},
+        {"option_a": "Postgres", "option_b": "MongoDB"},
+    ]
+    r = client.post("/api/compare/batch", json={"items": items, "concurrency": 2})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in r.text.strip().split("\n")]
+    results = {line["data"]["index"]: line["data"] for line in lines if line["event"] == "result"}
+    assert sorted(results) == [0, 1, 2]
+    assert all(data["status"] == "ok" for data in results.values())
+    assert results[0]["result"]["comparison_id"] == results[1]["result"]["comparison_id"]
+    assert [results[0]["reused"], results[1]["reused"]] == [False, True]
+    assert results[2]["query"] == "Postgres vs MongoDB"
+    assert lines[-1] == {"event": "done", "data": {**lines[-1]["data"], "items": 3, "unique": 2, "succeeded": 3, "failed": 0}}
+
+
+def test_compare_batch_rejects_empty(client):
+    assert client.post("/api/compare/batch", json={"items": []}).status_code == 422
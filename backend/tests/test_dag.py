@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app.llm import LLMProvider
+from backend.app import pipeline
+from backend.app.pipeline import run_pipeline
+from backend.app.utils.dag import Stage, StageFailed, run_dag
+
+
+def test_stages_run_after_their_inputs_and_in_parallel():
+    order = []
+
+    def stage(name, delay):
+        async def run():
+            order.append(f"start:{name}")
+            await asyncio.sleep(delay)
+            order.append(f"end:{name}")
+        return run
+
+    graph = [
+        Stage("a", stage("a", 0.01), provides=["x"]),
+        Stage("b", stage("b", 0.05), requires=["x"]),
+        Stage("c", stage("c", 0.01), requires=["x"]),
+        Stage("d", stage("d", 0), requires=["b", "c"]),
+    ]
+    run = asyncio.run(run_dag(graph))
+
+    assert order[:2] == ["start:a", "end:a"]
+    assert set(order[2:4]) == {"start:b", "start:c"}
+    assert order[-2:] == ["start:d", "end:d"]
+    assert run.gaps == []
+    assert set(run.timings()) == {"a", "b", "c", "d"}
+
+
+def test_non_critical_timeout_leaves_gap():
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def fine():
+        pass
+
+    graph = [
+        Stage("slow", slow, critical=False, timeout=0.01),
+        Stage("after", fine, requires=["slow"]),
+    ]
+    run = asyncio.run(run_dag(graph))
+    assert run.gaps == [{"stage": "slow", "reason": "timeout", "missing": ["slow"]}]
+    assert run.outcomes["after"].ok
+
+
+def test_critical_failure_and_deadline_abort():
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(StageFailed, match="boom"):
+        asyncio.run(run_dag([Stage("boom", boom)]))
+    with pytest.raises(StageFailed, match="deadline"):
+        asyncio.run(run_dag([Stage("slow", slow)], deadline=0.02))
+
+
+class SlowPerformanceProvider(LLMProvider):
+    def __init__(self, name: str):
+        self.name = name
+        self.default_model = "scripted"
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        if "cost analyst" in prompt:
+            return json.dumps({"year1_tco": {"a": 1140, "b": 300}, "slider_data": {"costs_a": [25], "costs_b": [10]}})
+        if "Compare performance" in prompt:
+            await asyncio.sleep(5)
+        if "Analyze risks" in prompt:
+            return json.dumps({"gotchas_a": ["Read costs"], "gotchas_b": []})
+        return "Pick Supabase. Here's why."
+
+
+@pytest.fixture
+def slow_performance(monkeypatch, swap_providers):
+    monkeypatch.setenv("PIPELINE_PERFORMANCE_TIMEOUT", "0.1")
+    monkeypatch.setenv("LLM_HEDGE_ENABLED", "false")
+    swap_providers(SlowPerformanceProvider)
+
+
+def test_brief_is_written_without_timed_out_stage(slow_performance):
+    events = []
+
+    async def emit(event, data):
+        events.append((event, data))
+
+    result = asyncio.run(run_pipeline("Firebase vs Supabase", emit))
+    assert result["brief"].startswith("Pick Supabase.")
+    assert result["gaps"] == [{"stage": "performance", "reason": "timeout", "missing": ["performance"]}]
+    assert ("gap", {"stage": "performance", "reason": "timeout"}) in events
+    assert result["timings"]["performance"]["status"] == "timeout"
+
+
+def test_error_output_is_reported_as_gap(slow_performance, monkeypatch):
+    async def failing_cost(context):
+        context.cost_breakdown = {"error": "provider down"}
+        return context
+
+    monkeypatch.setitem(pipeline.SPECIALISTS, "cost", failing_cost)
+    result = asyncio.run(run_pipeline("Firebase vs Supabase"))
+    assert {"stage": "cost", "reason": "error", "missing": ["cost_breakdown"]} in result["gaps"]
+    assert result["context"].cost_breakdown == {}
@@ -0,0 +1,158 @@
+import asyncio
+import builtins
+import json
+
+import pytest
+
+from backend.app import data_store
+from backend.app.utils.decision_log import LogCompactor, RecordLog
+
+
+def test_put_get_overwrite_and_delete(tmp_path):
+    log = RecordLog(str(tmp_path / "d.jsonl"))
+    log.put("a", {"id": "a", "v": 1}, 10)
+    log.put("b", {"id": "b", "v": 1}, 20)
+    log.put("a", {"id": "a", "v": 2}, 30)
+
+    assert log.get("a") == {"id": "a", "v": 2}
+    assert [r["id"] for r in log.values()] == ["a", "b"]
+    assert log.delete("b")
+    assert not log.delete("b")
+    assert log.get("b") is None
+    assert log.stats()["live_records"] == 1
+    # Superseded put, deleted put and its tombstone
+    assert log.stats()["dead_records"] == 3
+    assert len((tmp_path / "d.jsonl").read_bytes().splitlines()) == 4
+
+
+def test_index_is_rebuilt_on_reopen(tmp_path):
+    path = str(tmp_path / "d.jsonl")
+    log = RecordLog(path)
+    for i in range(5):
+        log.put(str(i), {"id": str(i)}, i)
+    log.delete("3")
+    log.close()
+
+    reopened = RecordLog(path)
+    assert not reopened.created
+    assert sorted(r["id"] for r in reopened.values()) == ["0", "1", "2", "4"]
+    assert reopened.get("4") == {"id": "4"}
+    assert reopened.stats()["dead_records"] == 2
+
+
+def test_torn_tail_is_truncated_on_recovery(tmp_path):
+    path = tmp_path / "d.jsonl"
+    log = RecordLog(str(path))
+    log.put("a", {"id": "a"}, 1)
+    log.close()
+    good = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"op":"put","id":"b","ts":2,"val')
+
+    recovered = RecordLog(str(path))
+    assert recovered.get("a") == {"id": "a"}
+    assert recovered.get("b") is None
+    assert recovered.recovered_bytes > 0
+    assert path.stat().st_size == good
+    # Appends after recovery start on a clean line
+    recovered.put("c", {"id": "c"}, 3)
+    recovered.close()
+    assert RecordLog(str(path)).get("c") == {"id": "c"}
+
+
+def test_clear(tmp_path):
+    log = RecordLog(str(tmp_path / "d.jsonl"))
+    log.put("a", {"id": "a"}, 1)
+    assert log.clear() == 1
+    assert log.values() == []
+    log.put("b", {"id": "b"}, 2)
+    assert log.get("b") == {"id": "b"}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    legacy = tmp_path / "decisions.json"
+    legacy.write_text(json.dumps([{"id": "old", "left": "A", "right": "B", "timestamp": 5}]), encoding="utf-8")
+    monkeypatch.setattr(data_store, "DATA_FILE", str(legacy))
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+    monkeypatch.setattr(data_store, "_store", None)
+    yield
+    data_store.open_store().close()
+
+
+def test_data_store_migrates_legacy_file_and_keeps_its_api(store):
+    assert data_store.get_decision_by_id("old")["left"] == "A"
+
+    saved = data_store.save_decision({"left": "Redis", "right": "Memcached"})
+    assert data_store.get_all_decisions()[0]["id"] == saved["id"]
+    assert data_store.import_decisions([{"id": "old", "left": "C", "right": "D", "timestamp": 5}]) == 1
+    assert data_store.get_decision_by_id("old")["left"] == "C"
+    assert data_store.delete_decision("old")
+    assert not data_store.delete_decision("old")
+    assert [d["id"] for d in data_store.get_all_decisions()] == [saved["id"]]
+    assert data_store.clear_all_decisions() == 1
+
+
+def test_interrupted_legacy_import_is_redone(store, tmp_path):
+    # What a crash mid-import leaves behind: a partial side file, no log
+    (tmp_path / "decisions.jsonl.import").write_bytes(b'{"op":"put","id":"half","ts":1,"value":{}}\n')
+    assert [d["id"] for d in data_store.get_all_decisions()] == ["old"]
+    assert not (tmp_path / "decisions.jsonl.import").exists()
+
+
+def test_compaction_keeps_live_records_and_shrinks_the_file(tmp_path):
+    path = tmp_path / "d.jsonl"
+    log = RecordLog(str(path))
+    for i in range(20):
+        log.put(str(i % 4), {"id": str(i % 4), "v": i}, i)
+    log.delete("3")
+    assert log.needs_compaction(dead_ratio=0.5, max_bytes=10**9, min_dead=1)
+    before = path.stat().st_size
+
+    report = log.compact()
+    assert report["reclaimed_bytes"] == before - path.stat().st_size > 0
+    assert report["live_records"] == 3
+    assert sorted((r["id"], r["v"]) for r in log.values()) == [("0", 16), ("1", 17), ("2", 18)]
+    assert log.stats()["dead_records"] == 0
+    assert not log.needs_compaction(dead_ratio=0.5, max_bytes=10**9, min_dead=1)
+    # Appends go to the new segment, and it survives a reopen
+    log.put("4", {"id": "4"}, 30)
+    log.close()
+    assert sorted(r["id"] for r in RecordLog(str(path)).values()) == ["0", "1", "2", "4"]
+
+
+def test_writes_during_compaction_are_carried_over(tmp_path, monkeypatch):
+    log = RecordLog(str(tmp_path / "d.jsonl"))
+    for i in range(3):
+        log.put(str(i), {"id": str(i), "v": 0}, i)
+    log.put("0", {"id": "0", "v": 1}, 5)
+
+    # Write while the live records are being copied (the log lock is free then)
+    real_open = builtins.open
+
+    def open_and_write(file, mode="r", *args, **kwargs):
+        f = real_open(file, mode, *args, **kwargs)
+        if str(file).endswith(".compact"):
+            log.put("1", {"id": "1", "v": 2}, 6)
+            log.delete("2")
+            log.put("9", {"id": "9"}, 7)
+        return f
+
+    monkeypatch.setattr(builtins, "open", open_and_write)
+    assert log.compact() is not None
+    monkeypatch.setattr(builtins, "open", real_open)
+
+    assert {r["id"]: r.get("v") for r in log.values()} == {"0": 1, "1": 2, "9": None}
+    log.close()
+    assert {r["id"] for r in RecordLog(log.path).values()} == {"0", "1", "9"}
+
+
+def test_compactor_runs_only_past_its_thresholds(tmp_path):
+    log = RecordLog(str(tmp_path / "d.jsonl"))
+    log.put("a", {"id": "a"}, 1)
+    log.put("a", {"id": "a"}, 2)
+    compactor = LogCompactor(lambda: log, dead_ratio=0.5, max_bytes=10**9, min_dead=2)
+    assert asyncio.run(compactor.check()) is None
+    log.put("a", {"id": "a"}, 3)
+    assert asyncio.run(compactor.check())["live_records"] == 1
+    assert log.stats()["compactions"] == 1
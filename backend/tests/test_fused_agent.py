@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.agents import fused_agent
+from backend.app.llm import LLMProvider
+from backend.app.main import app
+
+
+class FusedProvider(LLMProvider):
+    """Answers the fused prompt with a bad risks section; records every prompt."""
+
+    def __init__(self, name: str, prompts: list):
+        self.name = name
+        self.default_model = "scripted"
+        self.prompts = prompts
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        self.prompts.append(prompt)
+        if "query parser" in prompt:
+            return json.dumps({"option_a": "Firebase", "option_b": "Supabase", "constraints": []})
+        if "combined analysis" in prompt:
+            return json.dumps({
+                "cost_breakdown": {
+                    "year1_tco": {"a": 1140, "b": 300},
+                    "slider_data": {"users_levels": [1000], "costs_a": [25], "costs_b": [10]},
+                },
+                "performance": {"benchmarks": {"latency_ms": {"a": 100, "b": 90}}},
+                "risks": "not an object",
+            })
+        if "Analyze risks" in prompt:
+            return json.dumps({"gotchas_a": ["Read costs"], "gotchas_b": [], "migration_effort": {}})
+        return "Pick Supabase. Here's why."
+
+
+@pytest.fixture
+def prompts(monkeypatch, swap_providers):
+    monkeypatch.setenv("FUSED_SPECIALISTS", "true")
+    seen = []
+    swap_providers(lambda name: FusedProvider(name, seen))
+    return seen
+
+
+def test_fused_mode_falls_back_per_section(prompts):
+    before = dict(fused_agent.stats)
+    with TestClient(app) as client:
+        r = client.post("/api/compare", json={"query": "Firebase vs Supabase"})
+    assert r.status_code == 200
+    assert r.json()["slider_data"]["costs_b"] == [10]
+
+    # Only the invalid risks section was redone by its own agent
+    assert sum("Analyze risks" in p for p in prompts) == 1
+    assert not any("cost analyst" in p or "Compare performance" in p for p in prompts)
+    assert fused_agent.stats["sections_ok"] - before["sections_ok"] == 2
+    assert fused_agent.stats["sections_fallback"] - before["sections_fallback"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.app.llm import LLMProvider, Route, hedge_stats, hedged_complete, hedged_stream, providers, register_provider
+
+
+class TimedProvider(LLMProvider):
+    def __init__(self, name: str, delay: float, fail: bool = False):
+        self.name = name
+        self.default_model = "timed"
+        self.delay = delay
+        self.fail = fail
+        self.finished = 0
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        self.finished += 1
+        return self.name
+
+
+@pytest.fixture
+def hedge_env(monkeypatch, swap_providers):
+    monkeypatch.setenv("LLM_HEDGE_DEFAULT_DELAY", "0.05")
+
+
+def test_backup_fires_and_wins_when_primary_is_slow(hedge_env):
+    slow, fast = TimedProvider("slow", 1.0), TimedProvider("fast", 0.05)
+    register_provider(slow)
+    register_provider(fast)
+    wins_before = hedge_stats.hedge_wins
+
+    async def run():
+        start = time.perf_counter()
+        response = await hedged_complete([Route("slow"), Route("fast")], "hello")
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(1.1)
+        return response, elapsed
+
+    response, elapsed = asyncio.run(run())
+    assert response.text == "fast"
+    assert elapsed < 0.5
+    assert hedge_stats.hedge_wins == wins_before + 1
+    # The losing primary was cancelled rather than left running
+    assert slow.finished == 0
+
+
+def test_failover_is_immediate_when_primary_errors(hedge_env, monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_DEFAULT_DELAY", "5")
+    register_provider(TimedProvider("broken", 0.01, fail=True))
+    register_provider(TimedProvider("backup", 0.01))
+
+    async def run():
+        start = time.perf_counter()
+        response = await hedged_complete([Route("broken"), Route("backup")], "hello")
+        return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(run())
+    assert response.text == "backup"
+    assert elapsed < 1
+
+
+def test_all_routes_failing_raises(hedge_env):
+    register_provider(TimedProvider("broken", 0.01, fail=True))
+
+    with pytest.raises(providers.ProviderError):
+        asyncio.run(hedged_complete([Route("broken")], "hello"))
+
+
+def test_hedged_stream_relays_winner(hedge_env):
+    register_provider(TimedProvider("slow", 1.0))
+    register_provider(TimedProvider("fast", 0.01))
+
+    async def run():
+        return [chunk async for chunk in hedged_stream([Route("slow"), Route("fast")], "hello")]
+
+    assert asyncio.run(run()) == ["fast"]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from backend.app.agents import cost_agent
+from backend.app.llm import LLMProvider
+from backend.app.models import ComparisonContext
+from backend.app.utils.json_extract import JSONExtractError, JSONStream, extract_json, extract_object
+
+
+def test_clean_and_fenced_output():
+    assert extract_object('{"a": 1}') == {"a": 1}
+    assert extract_object('```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+
+
+def test_skips_prose_and_unrelated_brackets():
+    text = 'Sure! Here is the JSON [1]: {"a": {"b": "x}y"}} Let me know if you need more.'
+    assert extract_object(text) == {"a": {"b": "x}y"}}
+    assert extract_json("The list: [1, 2] and more") == [1, 2]
+
+
+def test_repairs_truncated_output():
+    assert extract_object('{"a": 1, "b": [1, 2, {"c": "cut off mid') == {"a": 1, "b": [1, 2, {"c": "cut off mid"}]}
+    assert extract_object('{"a": 1, "b": [1, 2,') == {"a": 1, "b": [1, 2]}
+    assert extract_object('{"a": 1, "b":') == {"a": 1}
+    assert extract_object('{"a": 1, "b"') == {"a": 1}
+    assert extract_object('{"a": true, "b": tru') == {"a": True}
+    # A number at the cut may be cut short itself
+    assert extract_object('{"a": 1, "b": 11') == {"a": 1}
+    assert extract_object('{"a": "esc \\u00') == {"a": "esc "}
+
+
+def test_trailing_commas_and_raw_newlines():
+    assert extract_object('{"a": [1, 2,], "b": 1,}') == {"a": [1, 2], "b": 1}
+    assert extract_object('{"a": "two\nlines"}') == {"a": "two\nlines"}
+
+
+def test_nothing_to_extract():
+    with pytest.raises(JSONExtractError):
+        extract_object("I can't {help} with that")
+    with pytest.raises(JSONExtractError):
+        extract_object("[1, 2]")
+
+
+def test_stream_returns_value_when_object_closes():
+    stream = JSONStream()
+    assert stream.feed('Here you go: {"x": [1') is None
+    assert stream.partial() == {"x": []}  # "1" may still be growing
+    assert stream.feed(', 2], "y": "he') is None
+    assert stream.partial() == {"x": [1, 2], "y": "he"}
+    assert stream.feed('llo"} and some trailing prose') == {"x": [1, 2], "y": "hello"}
+    assert stream.value() == {"x": [1, 2], "y": "hello"}
+    assert not stream.repaired
+
+
+class TruncatingProvider(LLMProvider):
+    def __init__(self, name: str):
+        self.name = name
+        self.default_model = "scripted"
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        return 'Here is the breakdown:\n```json\n{"year1_tco": {"a": 300, "b": 1140}, "traps": ["Read overages", "Egr'
+
+
+@pytest.fixture
+def truncating(swap_providers):
+    swap_providers(TruncatingProvider)
+
+
+def test_agent_keeps_truncated_output(truncating):
+    context = ComparisonContext(query="q", option_a="Firebase", option_b="Supabase")
+    asyncio.run(cost_agent.run(context))
+    assert context.cost_breakdown == {"year1_tco": {"a": 300, "b": 1140}, "traps": ["Read overages", "Egr"]}
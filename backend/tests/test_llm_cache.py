@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.app.llm import LLMProvider, providers, register_provider
+from backend.app.llm.cache import ResponseCache, cache_key
+from backend.app.utils.lru_cache import LRUCache
+
+
+class CountingProvider(LLMProvider):
+    name = "counting"
+    default_model = "count-1"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    cache = ResponseCache(root=str(tmp_path), max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(providers, "response_cache", cache)
+    provider = CountingProvider()
+    register_provider(provider)
+    yield cache, provider
+    providers._PROVIDERS.pop("counting", None)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_entries=10, ttl_seconds=1)
+    cache.set("a", 1, stored_at=time.time() - 5)
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_cache_key_normalizes_whitespace():
+    assert cache_key("groq", "m", "Firebase  vs\nSupabase ") == cache_key("groq", "m", "Firebase vs Supabase")
+    assert cache_key("groq", "m", "x", temperature=0.2) != cache_key("groq", "m", "x", temperature=0.4)
+
+
+def test_complete_serves_repeat_prompts_from_cache(isolated_cache):
+    cache, provider = isolated_cache
+
+    async def run():
+        first = await providers.complete("counting", "Firebase vs Supabase", temperature=0.3, max_tokens=100)
+        second = await providers.complete("counting", "Firebase vs  Supabase", temperature=0.3, max_tokens=100)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert provider.calls == 1
+    assert not first.cached and second.cached
+    assert second.text == first.text
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disk_store_survives_restart(tmp_path):
+    async def run():
+        cache = ResponseCache(root=str(tmp_path), ttl_seconds=60)
+        await cache.set("k" * 64, {"text": "hello"})
+        restarted = ResponseCache(root=str(tmp_path), ttl_seconds=60)
+        entry = await restarted.get("k" * 64)
+        return restarted, entry
+
+    restarted, entry = asyncio.run(run())
+    assert entry["text"] == "hello"
+    assert restarted.stats()["disk_hits"] == 1
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from backend.app.agents import context_agent, cost_agent, risk_agent
+from backend.app.llm import MockProfile, MockProvider
+from backend.app.llm.mock import MockProviderError, create_mock_app
+from backend.app.models import ComparisonContext
+
+
+@pytest.fixture
+def mocked(swap_providers):
+    swap_providers(lambda name: MockProvider(name, profile=MockProfile(p50_ms=0, p99_ms=0)))
+
+
+def test_agents_parse_mock_answers(mocked):
+    async def run():
+        ctx = ComparisonContext(query="Firebase vs Supabase for a low-cost MVP")
+        ctx = await context_agent.run(ctx)
+        await cost_agent.run(ctx)
+        await risk_agent.run(ctx)
+        return ctx
+
+    ctx = asyncio.run(run())
+    assert (ctx.option_a, ctx.option_b) == ("Firebase", "Supabase")
+    assert "low cost" in ctx.constraints
+    assert set(ctx.cost_breakdown["slider_data"]) == {"users_levels", "costs_a", "costs_b"}
+    assert ctx.risks["gotchas_a"]
+
+
+def test_mock_answers_are_deterministic():
+    profile = MockProfile(p50_ms=100, p99_ms=1000, seed=7)
+    again = MockProfile(p50_ms=100, p99_ms=1000, seed=7)
+    assert [profile.latency() for _ in range(5)] == [again.latency() for _ in range(5)]
+
+
+def test_mock_injects_rate_limits():
+    provider = MockProvider("mock-429", profile=MockProfile(p50_ms=0, p99_ms=0, rate_limit_rate=1.0))
+    with pytest.raises(MockProviderError) as exc:
+        asyncio.run(provider.complete("hi"))
+    assert exc.value.status_code == 429
+
+
+def test_mock_server_speaks_openai_api():
+    async def run():
+        transport = httpx.ASGITransport(app=create_mock_app())
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            client = AsyncOpenAI(api_key="mock", base_url="http://mock/v1", http_client=http_client)
+            prompt = "You are a ruthless cost analyst using accurate 2025 pricing data.\nCompare Redis vs Memcached.\n"
+            completion = await client.chat.completions.create(
+                model="deepseek-chat", messages=[{"role": "user", "content": prompt}]
+            )
+            chunks = await client.chat.completions.create(
+                model="deepseek-chat", messages=[{"role": "user", "content": prompt}], stream=True
+            )
+            streamed = "".join([c.choices[0].delta.content or "" async for c in chunks if c.choices])
+            return completion.choices[0].message.content, streamed
+
+    text, streamed = asyncio.run(run())
+    assert "year1_tco" in json.loads(text)
+    assert streamed == text
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.app.llm import LLMProvider, providers
+from backend.app.models import ComparisonContext
+from backend.app.agents.cost_agent import run as cost_run
+from backend.app.agents.performance_agent import run as perf_run
+from backend.app.agents.risk_agent import run as risk_run
+
+
+class SlowProvider(LLMProvider):
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.default_model = "fake"
+        self.delay = delay
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        await asyncio.sleep(self.delay)
+        return "{}"
+
+
+@pytest.fixture
+def slow_providers(swap_providers):
+    swap_providers(lambda name: SlowProvider(name, 0.3), names=("groq", "deepseek"))
+
+
+def test_specialists_run_concurrently(slow_providers, monkeypatch):
+    # "{}" fails every agent schema; no correction round trips for this timing
+    monkeypatch.setenv("AGENT_OUTPUT_RETRIES", "0")
+    ctx = ComparisonContext(query="test", option_a="Firebase", option_b="Supabase")
+
+    async def run_specialists():
+        start = time.perf_counter()
+        await asyncio.gather(cost_run(ctx), perf_run(ctx), risk_run(ctx))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run_specialists())
+    # Three 0.3s calls in parallel should take about as long as one
+    assert elapsed < 0.6
+    # A failed agent leaves its section empty rather than storing the error
+    assert ctx.cost_breakdown == {}
+
+
+def test_unknown_provider_raises():
+    with pytest.raises(providers.ProviderError):
+        providers.get_provider("nope")
+
+
+def test_registry_reuses_pooled_clients():
+    from backend.app.llm.registry import ClientRegistry
+
+    reg = ClientRegistry()
+    built = []
+
+    def factory(http_client):
+        built.append(http_client)
+        return object()
+
+    first = reg.sdk_client("groq", factory)
+    assert reg.sdk_client("groq", factory) is first
+    assert len(built) == 1 and built[0] is reg.http_client("groq")
+    assert reg.stats()["groq"]["pool"]["open"] is True
+
+    asyncio.run(reg.aclose())
+    assert reg.stats()["groq"]["pool"] == {"open": False}
+
+
+def test_ops_llm_endpoint_reports_pools():
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    with TestClient(app) as client:
+        r = client.get("/api/ops/llm")
+        assert r.status_code == 200
+        data = r.json()
+        assert data["registry_started"] is True
+        assert "pools" in data
@@ -0,0 +1,34 @@
+from backend.app.utils.metrics import MetricsRegistry
+
+
+def test_histogram_and_counter_exposition():
+    registry = MetricsRegistry(prefix="t_")
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "/x")
+    registry.counter("errors_total", "Errors", ["kind"]).inc('say "hi"')
+    registry.register_collector(lambda: [("depth", "gauge", "Depth", [({}, 3)])])
+
+    lines = registry.render().splitlines()
+    assert '# TYPE t_latency_seconds histogram' in lines
+    assert 't_latency_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 't_latency_seconds_bucket{route="/x",le="1"} 2' in lines
+    assert 't_latency_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 't_latency_seconds_sum{route="/x"} 5.55' in lines
+    assert 't_errors_total{kind="say \\"hi\\""} 1' in lines
+    assert 't_depth 3' in lines
+
+
+def test_metrics_endpoint_reports_routes_stages_and_providers(client):
+    assert client.post("/api/compare", json={"query": "Firebase vs Supabase"}).status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'pm_architect_http_request_duration_seconds_count{route="/api/compare",method="POST",status="200"}' in body
+    assert 'pm_architect_pipeline_stage_duration_seconds_count{stage="narrative",status="ok"}' in body
+    assert 'pm_architect_llm_request_duration_seconds_count{provider="groq",model="llama-3.3-70b-versatile",status="ok"}' in body
+    for family in ("llm_fallbacks_total", "cache_hit_ratio", "llm_rate_limit_queue_depth",
+                   "compare_job_queue_depth", "event_loop_lag_last_seconds"):
+        assert f"# TYPE pm_architect_{family} " in body
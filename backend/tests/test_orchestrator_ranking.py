@@ -0,0 +1,69 @@
+import json
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import orchestrator
+from backend.app.llm import LLMProvider
+from backend.app.main import app
+
+SCORES = {
+    "Postgres": {"Performance": 90, "Cost": 80},
+    "MongoDB": {"Performance": 85, "Cost": 70},
+    "DynamoDB": {"Performance": 95, "Cost": 40},
+}
+
+
+class ProfileProvider(LLMProvider):
+    """Scores each profiled technology from SCORES and records who was asked."""
+
+    def __init__(self):
+        self.name = "gemini"
+        self.default_model = "scripted"
+        self.profiled = []
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        name = re.search(r"Technology to profile: (.+)", prompt).group(1).strip()
+        self.profiled.append(name)
+        metrics = [{"name": m, "score": s, "reason": f"{name} {m}"} for m, s in SCORES[name].items()]
+        return json.dumps({"name": name, "metrics": metrics, "evidence": [f"{name} fact"]})
+
+
+@pytest.fixture
+def client(monkeypatch, swap_providers):
+    provider, = swap_providers(lambda name: ProfileProvider(), names=("gemini",))
+    decisions = []
+    monkeypatch.setattr(orchestrator, "save_decision", decisions.append)
+    with TestClient(app) as c:
+        yield c, provider, decisions
+
+
+def test_ranks_more_than_two_options_profiling_each_once(client):
+    c, provider, decisions = client
+    r = c.post("/api/orchestrator/compare", json={
+        "options": ["MongoDB", "Postgres", "DynamoDB", "PostgreSQL"],
+        "metrics": ["Performance", "Cost"],
+    })
+    assert r.status_code == 200
+    data = r.json()
+
+    # "PostgreSQL" is an alias of Postgres: three profiles, no per-pair calls
+    assert sorted(provider.profiled) == ["DynamoDB", "MongoDB", "Postgres"]
+    assert data["mode"] == "ranking"
+    assert [row["option"] for row in data["ranking"]] == ["Postgres", "DynamoDB", "MongoDB"]
+    assert data["ranking"][0]["pairs_won"] == 1.5
+    assert data["matrix"]["Postgres"]["MongoDB"] == {"wins": ["Performance", "Cost"], "losses": [], "delta": 7.5}
+    assert data["matrix"]["MongoDB"]["Postgres"]["delta"] == -7.5
+    assert (data["left"], data["right"]) == ("Postgres", "DynamoDB")
+    assert data["metrics"]["Cost"] == {"A": 80.0, "B": 40.0, "delta": "+100%"}
+    assert data["source"] == "gemini"
+    assert len(decisions) == 1
+    # Saved after the usage ledger is attached
+    assert decisions[0]["usage"] == data["usage"] and data["usage"]["total"]["calls"] == 3
+
+
+def test_aliases_of_one_option_are_rejected(client):
+    c, _, _ = client
+    r = c.post("/api/orchestrator/compare", json={"options": ["Postgres", "Postgres", "postgresql"]})
+    assert r.status_code == 400
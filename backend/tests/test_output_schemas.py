@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app.agents import output_schemas
+from backend.app.agents.narrative_agent import determine_winner
+from backend.app.agents.output_schemas import validate_output
+from backend.app.agents.performance_agent import run as perf_run
+from backend.app.llm import LLMProvider, providers
+from backend.app.llm.cache import ResponseCache
+from backend.app.models import ComparisonContext
+
+
+def _context(**kwargs) -> ComparisonContext:
+    return ComparisonContext(query="Firebase vs Supabase", option_a="Firebase", option_b="Supabase", **kwargs)
+
+
+def test_costs_become_numbers():
+    cost = validate_output("cost", {"year1_tco": {"a": "$1,140", "b": "300/yr"}, "traps": []})
+    assert cost["year1_tco"] == {"a": 1140, "b": 300}
+    with pytest.raises(ValidationError):
+        validate_output("cost", {"year1_tco": {"a": "a lot", "b": 300}})
+
+
+def test_pairs_keyed_by_option_name_are_rekeyed():
+    perf = validate_output(
+        "performance",
+        {"benchmarks": {"latency_ms": {"Firebase": 120, "supabase": 90}, "scalability": {"Firebase": "good", "Supabase": "ok"}}},
+        _context(),
+    )
+    assert perf["benchmarks"]["latency_ms"] == {"a": 120, "b": 90}
+    assert perf["benchmarks"]["scalability"] == {"a": "good", "b": "ok"}
+
+
+def test_winner_uses_normalized_latency():
+    ctx = _context(constraints=["high performance"])
+    perf = validate_output("performance", {"benchmarks": {"latency_ms": {"Firebase": 120, "Supabase": 90}}}, ctx)
+    assert determine_winner(ctx, {}, perf, {}) == "Supabase"
+
+
+def test_risks_require_gotcha_lists():
+    with pytest.raises(ValidationError):
+        validate_output("risks", {"gotchas_a": "Read costs", "gotchas_b": []})
+    assert validate_output("risks", {"gotchas_a": ["Read costs"], "gotchas_b": []}) == {"gotchas_a": ["Read costs"], "gotchas_b": []}
+
+
+class CorrectableProvider(LLMProvider):
+    """Answers the performance prompt without benchmarks until it's given a correction hint."""
+
+    def __init__(self, name: str, prompts: list):
+        self.name = name
+        self.default_model = "scripted"
+        self.prompts = prompts
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        self.prompts.append(prompt)
+        if "could not be used" in prompt:
+            return json.dumps({"benchmarks": {"latency_ms": {"a": 100, "b": 90}}, "war_stories": []})
+        return json.dumps({"war_stories": ["It was fast"]})
+
+
+@pytest.fixture
+def prompts(swap_providers):
+    seen = []
+    swap_providers(lambda name: CorrectableProvider(name, seen))
+    return seen
+
+
+def test_invalid_output_is_retried_with_a_hint(prompts):
+    before = dict(output_schemas.stats["performance"])
+    ctx = asyncio.run(perf_run(_context()))
+
+    assert ctx.performance["benchmarks"]["latency_ms"] == {"a": 100, "b": 90}
+    assert len(prompts) == 2
+    assert "benchmarks: Field required" in prompts[1]
+    after = output_schemas.stats["performance"]
+    assert after["retries"] - before["retries"] == 1
+    assert after["valid_retry"] - before["valid_retry"] == 1
+    assert output_schemas.validity_stats()["performance"]["validity_rate"] is not None
+
+
+def test_retries_are_bounded(prompts, monkeypatch):
+    monkeypatch.setenv("AGENT_OUTPUT_RETRIES", "0")
+    before = output_schemas.stats["performance"]["invalid"]
+    ctx = asyncio.run(perf_run(_context()))
+
+    assert ctx.performance == {}
+    assert len(prompts) == 1
+    assert output_schemas.stats["performance"]["invalid"] - before == 1
+
+
+def test_invalid_answer_is_dropped_from_the_response_cache(prompts, tmp_path, monkeypatch):
+    monkeypatch.setattr(providers, "response_cache", ResponseCache(root=str(tmp_path)))
+    asyncio.run(perf_run(_context()))
+    assert len(prompts) == 2
+
+    # The original prompt is asked again; the corrected answer comes from the cache
+    ctx = asyncio.run(perf_run(_context()))
+    assert len(prompts) == 3 and "could not be used" not in prompts[-1]
+    assert ctx.performance["benchmarks"]["latency_ms"] == {"a": 100, "b": 90}
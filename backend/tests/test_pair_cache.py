@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app.agents.pair_cache import PairCache, pair_cache, swap_sides
+from backend.app.llm import LLMProvider
+from backend.app.models import ComparisonContext
+from backend.app.pipeline import run_pipeline
+
+COST = {
+    "year1_tco": {"a": 1140, "b": 300},
+    "breakeven_users": 40000,
+    "slider_data": {"users_levels": [1000], "costs_a": [25], "costs_b": [10]},
+}
+
+
+def test_reverse_order_hit_swaps_sides():
+    cache = PairCache()
+    cache.set("cost", ComparisonContext(query="", option_a="Firebase", option_b="Supabase", constraints=["MVP"]), COST)
+
+    reverse = ComparisonContext(query="", option_a="supabase", option_b="Firebase", constraints=["mvp"])
+    hit = cache.get("cost", reverse)
+    assert hit["year1_tco"] == {"a": 300, "b": 1140}
+    assert hit["slider_data"]["costs_a"] == [10]
+    assert hit["breakeven_users"] == 40000
+    assert cache.reverse_hits == 1
+
+    other = ComparisonContext(query="", option_a="Firebase", option_b="Supabase", constraints=["enterprise"])
+    assert cache.get("cost", other) is None
+
+
+def test_failed_outputs_are_not_cached():
+    cache = PairCache()
+    ctx = ComparisonContext(query="", option_a="Firebase", option_b="Supabase")
+    cache.set("cost", ctx, {"error": "provider down"})
+    cache.set("cost", ctx, {"traps": ["no year1_tco"]})
+    assert cache.get("cost", ctx) is None
+    assert cache.rejected == 2
+
+
+def test_swap_sides_covers_risk_fields():
+    risks = {"gotchas_a": ["x"], "gotchas_b": [], "migration_effort": {"a_to_b": "1 day", "b_to_a": "1 week"}}
+    assert swap_sides(risks) == {"gotchas_b": ["x"], "gotchas_a": [], "migration_effort": {"b_to_a": "1 day", "a_to_b": "1 week"}}
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self, name: str, prompts: list):
+        self.name = name
+        self.default_model = "scripted"
+        self.prompts = prompts
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        self.prompts.append(prompt)
+        if "cost analyst" in prompt:
+            return json.dumps(COST)
+        if "Compare performance" in prompt:
+            return json.dumps({"benchmarks": {"latency_ms": {"a": 100, "b": 90}}})
+        if "Analyze risks" in prompt:
+            return json.dumps({"gotchas_a": ["Read costs"], "gotchas_b": []})
+        return "Pick Supabase. Here's why."
+
+
+@pytest.fixture
+def prompts(swap_providers):
+    # The cache under test; swap_providers restores its setting afterwards
+    pair_cache.enabled = True
+    pair_cache.clear()
+    seen = []
+    swap_providers(lambda name: CountingProvider(name, seen))
+    yield seen
+    pair_cache.clear()
+
+
+def test_rephrased_query_only_regenerates_narrative(prompts):
+    asyncio.run(run_pipeline("Firebase vs Supabase for MVP"))
+    first = len(prompts)
+
+    result = asyncio.run(run_pipeline("supabase or firebase for an mvp"))
+    assert len(prompts) == first + 1
+    assert "Analyze risks" not in prompts[-1] and "cost analyst" not in prompts[-1]
+    assert result["slider_data"]["costs_a"] == [10]
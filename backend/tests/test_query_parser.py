@@ -0,0 +1,50 @@
+import asyncio
+
+from backend.app.agents import context_agent
+from backend.app.agents.query_parser import HIGH, MEDIUM, parse_query
+from backend.app.models import ComparisonContext
+
+
+def test_catalog_pair_is_high_confidence():
+    parsed = parse_query("Firebase vs Supabase for a low-cost bootstrapped MVP with React")
+    assert (parsed.option_a, parsed.option_b) == ("Firebase", "Supabase")
+    assert (parsed.tech_id_a, parsed.tech_id_b) == ("firebase", "supabase")
+    assert parsed.constraints == ["low cost", "bootstrapped", "MVP"]
+    assert parsed.budget == "cost-sensitive"
+    assert parsed.confidence == HIGH
+
+
+def test_aliases_and_multiword_names_resolve():
+    parsed = parse_query("compare ruby on rails versus django for a SaaS with a small team in 6 weeks")
+    assert (parsed.option_a, parsed.option_b) == ("Ruby on Rails", "Django")
+    assert parsed.use_case == "SaaS app"
+    assert parsed.team_size == "small team"
+    assert parsed.timeline == "6 weeks"
+    assert parse_query("Should I use k8s or Docker?").option_a == "Kubernetes"
+
+
+def test_unknown_names_are_medium_and_vague_queries_unparsed():
+    parsed = parse_query("Tailwind vs Bootstrap")
+    assert (parsed.option_a, parsed.option_b, parsed.confidence) == ("Tailwind", "Bootstrap", MEDIUM)
+    assert parse_query("Which database is best for my startup?") is None
+
+
+def test_more_than_two_options_are_left_to_the_llm():
+    assert parse_query("React vs Vue vs Svelte") is None
+    assert parse_query("Node vs Deno vs Bun") is None
+    assert parse_query("postgres vs mongodb or mysql") is None
+
+
+def test_budget_keeps_its_period():
+    assert parse_query("Firebase vs Supabase under $500/month").budget == "under $500/month"
+    assert parse_query("Firebase vs Supabase under $50/mo").budget == "under $50/mo"
+
+
+def test_context_agent_skips_llm_for_confident_parse(monkeypatch):
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(context_agent, "generate", no_llm)
+    ctx = asyncio.run(context_agent.run(ComparisonContext(query="PostgreSQL vs MongoDB")))
+    assert (ctx.option_a, ctx.option_b, ctx.parse_path) == ("PostgreSQL", "MongoDB", "local")
+    assert ctx.tech_category == "database"
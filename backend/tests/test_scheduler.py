@@ -0,0 +1,63 @@
+import asyncio
+
+from backend.app.llm.scheduler import BATCH, INTERACTIVE, ProviderScheduler, TokenBucket, is_rate_limit_error, priority
+
+
+def test_unlimited_scheduler_never_queues():
+    sched = ProviderScheduler("free")
+
+    async def run():
+        await asyncio.gather(*(sched.acquire(1000) for _ in range(50)))
+
+    asyncio.run(run())
+    assert sched.granted == 50
+    assert sched.stats()["throttled"] == 0
+
+
+def test_interactive_calls_jump_ahead_of_batch():
+    sched = ProviderScheduler("limited", rpm=600)
+    sched.requests.drain()
+    order = []
+
+    async def call(label, level):
+        await sched.acquire(10, level)
+        order.append(label)
+
+    async def run():
+        batch = asyncio.create_task(call("batch", BATCH))
+        await asyncio.sleep(0)
+        assert sched.stats()["queue_depth"]["batch"] == 1
+        interactive = asyncio.create_task(call("interactive", INTERACTIVE))
+        await asyncio.gather(batch, interactive)
+
+    asyncio.run(run())
+    assert order == ["interactive", "batch"]
+    assert sched.stats()["queue_depth"] == {"interactive": 0, "batch": 0, "warming": 0}
+
+
+def test_priority_context_sets_default_level():
+    sched = ProviderScheduler("ctx", rpm=600)
+    sched.requests.drain()
+
+    async def run():
+        with priority(BATCH):
+            task = asyncio.create_task(sched.acquire(10))
+        await asyncio.sleep(0)
+        depth = sched.stats()["queue_depth"]
+        await task
+        return depth
+
+    assert asyncio.run(run())["batch"] == 1
+
+
+def test_token_bucket_and_rate_limit_detection():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.wait_time(1) == 0
+    bucket.drain()
+    assert bucket.wait_time(1) > 0.5
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    assert is_rate_limit_error(RateLimitError())
+    assert not is_rate_limit_error(ValueError())
@@ -0,0 +1,74 @@
+import asyncio
+
+from backend.app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight("test-share")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "abandoned": 0, "detached": 0}
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    flight = SingleFlight("test-cancel")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    value, first_cancelled = asyncio.run(run())
+    assert value == 42
+    assert first_cancelled
+
+
+def test_work_is_cancelled_when_last_waiter_leaves():
+    flight = SingleFlight("test-abandon")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.2)
+        finished.append(1)
+
+    async def run():
+        waiter = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+    assert finished == []
+    assert flight.stats()["abandoned"] == 1
+
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight("test-error")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(flight.do("k", work), flight.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight() == 0
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app.llm import LLMProvider
+from backend.app.pipeline import run_pipeline
+from backend.app.utils.speculation import speculation_stats
+
+
+class ParseProvider(LLMProvider):
+    """Slow context parse answering `parsed`; records cost prompts."""
+
+    def __init__(self, name: str, parsed: dict, cost_prompts: list):
+        self.name = name
+        self.default_model = "scripted"
+        self.parsed = parsed
+        self.cost_prompts = cost_prompts
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        if "combined analysis" in prompt:
+            self.cost_prompts.append(prompt)
+            try:
+                await asyncio.sleep(0.2)
+            except asyncio.CancelledError:
+                self.cost_prompts.append("cancelled")
+                raise
+            return "{}"
+        if "query parser" in prompt:
+            await asyncio.sleep(0.05)
+            return json.dumps(self.parsed)
+        if "cost analyst" in prompt:
+            self.cost_prompts.append(prompt)
+            await asyncio.sleep(0.2)
+            return json.dumps({"year1_tco": {"a": 1, "b": 2}, "slider_data": {"costs_a": [1], "costs_b": [2]}})
+        if "Compare performance" in prompt:
+            return json.dumps({"benchmarks": {}})
+        if "Analyze risks" in prompt:
+            return json.dumps({"gotchas_a": [], "gotchas_b": []})
+        return "Pick Tailwind. Here's why."
+
+
+@pytest.fixture
+def install(monkeypatch, swap_providers):
+    monkeypatch.setenv("LLM_HEDGE_ENABLED", "false")
+
+    def _install(parsed):
+        prompts = []
+        swap_providers(lambda name: ParseProvider(name, parsed, prompts))
+        return prompts
+
+    return _install
+
+
+def test_agreeing_parse_keeps_speculative_results(install):
+    prompts = install({"option_a": "Tailwind", "option_b": "Bootstrap", "constraints": []})
+    hits = speculation_stats.hits
+    result = asyncio.run(run_pipeline("Tailwind vs Bootstrap for a landing page"))
+
+    assert speculation_stats.hits == hits + 1
+    assert len(prompts) == 1
+    assert result["context"].cost_breakdown["year1_tco"] == {"a": 1, "b": 2}
+
+
+def test_mismatched_parse_reruns_specialists(install):
+    prompts = install({"option_a": "Tailwind", "option_b": "Bulma", "constraints": []})
+    mismatches = speculation_stats.mismatches
+    result = asyncio.run(run_pipeline("Tailwind vs Bootstrap for a landing page"))
+
+    assert speculation_stats.mismatches == mismatches + 1
+    assert len(prompts) == 2
+    assert "Tailwind vs Bulma" in prompts[-1]
+    assert result["context"].option_b == "Bulma"
+
+
+def test_same_pair_with_other_constraints_reruns_specialists(install):
+    prompts = install({"option_a": "Tailwind", "option_b": "Bootstrap", "constraints": ["enterprise"]})
+    before = speculation_stats.to_dict()
+    result = asyncio.run(run_pipeline("Tailwind vs Bootstrap for a landing page"))
+
+    after = speculation_stats.to_dict()
+    assert after["mismatches"] == before["mismatches"] + 1
+    assert after["constraint_mismatches"] == before["constraint_mismatches"] + 1
+    assert len(prompts) == 2 and "enterprise" in prompts[-1]
+    assert result["context"].constraints == ["enterprise"]
+
+
+def test_mismatch_cancels_speculative_fused_call(install, monkeypatch):
+    monkeypatch.setenv("FUSED_SPECIALISTS", "true")
+    prompts = install({"option_a": "Tailwind", "option_b": "Bulma", "constraints": []})
+    asyncio.run(run_pipeline("Tailwind vs Bootstrap for a landing page"))
+
+    # The guess's combined call is cancelled as soon as the parse disagrees
+    assert "Tailwind (A) vs Bootstrap (B)" in prompts[0] and prompts[1] == "cancelled"
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.utils.tracing import Tracer, span, tracer
+
+
+@pytest.fixture
+def client(scripted):
+    tracer.clear()
+    with TestClient(app) as c:
+        yield c
+
+
+def test_compare_is_traced_end_to_end(client):
+    r = client.post("/api/compare", json={"query": "Firebase vs Supabase"})
+    assert r.status_code == 200
+
+    timing = dict(entry.split(";dur=") for entry in r.headers["server-timing"].split(", "))
+    assert {"context", "cost", "performance", "risks", "narrative", "value_metrics", "persistence", "total"} <= set(timing)
+    assert all(float(ms) >= 0 for ms in timing.values())
+
+    summaries = client.get("/api/ops/traces?name=request").json()["traces"]
+    assert summaries[0]["attributes"]["path"] == "/api/compare"
+    assert summaries[0]["attributes"]["status_code"] == 200
+
+    spans = client.get(f"/api/ops/traces/{summaries[0]['trace_id']}").json()["spans"]
+    by_id = {s["span_id"]: s for s in spans}
+    names = {s["name"] for s in spans}
+    assert {"request", "pipeline", "stage.context", "stage.narrative", "llm.hedged", "llm.complete", "llm.call"} <= names
+
+    call = next(s for s in spans if s["name"] == "llm.call")
+    assert call["attributes"]["provider"] in ("groq", "deepseek", "gemini")
+    assert call["attributes"]["tokens_in"] > 0
+    complete = by_id[call["parent_id"]]
+    assert complete["name"] == "llm.complete" and complete["attributes"]["cache_hit"] is False
+    # Every span hangs off the request's root
+    assert all(s["parent_id"] in by_id for s in spans if s["name"] != "request")
+
+    assert client.get("/api/ops/traces/unknown").status_code == 404
+
+
+def test_spans_nest_across_tasks_and_record_errors(tmp_path):
+    local = Tracer(max_spans=3, jsonl_path=str(tmp_path / "spans.jsonl"))
+
+    async def scenario():
+        with span("root") as root:
+            async def child():
+                with span("child"):
+                    raise RuntimeError("boom")
+            with pytest.raises(RuntimeError):
+                await asyncio.ensure_future(child())
+        return root
+
+    import backend.app.utils.tracing as tracing
+    saved, tracing.tracer = tracing.tracer, local
+    try:
+        root = asyncio.run(scenario())
+    finally:
+        tracing.tracer = saved
+
+    spans = local.trace(root.trace_id)["spans"]
+    child = next(s for s in spans if s["name"] == "child")
+    assert child["parent_id"] == root.span_id
+    assert (child["status"], child["error"]) == ("error", "boom")
+    lines = (tmp_path / "spans.jsonl").read_text().strip().split("\n")
+    assert [json.loads(line)["name"] for line in lines] == ["child", "root"]
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.llm import LLMProvider, complete, register_provider
+from backend.app.llm.usage import cost_usd, report_usage, track_usage, usage_stage, usage_stats
+from backend.app.main import app
+
+
+class ReportingProvider(LLMProvider):
+    """Answers the compare agents and reports 100 prompt / 10 completion tokens per call."""
+
+    def __init__(self, name: str, reports: bool = True):
+        self.name = name
+        self.default_model = "scripted"
+        self.reports = reports
+
+    async def _generate(self, prompt, model, system, temperature, max_tokens) -> str:
+        if self.reports:
+            report_usage(100, 10)
+        if "query parser" in prompt:
+            return json.dumps({"option_a": "Firebase", "option_b": "Supabase", "constraints": []})
+        if "cost analyst" in prompt:
+            return json.dumps({"year1_tco": {"a": 1140, "b": 300}, "slider_data": {}, "traps": []})
+        if "Compare performance" in prompt:
+            return json.dumps({"benchmarks": {"latency_ms": {"a": 100, "b": 90}}, "war_stories": []})
+        if "Analyze risks" in prompt:
+            return json.dumps({"gotchas_a": ["Read costs"], "gotchas_b": [], "migration_effort": {}})
+        return "Pick Supabase. Here's why."
+
+
+@pytest.fixture
+def reporting(swap_providers):
+    swap_providers(ReportingProvider)
+
+
+def test_reported_usage_is_priced_into_the_ledger(reporting):
+    async def scenario():
+        with track_usage() as ledger, usage_stage("cost"):
+            await complete("deepseek", "hello", model="deepseek-chat")
+        return ledger.summary()
+
+    summary = asyncio.run(scenario())
+    stage = summary["stages"]["cost"]
+    assert stage["calls"] == 1
+    assert stage["estimated_calls"] == 0
+    assert (stage["prompt_tokens"], stage["completion_tokens"]) == (100, 10)
+    assert stage["cost_usd"] == round((100 * 0.27 + 10 * 1.10) / 1_000_000, 6)
+    assert summary["total"] == stage
+    assert "cost:deepseek:deepseek-chat" in usage_stats()
+
+
+def test_unreported_usage_falls_back_to_the_estimator(reporting):
+    register_provider(ReportingProvider("groq", reports=False))
+
+    async def scenario():
+        with track_usage() as ledger:
+            response = await complete("groq", "x" * 400)
+        return ledger.summary(), response
+
+    summary, response = asyncio.run(scenario())
+    assert response.usage_estimated
+    assert summary["total"]["estimated_calls"] == 1
+    assert summary["total"]["prompt_tokens"] == response.prompt_tokens > 0
+    assert "other" in summary["stages"]
+
+
+def test_price_override_from_env(monkeypatch):
+    monkeypatch.setenv("LLM_PRICES", json.dumps({"groq:custom": [1.0, 2.0]}))
+    assert cost_usd("groq", "custom", 1_000_000, 1_000_000) == 3.0
+    assert cost_usd("unknown", "model", 1000, 1000) == 0.0
+
+
+def test_compare_response_and_saved_comparison_carry_usage(reporting):
+    with TestClient(app) as client:
+        r = client.post("/api/compare", json={"query": "Firebase vs Supabase"})
+        assert r.status_code == 200
+        usage = r.json()["usage"]
+        # The local parser answers the context stage without an LLM call
+        for stage in ("cost", "performance", "risks", "narrative"):
+            assert usage["stages"][stage]["prompt_tokens"] > 0
+        total = usage["total"]
+        assert total["calls"] == sum(s["calls"] for s in usage["stages"].values())
+        assert total["cost_usd"] > 0
+
+        saved = client.get(f"/api/comparison/{r.json()['comparison_id']}").json()
+        assert saved["usage"] == usage
+
+        ops = client.get("/api/ops/llm").json()
+        assert any(key.startswith("cost:") for key in ops["usage"])
+        assert "# TYPE pm_architect_llm_cost_usd_total counter" in client.get("/metrics").text
@@ -0,0 +1,102 @@
+"""
+Load-test the multi-agent compare pipeline against the offline mock LLM.
+
+  python -m scripts.load_test --requests 200 --concurrency 20
+  GROQ_MOCK_P99_MS=5000 LLM_MOCK_429_RATE=0.05 python -m scripts.load_test
+
+Reports throughput and p50/p95/p99 end-to-end latency. Each request uses a
+distinct query and the response and pair caches are off, so every run
+exercises the provider path; LLM_MOCK_SEED makes the runs repeatable.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+PAIRS = [
+  ("Firebase", "Supabase"),
+  ("PostgreSQL", "MongoDB"),
+  ("Next.js", "Remix"),
+  ("Redis", "Memcached"),
+  ("Vercel", "Netlify"),
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+  if not values:
+    return 0.0
+  ordered = sorted(values)
+  index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+  return ordered[index]
+
+
+async def run(total: int, concurrency: int) -> dict:
+  from backend.app.llm import breaker_stats, hedge_stats, scheduler_stats
+  from backend.app.pipeline import run_pipeline
+
+  semaphore = asyncio.Semaphore(concurrency)
+  latencies: List[float] = []
+  failures = 0
+
+  async def one(i: int) -> None:
+    nonlocal failures
+    a, b = PAIRS[i % len(PAIRS)]
+    query = f"{a} vs {b} for a low-cost MVP #{i}"
+    async with semaphore:
+      start = time.perf_counter()
+      try:
+        result = await run_pipeline(query)
+        if not result.get("brief"):
+          failures += 1
+      except Exception as exc:  # noqa: BLE001
+        print(f"request {i} failed: {exc}")
+        failures += 1
+      latencies.append(time.perf_counter() - start)
+
+  started = time.perf_counter()
+  await asyncio.gather(*(one(i) for i in range(total)))
+  elapsed = time.perf_counter() - started
+
+  return {
+    "requests": total,
+    "concurrency": concurrency,
+    "failures": failures,
+    "elapsed_s": round(elapsed, 3),
+    "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+    "latency_s": {
+      "p50": round(percentile(latencies, 50), 3),
+      "p95": round(percentile(latencies, 95), 3),
+      "p99": round(percentile(latencies, 99), 3),
+      "max": round(max(latencies), 3) if latencies else 0.0,
+    },
+    "hedging": hedge_stats.to_dict(),
+    "breakers": breaker_stats(),
+    "rate_limits": scheduler_stats(),
+  }
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  parser.add_argument("--requests", type=int, default=100)
+  parser.add_argument("--concurrency", type=int, default=10)
+  parser.add_argument("--real", action="store_true", help="use the configured providers instead of the mock")
+  args = parser.parse_args()
+
+  # Must be set before backend.app.llm is imported
+  if not args.real:
+    os.environ["LLM_MOCK"] = "true"
+  os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+  # The pairs repeat with one constraint set; cached specialist output would skip their calls
+  os.environ.setdefault("PAIR_CACHE_ENABLED", "false")
+
+  report = asyncio.run(run(args.requests, args.concurrency))
+  print(json.dumps(report, indent=2))
+  return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())